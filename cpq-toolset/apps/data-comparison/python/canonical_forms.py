@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Canonical column forms computed once per object and field at load time
+Nulls, NaN and empty or blank strings all become null, text is trimmed, true/false text becomes
+a boolean column, whole-number floats become integers and 15-character Salesforce Ids take the
+18-character form, so every later comparison and record digest sees one spelling per value
+
+The form is decided over the field's column in every org together: deciding per org would let
+one org's stray value turn its column back into text while another org's converts, giving the
+same raw value two spellings. Where the orgs' columns call for different forms, the field is
+compared as text, with true/false cells spelled in lower case
+"""
+
+import re
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Bump when a canonical form changes, so cached results and record indexes are rebuilt
+CANONICAL_FORMS_VERSION = 2
+
+ID_PATTERN = r'^[a-zA-Z0-9]{15}([a-zA-Z0-9]{3})?$'
+ID_SUFFIX_ALPHABET = np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ012345', dtype=np.uint8)
+BOOLEAN_TEXT = ('true', 'false')
+MAX_EXACT_INTEGER = 2 ** 53  # Larger floats are not whole numbers in any meaningful sense
+
+# Forms one org's column can call for; None leaves a column of another kind as loaded
+EMPTY, BOOLEAN, INTEGER, FLOAT, IDS, SHORT_IDS, TEXT = 'empty', 'boolean', 'integer', 'float', 'ids', 'short_ids', 'text'
+TEXT_FORMS = {BOOLEAN, IDS, SHORT_IDS, TEXT}
+
+
+def shared_form(forms: List[Optional[str]]) -> Optional[str]:
+    """
+    The form of a field whose org columns call for the given forms
+    Columns without values take any form; 15-character Ids get their suffix only where some org
+    holds valid 18-character ones, and integers next to fractional numbers are compared as floats
+    """
+    forms = set(forms) - {EMPTY}
+    if not forms:
+        return EMPTY
+    if len(forms) == 1:
+        form = forms.pop()
+        return TEXT if form == SHORT_IDS else form
+    if forms <= {INTEGER, FLOAT}:
+        return FLOAT
+    if forms == {IDS, SHORT_IDS}:
+        return IDS
+    if forms & TEXT_FORMS:
+        return TEXT
+    return None
+
+
+def canonical_column(values: pd.Series) -> pd.Series:
+    """Canonical form of a column compared on its own; columns of other kinds are returned unchanged"""
+    return canonical_columns([values])[0]
+
+
+def canonical_columns(columns: List[pd.Series]) -> List[pd.Series]:
+    """Canonical forms of one field's columns, one per org, in the form decided over all of them"""
+    prepared = [_prepared(values) for values in columns]
+    form = shared_form([_column_form(values) for values in prepared])
+    return [_in_form(values, form) for values in prepared]
+
+
+def _prepared(values: pd.Series) -> pd.Series:
+    """Per-cell canonical values: nulls and blanks as null, text trimmed, numbers and booleans typed"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+        return values
+
+    kind = pd.api.types.infer_dtype(values, skipna=True)
+    if kind == 'empty':
+        return _as_text(pd.Series(np.nan, index=values.index, dtype=object))
+    if kind == 'boolean':
+        return values.astype('boolean')
+    if kind in ('integer', 'floating', 'mixed-integer-float'):
+        return values.astype('float64')
+    if kind == 'string':
+        text = _as_text(values).str.strip()
+        return text.mask(text == '')
+    return values
+
+
+def _column_form(values: pd.Series) -> Optional[str]:
+    """Form one org's prepared column calls for"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return None
+    present = values.dropna()
+    if present.empty:
+        return EMPTY
+    if pd.api.types.is_bool_dtype(values):
+        return BOOLEAN
+    if pd.api.types.is_integer_dtype(values):
+        return INTEGER
+    if pd.api.types.is_float_dtype(values):
+        present = present.to_numpy()
+        whole = np.all(np.abs(present) < MAX_EXACT_INTEGER) and np.all(np.mod(present, 1) == 0)
+        return INTEGER if whole else FLOAT
+    if pd.api.types.infer_dtype(present, skipna=True) != 'string':
+        return None
+
+    if present.str.lower().isin(BOOLEAN_TEXT).all():
+        return BOOLEAN
+    return _id_form(present) or TEXT
+
+
+def _id_form(present: pd.Series) -> Optional[str]:
+    """
+    IDS when every value is a 15- or 18-character Id and the 18-character ones carry valid
+    suffixes, of which there is at least one; SHORT_IDS when every value looks like a
+    15-character Id; None for other text
+    """
+    if len(present.iloc[0]) not in (15, 18) or not present.str.match(ID_PATTERN).all():
+        return None
+    full = present[present.str.len() == 18]
+    if full.empty:
+        return SHORT_IDS
+    return IDS if bool((full == _with_id_suffix(full.str[:15])).all()) else None
+
+
+def _in_form(values: pd.Series, form: Optional[str]) -> pd.Series:
+    """One org's prepared column in the field's form"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values
+    if form not in (INTEGER, FLOAT) and pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        form = _column_form(values)  # Numbers next to text keep their own number form
+    if form is None:
+        return values
+    if values.isna().all():
+        if form == BOOLEAN:
+            return pd.Series(pd.NA, index=values.index, dtype='boolean')
+        if form == INTEGER:
+            return pd.Series(pd.NA, index=values.index, dtype='Int64')
+        if form == FLOAT:
+            return pd.Series(np.nan, index=values.index, dtype='float64')
+        return _as_text(pd.Series(np.nan, index=values.index, dtype=object))
+
+    if form == BOOLEAN:
+        if pd.api.types.is_bool_dtype(values):
+            return values.astype('boolean')
+        return (values.str.lower() == 'true').astype('boolean').mask(values.isna())
+    if form == INTEGER:
+        return values.astype('Int64')
+    if form == FLOAT:
+        return values.astype('float64')
+    if form == IDS:
+        return values.mask(values.str.len() == 15, _with_id_suffix(values))
+
+    # Text: booleans and true/false text share the lower-case spelling, other kinds stay as they are
+    if pd.api.types.is_bool_dtype(values):
+        return _as_text(values).str.lower()
+    if pd.api.types.infer_dtype(values, skipna=True) != 'string':
+        return values
+    lowered = values.str.lower()
+    return values.mask(lowered.isin(BOOLEAN_TEXT), lowered)
+
+
+def _as_text(values: pd.Series) -> pd.Series:
+    """Text form of the non-null cells, nulls left null"""
+    text = values.astype('str')
+    if text.dtype == object:  # Before pandas 3, nulls become the strings 'None' and 'nan'
+        text = text.where(values.notna())
+    return text
+
+
+def _with_id_suffix(ids: pd.Series) -> pd.Series:
+    """
+    18-character form of 15-character Ids
+    Each suffix character encodes which of five Id characters are upper case
+    """
+    id15 = ids.str[:15].fillna('0' * 15).to_numpy(dtype='S15')
+    chars = np.frombuffer(id15.tobytes(), dtype=np.uint8).reshape(-1, 3, 5)
+    upper = (chars >= ord('A')) & (chars <= ord('Z'))
+    bits = (upper * (1 << np.arange(5))).sum(axis=2)
+    suffixes = ID_SUFFIX_ALPHABET[bits].view('S3').ravel().astype(str)
+    return ids.str[:15] + pd.Series(suffixes, index=ids.index, dtype='str')
+
+
+def arrow_canonical_column(values: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Arrow counterpart of canonical_column"""
+    return arrow_canonical_columns([values])[0]
+
+
+def arrow_canonical_columns(columns: List[pa.ChunkedArray]) -> List[pa.ChunkedArray]:
+    """Arrow counterpart of canonical_columns"""
+    prepared = [_arrow_prepared(values) for values in columns]
+    form = shared_form([_arrow_column_form(values) for values in prepared])
+    return [_arrow_in_form(values, form) for values in prepared]
+
+
+def _arrow_prepared(values: pa.ChunkedArray) -> pa.ChunkedArray:
+    if pa.types.is_null(values.type):
+        return pc.cast(values, pa.large_string())
+    if not _is_text(values):
+        return values
+    text = pc.utf8_trim_whitespace(pc.cast(values, pa.large_string()))
+    return pc.if_else(pc.equal(text, ''), pa.scalar(None, pa.large_string()), text)
+
+
+def _arrow_column_form(values: pa.ChunkedArray) -> Optional[str]:
+    present = values.drop_null()
+    if not len(present):
+        return EMPTY
+    value_type = values.type
+    if pa.types.is_boolean(value_type):
+        return BOOLEAN
+    if pa.types.is_integer(value_type):
+        return INTEGER
+    if pa.types.is_floating(value_type):
+        whole = pc.equal(pc.floor(present), present)
+        small = pc.less(pc.abs(present), MAX_EXACT_INTEGER)
+        return INTEGER if pc.all(pc.and_(whole, small)).as_py() else FLOAT
+    if not _is_text(values):
+        return None
+
+    if pc.all(pc.is_in(pc.utf8_lower(present), value_set=pa.array(BOOLEAN_TEXT))).as_py():
+        return BOOLEAN
+    first = present[0].as_py()
+    if len(first) in (15, 18) and re.match(ID_PATTERN, first):
+        return _id_form(present.to_pandas()) or TEXT
+    return TEXT
+
+
+def _arrow_in_form(values: pa.ChunkedArray, form: Optional[str]) -> pa.ChunkedArray:
+    if form not in (INTEGER, FLOAT) and (pa.types.is_integer(values.type) or pa.types.is_floating(values.type)):
+        form = _arrow_column_form(values)
+    if form is None:
+        return values
+    if values.null_count == len(values):
+        null_type = {BOOLEAN: pa.bool_(), INTEGER: pa.int64(), FLOAT: pa.float64()}.get(form, pa.large_string())
+        return pa.chunked_array([pa.nulls(len(values), null_type)])
+
+    if form == BOOLEAN:
+        if pa.types.is_boolean(values.type):
+            return values
+        return pc.equal(pc.utf8_lower(values), 'true')
+    if form == INTEGER:
+        return pc.cast(values, pa.int64())
+    if form == FLOAT:
+        return pc.cast(values, pa.float64())
+    if form == IDS:
+        text = values.to_pandas()
+        canonical = text.mask(text.str.len() == 15, _with_id_suffix(text))
+        return pa.chunked_array([pa.array(canonical, pa.large_string(), from_pandas=True)])
+
+    if pa.types.is_boolean(values.type):
+        return pc.if_else(values, 'true', 'false').cast(pa.large_string())
+    if not _is_text(values):
+        return values
+    lowered = pc.utf8_lower(values)
+    return pc.if_else(pc.is_in(lowered, value_set=pa.array(BOOLEAN_TEXT, pa.large_string())), lowered, values)
+
+
+def _is_text(values: pa.ChunkedArray) -> bool:
+    return pa.types.is_string(values.type) or pa.types.is_large_string(values.type)
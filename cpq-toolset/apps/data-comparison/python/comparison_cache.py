@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Content-addressed result cache for the multi-org comparison
+Stores each object's rendered difference rows under a key built from the input
+file fingerprints and the object's effective comparison settings
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+
+class ComparisonResultCache:
+    """Per-object difference rows keyed by input digests, evicted least recently used past a size limit"""
+
+    CACHE_VERSION = 1  # Bump when the rendered row format changes
+    DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = None, logger: logging.Logger = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes if max_bytes is not None else self.DEFAULT_MAX_BYTES
+        self.logger = logger or logging.getLogger(__name__)
+        self.hits = []
+        self.misses = []
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def fingerprint_file(file_path: str) -> str:
+        """Digest of a file's bytes"""
+        digest = hashlib.blake2b(digest_size=20)
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def object_key(self, object_name: str, fingerprints: Dict[str, Optional[str]], settings: Dict) -> str:
+        """Cache key for one object: input fingerprints per org plus a hash of its settings"""
+        payload = json.dumps({
+            'version': self.CACHE_VERSION,
+            'object': object_name,
+            'inputs': fingerprints,
+            'settings': settings
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_paths(self, key: str) -> Tuple[str, str]:
+        return os.path.join(self.cache_dir, f"{key}.csv"), os.path.join(self.cache_dir, f"{key}.json")
+
+    def lookup(self, object_name: str, key: str) -> bool:
+        """Whether a complete entry exists for a key, recording the hit or miss"""
+        rows_path, meta_path = self._entry_paths(key)
+
+        if not (os.path.exists(meta_path) and os.path.exists(rows_path)):
+            self.misses.append(object_name)
+            return False
+
+        # Touch the entry so eviction keeps recently used results
+        os.utime(meta_path)
+        self.hits.append(object_name)
+        self.logger.info(f"Result cache hit for {object_name}")
+        return True
+
+    def entry(self, key: str) -> Tuple[str, int]:
+        """Path of an entry's rendered rows and its row count"""
+        rows_path, meta_path = self._entry_paths(key)
+        with open(meta_path, 'r') as f:
+            return rows_path, json.load(f)['rows']
+
+    def open_entry(self, object_name: str, key: str) -> Optional[BinaryIO]:
+        """Open an entry's rows file for writing; the entry is only visible once committed"""
+        rows_path, meta_path = self._entry_paths(key)
+        try:
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            return open(rows_path, 'wb')
+        except OSError as e:
+            self.logger.warning(f"Could not cache results for {object_name}: {e}")
+            return None
+
+    def commit(self, object_name: str, key: str, row_count: int):
+        """Mark an entry complete once its rows are written"""
+        _, meta_path = self._entry_paths(key)
+        try:
+            with open(meta_path, 'w') as f:
+                json.dump({'object': object_name, 'rows': row_count}, f)
+        except OSError as e:
+            self.logger.warning(f"Could not cache results for {object_name}: {e}")
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits its size limit
+        Run once at the end of a comparison so entries looked up earlier stay readable
+        """
+        entries = []
+        total_bytes = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            key = name[:-len('.json')]
+            rows_path, meta_path = self._entry_paths(key)
+            try:
+                size = os.path.getsize(meta_path) + os.path.getsize(rows_path)
+                entries.append((os.path.getmtime(meta_path), key, size))
+                total_bytes += size
+            except OSError:
+                continue
+
+        for _, key, size in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            for path in self._entry_paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total_bytes -= size
+            self.logger.debug(f"Evicted result cache entry {key}")
+
+    def summary(self) -> Dict[str, Any]:
+        """Hit and miss counts for the run summary"""
+        return {
+            'hits': len(self.hits),
+            'misses': len(self.misses),
+            'hit_objects': self.hits,
+            'miss_objects': self.misses
+        }
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Parent-level roll-up of comparison differences
+Child records point at their parent through lookup fields such as
+SBQQ__Rule__c.Price_Rule_Foreign_Key__c, so every condition and action difference can be
+counted under its price rule: one row per parent key with its own differences and, per child
+object, how many child records differ and in how many difference rows
+"""
+
+from typing import Dict
+
+import pandas as pd
+
+LINK_COLUMNS = ['child_object', 'child_key', 'parent_object', 'parent_key']
+
+
+def read_difference_keys(differences_file: str) -> pd.DataFrame:
+    """Object and foreign key value of every row of all_differences.csv"""
+    rows = pd.read_csv(differences_file, usecols=['ForeignKeyValue', 'ObjectFieldName'],
+                       dtype=str, keep_default_na=False)
+    return pd.DataFrame({
+        'object': rows['ObjectFieldName'].str.split('.', n=1).str[0],
+        'key': rows['ForeignKeyValue']
+    })
+
+
+def rollup_differences(differences: pd.DataFrame, links: pd.DataFrame, parent_key_fields: Dict[str, str]) -> pd.DataFrame:
+    """
+    One row per parent key with differences of its own or in its children, most differences first
+    differences holds the object and key of each difference row; links maps each child key to
+    the parent keys it points at in any org, so a child moved between parents counts under both
+    """
+    counts = differences.groupby(['object', 'key'], sort=False).size().rename('differences').reset_index()
+
+    # One join attaches every child difference count to its parents
+    children = counts.merge(links, left_on=['object', 'key'], right_on=['child_object', 'child_key'])
+    per_child = children.groupby(['parent_object', 'parent_key', 'child_object']).agg(
+        records=('child_key', 'nunique'), differences=('differences', 'sum')
+    )
+
+    own = counts[counts['object'].isin(list(parent_key_fields))]
+    own = own.rename(columns={'object': 'parent_object', 'key': 'parent_key'}).set_index(['parent_object', 'parent_key'])
+
+    child_objects = sorted(per_child.index.get_level_values('child_object').unique())
+    wide = per_child.unstack('child_object') if len(per_child) else pd.DataFrame(index=own.index)
+    summary = pd.DataFrame(index=own.index.union(wide.index))
+    summary['Differences'] = own['differences'].reindex(summary.index, fill_value=0)
+    for child_object in child_objects:
+        summary[f"{child_object}_Records"] = wide[('records', child_object)].reindex(summary.index).fillna(0).astype(int)
+        summary[f"{child_object}_Differences"] = wide[('differences', child_object)].reindex(summary.index).fillna(0).astype(int)
+    summary['TotalDifferences'] = summary['Differences'] + sum(
+        summary[f"{child_object}_Differences"] for child_object in child_objects
+    )
+
+    summary = summary.reset_index()
+    summary.insert(1, 'ForeignKeyField', summary['parent_object'].map(parent_key_fields))
+    summary = summary.rename(columns={'parent_object': 'ParentObject', 'parent_key': 'ForeignKeyValue'})
+    return summary.sort_values(['TotalDifferences', 'ParentObject', 'ForeignKeyValue'],
+                               ascending=[False, True, True], kind='stable', ignore_index=True)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Streaming writer for all_differences.csv and its optional Parquet dataset
+Difference rows are rendered and written in fixed-size batches so the memory used for
+output stays bounded however many differences a run produces
+"""
+
+import io
+import os
+import shutil
+from typing import Any, BinaryIO, Callable, List, Optional
+
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+
+class DifferenceWriter:
+    """
+    Appends difference batches to one CSV file, writing the header before the first row
+    With parquet_dir set, every batch is also written to a Parquet dataset partitioned by
+    object (object=<name>/part-0.parquet). Its values are parsed back from the rendered CSV
+    so both outputs hold the same text; low-cardinality columns are dictionary-encoded
+    """
+
+    PARQUET_COMPRESSION = 'zstd'
+    PLAIN_COLUMNS = ('ForeignKeyValue',)  # Mostly unique, dictionary encoding would not pay off
+
+    def __init__(self, output_path: str, columns: List[str],
+                 render: Callable[[Any, int, int], bytes], batch_rows: int = 50000,
+                 parquet_dir: Optional[str] = None):
+        self.output_path = output_path
+        self.columns = columns
+        self.render = render  # render(differences, start, stop) -> CSV rows without header
+        self.batch_rows = max(1, batch_rows)
+        self.parquet_dir = parquet_dir
+        self.rows_written = 0
+        self._file = None  # Opened on the first row so runs without differences leave no file
+        self._parquet_writer = None
+        self._parquet_object = None
+        self.parquet_schema = pa.schema([
+            pa.field(col, pa.string() if col in self.PLAIN_COLUMNS else pa.dictionary(pa.int32(), pa.string()))
+            for col in columns
+        ])
+
+    def write(self, differences: Any, object_name: Optional[str] = None, tee: Optional[BinaryIO] = None):
+        """Append a frame or table of differences batch by batch, copying each batch to tee"""
+        row_count = len(differences)
+        for start in range(0, row_count, self.batch_rows):
+            rendered = self.render(differences, start, min(start + self.batch_rows, row_count))
+            self._output().write(rendered)
+            if tee is not None:
+                tee.write(rendered)
+            if self.parquet_dir:
+                self._write_parquet(io.BytesIO(rendered), object_name)
+        self.rows_written += row_count
+
+    def write_file(self, rows_path: str, row_count: int, object_name: Optional[str] = None):
+        """Append rows already rendered to a file, such as a result cache entry"""
+        if not row_count:
+            return
+        with open(rows_path, 'rb') as f:
+            shutil.copyfileobj(f, self._output())
+        if self.parquet_dir:
+            self._write_parquet(rows_path, object_name)
+        self.rows_written += row_count
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._close_parquet()
+
+    def _write_parquet(self, source: Any, object_name: Optional[str]):
+        """Parse rendered CSV rows in streaming blocks and append them to the object's partition"""
+        if object_name != self._parquet_object:
+            self._close_parquet()
+            partition_dir = os.path.join(self.parquet_dir, f"object={object_name}")
+            os.makedirs(partition_dir, exist_ok=True)
+            self._parquet_writer = pq.ParquetWriter(
+                os.path.join(partition_dir, 'part-0.parquet'), self.parquet_schema,
+                compression=self.PARQUET_COMPRESSION
+            )
+            self._parquet_object = object_name
+
+        reader = pv.open_csv(
+            source,
+            read_options=pv.ReadOptions(column_names=self.columns),
+            parse_options=pv.ParseOptions(newlines_in_values=True),
+            convert_options=pv.ConvertOptions(
+                column_types={col: pa.string() for col in self.columns},
+                strings_can_be_null=True
+            )
+        )
+        for batch in reader:
+            self._parquet_writer.write_table(pa.Table.from_batches([batch]).cast(self.parquet_schema))
+
+    def _close_parquet(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+            self._parquet_object = None
+
+    def _output(self) -> BinaryIO:
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.output_path) or '.', exist_ok=True)
+            self._file = open(self.output_path, 'wb')
+            self._file.write((','.join(self.columns) + '\n').encode('utf-8'))
+        return self._file
@@ -13,16 +13,23 @@ from pathlib import Path
 import pandas as pd
 import pyarrow.parquet as pq
 
+# Modules shared between apps sit in shared/modules/python in the source tree and in the runtime alike
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'shared', 'modules', 'python'))
+
+from run_metrics import RunMetrics
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class DuplicateFKDetector:
-    def __init__(self, comparison_dir, config_path):
+    def __init__(self, comparison_dir, config_path, profile=False):
         self.comparison_dir = Path(comparison_dir)
         self.config_path = Path(config_path)
-        self.config = self.load_config()
-        self.foreign_key_mappings = self.extract_foreign_key_mappings()
+        self.metrics = RunMetrics('duplicate_fk_detector', profile=profile)
+        with self.metrics.phase('config_load'):
+            self.config = self.load_config()
+            self.foreign_key_mappings = self.extract_foreign_key_mappings()
         self.duplicates = {}
         
     def load_config(self):
@@ -62,48 +69,52 @@ class DuplicateFKDetector:
             
             try:
                 # Load data from parquet
-                df = pd.read_parquet(parquet_file)
+                with self.metrics.phase('load', object_name, org_name) as counts:
+                    df = pd.read_parquet(parquet_file)
+                    counts['rows'] = len(df)
+                    counts['bytes'] = parquet_file.stat().st_size
                 
                 # Check if foreign key field exists
                 if foreign_key_field not in df.columns:
                     logger.warning(f"Foreign key field {foreign_key_field} not found in {object_name}")
                     continue
                 
-                # Find duplicates
-                duplicated_mask = df.duplicated(subset=[foreign_key_field], keep=False)
-                
-                if duplicated_mask.any():
-                    duplicate_df = df[duplicated_mask].copy()
+                with self.metrics.phase('key_build', object_name, org_name):
+                    # Find duplicates
+                    duplicated_mask = df.duplicated(subset=[foreign_key_field], keep=False)
                     
-                    # Group by foreign key value
-                    grouped = duplicate_df.groupby(foreign_key_field)
-                    
-                    object_duplicates = {}
-                    for fk_value, group in grouped:
-                        if pd.isna(fk_value) or fk_value == '':
-                            continue  # Skip null/empty foreign keys
+                    if duplicated_mask.any():
+                        duplicate_df = df[duplicated_mask].copy()
+                        
+                        # Group by foreign key value
+                        grouped = duplicate_df.groupby(foreign_key_field)
+                        
+                        object_duplicates = {}
+                        for fk_value, group in grouped:
+                            if pd.isna(fk_value) or fk_value == '':
+                                continue  # Skip null/empty foreign keys
+                                
+                            records = []
+                            for idx, row in group.iterrows():
+                                records.append({
+                                    'line_number': idx + 1,  # 1-based line number
+                                    'record': row.to_dict()
+                                })
                             
-                        records = []
-                        for idx, row in group.iterrows():
-                            records.append({
-                                'line_number': idx + 1,  # 1-based line number
-                                'record': row.to_dict()
-                            })
+                            object_duplicates[str(fk_value)] = {
+                                'foreign_key': str(fk_value),
+                                'count': len(records),
+                                'records': records
+                            }
                         
-                        object_duplicates[str(fk_value)] = {
-                            'foreign_key': str(fk_value),
-                            'count': len(records),
-                            'records': records
-                        }
-                    
-                    if object_duplicates:
-                        org_duplicates[object_name] = object_duplicates
-                        logger.warning(f"Found {len(object_duplicates)} duplicate foreign keys in {org_name}/{object_name}")
+                        if object_duplicates:
+                            org_duplicates[object_name] = object_duplicates
+                            logger.warning(f"Found {len(object_duplicates)} duplicate foreign keys in {org_name}/{object_name}")
+                        else:
+                            logger.info(f"No duplicates found in {org_name}/{object_name}")
                     else:
                         logger.info(f"No duplicates found in {org_name}/{object_name}")
-                else:
-                    logger.info(f"No duplicates found in {org_name}/{object_name}")
-                    
+                        
             except Exception as e:
                 logger.error(f"Error processing {parquet_file}: {e}")
                 continue
@@ -115,7 +126,9 @@ class DuplicateFKDetector:
         logger.info("Starting duplicate foreign key detection across all orgs")
         
         # Find all org directories
-        for item in self.comparison_dir.iterdir():
+        with self.metrics.phase('discovery'):
+            org_dirs = list(self.comparison_dir.iterdir())
+        for item in org_dirs:
             if item.is_dir():
                 org_name = item.name
                 logger.info(f"Processing org: {org_name}")
@@ -249,21 +262,25 @@ class DuplicateFKDetector:
             return False
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python duplicate_fk_detector.py <comparison_dir> <config_path>")
+    profile = '--profile' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != '--profile']
+    if len(args) != 2:
+        print("Usage: python duplicate_fk_detector.py <comparison_dir> <config_path> [--profile]")
         sys.exit(1)
     
-    comparison_dir = sys.argv[1]
-    config_path = sys.argv[2]
+    comparison_dir = args[0]
+    config_path = args[1]
     
-    detector = DuplicateFKDetector(comparison_dir, config_path)
+    detector = DuplicateFKDetector(comparison_dir, config_path, profile)
     
     # Detect duplicates
     duplicates = detector.detect_all_duplicates()
     
     # Generate and save report
     report_path = Path(comparison_dir) / "duplicate_fk_report.json"
-    detector.save_report(report_path)
+    with detector.metrics.phase('output'):
+        detector.save_report(report_path)
+    detector.metrics.write(comparison_dir)
     
     # Print summary
     report = detector.generate_duplicate_report()
@@ -11,16 +11,23 @@ import logging
 from collections import defaultdict
 from pathlib import Path
 
+# Modules shared between apps sit in shared/modules/python in the source tree and in the runtime alike
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'shared', 'modules', 'python'))
+
+from run_metrics import RunMetrics
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class DuplicateFKDetectorJSONL:
-    def __init__(self, comparison_dir, config_path):
+    def __init__(self, comparison_dir, config_path, profile=False):
         self.comparison_dir = Path(comparison_dir)
         self.config_path = Path(config_path)
-        self.config = self.load_config()
-        self.foreign_key_mappings = self.extract_foreign_key_mappings()
+        self.metrics = RunMetrics('duplicate_fk_detector_jsonl', profile=profile)
+        with self.metrics.phase('config_load'):
+            self.config = self.load_config()
+            self.foreign_key_mappings = self.extract_foreign_key_mappings()
         self.duplicates = {}
         
     def load_config(self):
@@ -59,48 +66,52 @@ class DuplicateFKDetectorJSONL:
             logger.info(f"Checking duplicates in {org_name}/{object_name}")
             
             try:
-                # Read JSONL file and track foreign keys
-                fk_records = defaultdict(list)
-                line_number = 1
-                
-                with open(jsonl_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if not line.strip():
-                            continue
-                            
-                        try:
-                            record = json.loads(line)
-                            
-                            # Get foreign key value
-                            fk_value = record.get(foreign_key_field)
-                            
-                            # Skip null/empty foreign keys
-                            if fk_value is None or fk_value == '':
+                with self.metrics.phase('load', object_name, org_name) as counts:
+                    # Read JSONL file and track foreign keys
+                    fk_records = defaultdict(list)
+                    line_number = 1
+                    
+                    with open(jsonl_file, 'r', encoding='utf-8') as f:
+                        for line in f:
+                            if not line.strip():
+                                continue
+                                
+                            try:
+                                record = json.loads(line)
+                                
+                                # Get foreign key value
+                                fk_value = record.get(foreign_key_field)
+                                
+                                # Skip null/empty foreign keys
+                                if fk_value is None or fk_value == '':
+                                    line_number += 1
+                                    continue
+                                
+                                # Store record with its line number
+                                fk_records[str(fk_value)].append({
+                                    'line_number': line_number,
+                                    'record': record
+                                })
+                                
+                                line_number += 1
+                                
+                            except json.JSONDecodeError as e:
+                                logger.error(f"Failed to parse JSON at line {line_number}: {e}")
                                 line_number += 1
                                 continue
-                            
-                            # Store record with its line number
-                            fk_records[str(fk_value)].append({
-                                'line_number': line_number,
-                                'record': record
-                            })
-                            
-                            line_number += 1
-                            
-                        except json.JSONDecodeError as e:
-                            logger.error(f"Failed to parse JSON at line {line_number}: {e}")
-                            line_number += 1
-                            continue
+                    counts['rows'] = line_number - 1
+                    counts['bytes'] = jsonl_file.stat().st_size
                 
-                # Find duplicates
-                object_duplicates = {}
-                for fk_value, records in fk_records.items():
-                    if len(records) > 1:
-                        object_duplicates[fk_value] = {
-                            'foreign_key': fk_value,
-                            'count': len(records),
-                            'records': records
-                        }
+                with self.metrics.phase('key_build', object_name, org_name):
+                    # Find duplicates
+                    object_duplicates = {}
+                    for fk_value, records in fk_records.items():
+                        if len(records) > 1:
+                            object_duplicates[fk_value] = {
+                                'foreign_key': fk_value,
+                                'count': len(records),
+                                'records': records
+                            }
                 
                 if object_duplicates:
                     org_duplicates[object_name] = object_duplicates
@@ -119,7 +130,9 @@ class DuplicateFKDetectorJSONL:
         logger.info("Starting duplicate foreign key detection across all orgs")
         
         # Find all org directories
-        for item in self.comparison_dir.iterdir():
+        with self.metrics.phase('discovery'):
+            org_dirs = list(self.comparison_dir.iterdir())
+        for item in org_dirs:
             if item.is_dir() and not item.name.startswith('.'):
                 org_name = item.name
                 logger.info(f"Processing org: {org_name}")
@@ -279,21 +292,25 @@ class DuplicateFKDetectorJSONL:
         return recommendations
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python duplicate_fk_detector_jsonl.py <comparison_dir> <config_path>")
+    profile = '--profile' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != '--profile']
+    if len(args) != 2:
+        print("Usage: python duplicate_fk_detector_jsonl.py <comparison_dir> <config_path> [--profile]")
         sys.exit(1)
     
-    comparison_dir = sys.argv[1]
-    config_path = sys.argv[2]
+    comparison_dir = args[0]
+    config_path = args[1]
     
-    detector = DuplicateFKDetectorJSONL(comparison_dir, config_path)
+    detector = DuplicateFKDetectorJSONL(comparison_dir, config_path, profile)
     
     # Detect duplicates
     duplicates = detector.detect_all_duplicates()
     
     # Generate and save report
     report_path = Path(comparison_dir) / "duplicate_fk_report.json"
-    detector.save_report(report_path)
+    with detector.metrics.phase('output'):
+        detector.save_report(report_path)
+    detector.metrics.write(comparison_dir)
     
     # Print summary
     report = detector.generate_duplicate_report()
@@ -12,19 +12,28 @@ import shutil
 from pathlib import Path
 from collections import defaultdict
 
+# Modules shared between apps sit in shared/modules/python in the source tree and in the runtime alike
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'shared', 'modules', 'python'))
+
+from run_metrics import RunMetrics
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class DuplicateResolver:
-    def __init__(self, comparison_dir, resolutions_file):
+    METRICS_FILE = 'duplicate_resolver_metrics.json'  # Kept apart from the detector's metrics.json
+
+    def __init__(self, comparison_dir, resolutions_file, profile=False):
         self.comparison_dir = Path(comparison_dir)
         self.resolutions_file = Path(resolutions_file)
-        self.resolutions = self.load_resolutions()
+        self.metrics = RunMetrics('duplicate_resolver', profile=profile)
+        with self.metrics.phase('config_load'):
+            self.resolutions = self.load_resolutions()
+            self.foreign_key_mappings = self.load_foreign_key_config()
         self.blacklisted_fks = set()
         self.resolved_count = 0
         self.skipped_count = 0
-        self.foreign_key_mappings = self.load_foreign_key_config()
         
     def load_resolutions(self):
         """Load user resolutions from JSON file"""
@@ -80,7 +89,8 @@ class DuplicateResolver:
                 continue
         
         # Save blacklisted foreign keys for comparison engine
-        self.save_blacklisted_fks()
+        with self.metrics.phase('output'):
+            self.save_blacklisted_fks()
         
         logger.info(f"")
         logger.info(f"{'='*60}")
@@ -124,7 +134,8 @@ class DuplicateResolver:
             # Remove all other records with this FK, keep only the chosen one
             logger.info(f"✅ KEEPING: Line {chosen_record_line} in {org_name}/{object_name}")
             logger.info(f"❌ WILL DELETE: All other records with FK={fk_value}")
-            self.remove_duplicate_records(org_name, object_name, fk_value, chosen_record_line)
+            with self.metrics.phase('resolve', object_name, org_name):
+                self.remove_duplicate_records(org_name, object_name, fk_value, chosen_record_line)
             self.resolved_count += 1
         else:
             logger.warning(f"Invalid resolution action or missing chosen_line_number: {resolution_data}")
@@ -308,20 +319,23 @@ class DuplicateResolver:
             return summary
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python duplicate_resolver.py <comparison_dir> <resolutions_file>")
+    profile = '--profile' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != '--profile']
+    if len(args) != 2:
+        print("Usage: python duplicate_resolver.py <comparison_dir> <resolutions_file> [--profile]")
         sys.exit(1)
     
-    comparison_dir = sys.argv[1]
-    resolutions_file = sys.argv[2]
+    comparison_dir = args[0]
+    resolutions_file = args[1]
     
-    resolver = DuplicateResolver(comparison_dir, resolutions_file)
+    resolver = DuplicateResolver(comparison_dir, resolutions_file, profile)
     
     # Apply resolutions
     success = resolver.apply_resolutions()
     
     # Generate summary
     summary = resolver.generate_resolution_summary()
+    resolver.metrics.write(comparison_dir, DuplicateResolver.METRICS_FILE)
     
     # Print results
     print(f"\n🔧 Duplicate Resolution Complete!")
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Type-aware field comparison kernels
+Each kernel turns a whole aligned pair of columns into a difference mask in one vectorized
+operation: floats within a tolerance, integers and booleans exactly, datetimes as UTC instants
+and text with Arrow's string kernels. Null differs from any value and two nulls are equal
+"""
+
+import re
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Same tolerance as the legacy engine's np.isclose check
+FLOAT_RTOL = 1e-09
+FLOAT_ATOL = 1e-09
+
+# ISO 8601 date-times as the Salesforce APIs write them, e.g. 2024-01-31T09:30:00.000+0000
+DATETIME_PATTERN = r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?$'
+
+_KINDS = {
+    'floating': 'float', 'mixed-integer-float': 'float', 'decimal': 'float',
+    'integer': 'integer',
+    'boolean': 'boolean',
+    'datetime64': 'datetime', 'datetime': 'datetime',
+    'string': 'string'
+}
+
+
+def value_kind(values: pd.Series) -> str:
+    """Kernel family of a column's non-null values: float, integer, boolean, datetime, string or other"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+    kind = _KINDS.get(pd.api.types.infer_dtype(values, skipna=True), 'other')
+    if kind == 'string' and looks_like_datetime(values):
+        return 'datetime'
+    return kind
+
+
+def looks_like_datetime(values: pd.Series) -> bool:
+    """True when every non-null value of a text column is an ISO 8601 date-time"""
+    present = values.dropna()
+    if present.empty or not isinstance(present.iloc[0], str) or not re.match(DATETIME_PATTERN, present.iloc[0]):
+        return False
+    return bool(present.astype(str).str.match(DATETIME_PATTERN).all())
+
+
+def pair_kind(ref_kind: str, comp_kind: str) -> str:
+    """Kernel for two columns: shared kinds keep theirs, integers against floats use the float kernel"""
+    if ref_kind == comp_kind:
+        return ref_kind
+    if {ref_kind, comp_kind} <= {'integer', 'float'}:
+        return 'float'
+    return 'other'
+
+
+def difference_mask(ref_values: pd.Series, comp_values: pd.Series) -> np.ndarray:
+    """Rows where two aligned columns differ, compared by the kernel their value types call for"""
+    ref_null = ref_values.isna().to_numpy()
+    comp_null = comp_values.isna().to_numpy()
+    both_present = ~ref_null & ~comp_null
+
+    not_equal = np.zeros(len(ref_values), dtype=bool)
+    if both_present.any():
+        ref_present = ref_values[both_present]
+        comp_present = comp_values[both_present]
+        kind = pair_kind(value_kind(ref_present), value_kind(comp_present))
+        not_equal[both_present] = KERNELS[kind](ref_present, comp_present)
+
+    return (ref_null != comp_null) | not_equal
+
+
+def consensus_differences(columns: List[pd.Series], presence: np.ndarray) -> np.ndarray:
+    """
+    Rows where the orgs holding a record disagree on one field
+    Every org is compared with the first org holding the record; columns are aligned on the
+    same keys and presence has one column per org
+    """
+    row_count = presence.shape[0]
+    reference = np.full(row_count, None, dtype=object)
+    assigned = np.zeros(row_count, dtype=bool)
+    for org_index, values in enumerate(columns):
+        take = presence[:, org_index] & ~assigned
+        reference[take] = values.to_numpy(dtype=object)[take]
+        assigned |= take
+
+    reference = pd.Series(reference).infer_objects()
+    differs = np.zeros(row_count, dtype=bool)
+    for org_index, values in enumerate(columns):
+        values = pd.Series(values.to_numpy(dtype=object)).infer_objects()
+        differs |= presence[:, org_index] & difference_mask(reference, values)
+    return differs
+
+
+def _float_not_equal(ref_values: pd.Series, comp_values: pd.Series) -> np.ndarray:
+    ref_array = ref_values.to_numpy(dtype=np.float64)
+    comp_array = comp_values.to_numpy(dtype=np.float64)
+    return ~np.isclose(ref_array, comp_array, rtol=FLOAT_RTOL, atol=FLOAT_ATOL, equal_nan=True)
+
+
+def _integer_not_equal(ref_values: pd.Series, comp_values: pd.Series) -> np.ndarray:
+    try:
+        return ref_values.to_numpy(dtype=np.int64) != comp_values.to_numpy(dtype=np.int64)
+    except OverflowError:  # Beyond 64 bits Python compares them exactly
+        return _object_not_equal(ref_values, comp_values)
+
+
+def _boolean_not_equal(ref_values: pd.Series, comp_values: pd.Series) -> np.ndarray:
+    return ref_values.to_numpy(dtype=bool) != comp_values.to_numpy(dtype=bool)
+
+
+def _datetime_not_equal(ref_values: pd.Series, comp_values: pd.Series) -> np.ndarray:
+    try:
+        ref_instants = to_utc(ref_values)
+        comp_instants = to_utc(comp_values)
+    except (ValueError, TypeError, OverflowError):
+        return _string_not_equal(ref_values.astype(str), comp_values.astype(str))
+    return ref_instants != comp_instants
+
+
+def to_utc(values: pd.Series) -> np.ndarray:
+    """Date-times as UTC nanoseconds; naive values are taken to be UTC already"""
+    if not isinstance(values.dtype, pd.DatetimeTZDtype) and not pd.api.types.is_datetime64_dtype(values):
+        values = pd.to_datetime(values, utc=True, format='ISO8601')
+    elif isinstance(values.dtype, pd.DatetimeTZDtype):
+        values = values.dt.tz_convert('UTC').dt.tz_localize(None)
+    return values.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+def _string_not_equal(ref_values: pd.Series, comp_values: pd.Series) -> np.ndarray:
+    ref_array = pa.array(ref_values, pa.large_string(), from_pandas=True)
+    comp_array = pa.array(comp_values, pa.large_string(), from_pandas=True)
+    return pc.not_equal(ref_array, comp_array).to_numpy(zero_copy_only=False)
+
+
+def _object_not_equal(ref_values: pd.Series, comp_values: pd.Series) -> np.ndarray:
+    return np.not_equal(ref_values.to_numpy(dtype=object), comp_values.to_numpy(dtype=object)).astype(bool)
+
+
+KERNELS = {
+    'float': _float_not_equal,
+    'integer': _integer_not_equal,
+    'boolean': _boolean_not_equal,
+    'datetime': _datetime_not_equal,
+    'string': _string_not_equal,
+    'other': _object_not_equal
+}
+
+
+def arrow_difference_mask(ref_values, comp_values) -> pa.Array:
+    """Arrow counterpart of difference_mask for two aligned arrays"""
+    ref_type, comp_type = ref_values.type, comp_values.type
+    null_differs = pc.not_equal(pc.is_null(ref_values), pc.is_null(comp_values))
+
+    if _is_numeric(ref_type) and _is_numeric(comp_type) and \
+            (pa.types.is_floating(ref_type) or pa.types.is_floating(comp_type)):
+        ref_float = pc.cast(ref_values, pa.float64())
+        comp_float = pc.cast(comp_values, pa.float64())
+        # |a - b| > atol + rtol * |b|, as np.isclose; NaN only matches NaN
+        distance = pc.abs(pc.subtract(ref_float, comp_float))
+        not_equal = pc.greater(distance, pc.add(pc.multiply(pc.abs(comp_float), FLOAT_RTOL), FLOAT_ATOL))
+        both_nan = pc.and_(pc.is_nan(ref_float), pc.is_nan(comp_float))
+        either_nan = pc.or_(pc.is_nan(ref_float), pc.is_nan(comp_float))
+        not_equal = pc.if_else(either_nan, pc.invert(both_nan), not_equal)
+    elif pa.types.is_timestamp(ref_type) and pa.types.is_timestamp(comp_type):
+        not_equal = pc.not_equal(pc.cast(ref_values, pa.timestamp('ns', 'UTC')),
+                                 pc.cast(comp_values, pa.timestamp('ns', 'UTC')))
+    elif _is_text(ref_type) and _is_text(comp_type) and \
+            arrow_looks_like_datetime(ref_values) and arrow_looks_like_datetime(comp_values):
+        not_equal = pa.array(_datetime_not_equal(pd.Series(ref_values.to_pandas()), pd.Series(comp_values.to_pandas())))
+    else:
+        try:
+            not_equal = pc.not_equal(ref_values, comp_values)
+        except (pa.ArrowNotImplementedError, pa.ArrowInvalid):
+            # Types with no common kernel are compared as text
+            not_equal = pc.not_equal(pc.cast(ref_values, pa.large_string()), pc.cast(comp_values, pa.large_string()))
+
+    return pc.or_(null_differs, pc.fill_null(not_equal, False))
+
+
+def _is_numeric(arrow_type) -> bool:
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type)
+
+
+def _is_text(arrow_type) -> bool:
+    return pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)
+
+
+def arrow_looks_like_datetime(values) -> bool:
+    """Arrow counterpart of looks_like_datetime for a text array"""
+    present = values.drop_null()
+    if not len(present) or not re.match(DATETIME_PATTERN, present[0].as_py()):
+        return False
+    return pc.all(pc.match_substring_regex(present, DATETIME_PATTERN)).as_py()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped Arrow IPC cache tier for extracted object files
+<object>.arrow next to a Parquet or JSONL extract holds the whole file as one uncompressed
+Arrow table. Opening it maps the file instead of decompressing Parquet or parsing JSONL,
+so reloads are close to free and every process reading it shares the OS page cache
+"""
+
+import os
+import json
+from typing import Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+CACHE_EXTENSION = '.arrow'
+SOURCE_METADATA_KEY = b'cpq_toolset.sources'  # Size and mtime of each file the cache stands for
+
+
+def cache_path(source_file) -> str:
+    """IPC cache file belonging to a source file"""
+    return os.path.splitext(str(source_file))[0] + CACHE_EXTENSION
+
+
+def _source_stamp(source_file) -> dict:
+    stat = os.stat(source_file)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def read_table(source_file, columns: Optional[List[str]] = None) -> Optional[pa.Table]:
+    """
+    Memory-map the cache of a source file, or None when there is none or the source changed since
+    Columns missing from the cache are skipped; the returned buffers point into the mapped file
+    """
+    path = cache_path(source_file)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        stamps = json.loads((table.schema.metadata or {}).get(SOURCE_METADATA_KEY, b'{}'))
+        if stamps.get(os.path.basename(str(source_file))) != _source_stamp(source_file):
+            return None
+    except (OSError, ValueError, pa.ArrowInvalid):
+        return None
+
+    if columns is not None:
+        table = table.select([col for col in columns if col in table.column_names])
+    return table
+
+
+def read_frame(source_file, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    """The cache of a source file as a DataFrame, converted as pandas would read the source"""
+    table = read_table(source_file, columns)
+    return table.to_pandas() if table is not None else None
+
+
+def write_table(source_files: Iterable, table: pa.Table):
+    """
+    Store the full table of one or more equivalent source files (a JSONL extract and its Parquet
+    copy) as their cache, replacing any previous one atomically
+    """
+    source_files = list(source_files)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SOURCE_METADATA_KEY] = json.dumps({
+        os.path.basename(str(source_file)): _source_stamp(source_file) for source_file in source_files
+    }).encode('utf-8')
+    table = table.replace_schema_metadata(metadata)
+
+    path = cache_path(source_files[0])
+    temp_path = path + '.tmp'
+    # Uncompressed, so reads map the buffers instead of decoding them
+    with pa.OSFile(temp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, path)
+
+
+def write_frame(source_files: Iterable, df: pd.DataFrame):
+    """Store the full DataFrame of one or more equivalent source files as their cache"""
+    write_table(source_files, pa.Table.from_pandas(df, preserve_index=False))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Key-set filtering of records while they are loaded
+A KeyFilter keeps the records whose key is in an include list, when one is given, and not in
+an exclude list. Lists up to a threshold are matched with hash-set lookups; longer lists, such
+as blacklists built up by bulk duplicate skips, go through a Bloom filter built once so that
+each load costs one vectorized hash of its keys however long the list is
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+class BloomFilter:
+    """
+    Bit array telling which keys may be in a set and which certainly are not
+    Ten bits and seven hashes per key give about 1% false positives
+    """
+
+    BITS_PER_KEY = 10
+    HASHES = 7
+
+    def __init__(self, keys: np.ndarray):
+        self.size = max(64, len(keys) * self.BITS_PER_KEY)
+        bits = np.zeros(self.size, dtype=bool)
+        bits[self._positions(keys).ravel()] = True
+        self.bits = np.packbits(bits)
+
+    def might_contain(self, keys: np.ndarray) -> np.ndarray:
+        positions = self._positions(keys)
+        found = (self.bits[positions >> np.uint64(3)] >> (np.uint64(7) - (positions & np.uint64(7))).astype(np.uint8)) & 1
+        return found.all(axis=1)
+
+    def _positions(self, keys: np.ndarray) -> np.ndarray:
+        """Bit positions per key, from two halves of one 64-bit hash (Kirsch-Mitzenmacher)"""
+        hashes = pd.util.hash_array(keys.astype(object), categorize=False)
+        step = (hashes >> np.uint64(32)) | np.uint64(1)
+        rounds = np.arange(self.HASHES, dtype=np.uint64)
+        return (hashes[:, None] + rounds[None, :] * step[:, None]) % np.uint64(self.size)
+
+
+class _KeySet:
+    """Membership test for one key list: hash-set lookups, or a Bloom filter confirmed exactly"""
+
+    def __init__(self, keys: Iterable[str], bloom_threshold: int):
+        self.keys = frozenset(keys)
+        self.values = np.array(sorted(self.keys), dtype=object)
+        self.bloom = BloomFilter(self.values) if len(self.values) > bloom_threshold else None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def contains(self, keys: np.ndarray) -> np.ndarray:
+        """Which of the given key strings are in the set"""
+        if self.bloom is None:
+            return pd.Series(keys, dtype=object).isin(self.values).to_numpy()
+
+        # Only Bloom filter hits, mostly true members, are looked up one by one
+        found = self.bloom.might_contain(keys)
+        candidates = np.flatnonzero(found)
+        found[candidates] = [key in self.keys for key in keys[candidates]]
+        return found
+
+
+class KeyFilter:
+    """
+    Records to keep by key: in the include list when there is one, and not in the exclude list
+    Keys are matched by their text form; a null key is never excluded and never included
+    """
+
+    BLOOM_THRESHOLD = 100000  # Key lists longer than this are matched through a Bloom filter
+
+    def __init__(self, include: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None,
+                 bloom_threshold: Optional[int] = None):
+        threshold = bloom_threshold if bloom_threshold is not None else self.BLOOM_THRESHOLD
+        self.include = _KeySet(include, threshold) if include is not None else None
+        self.exclude = _KeySet(exclude, threshold) if exclude else None
+
+    @property
+    def active(self) -> bool:
+        return self.include is not None or self.exclude is not None
+
+    def keep_mask(self, keys: pd.Series) -> np.ndarray:
+        """Which records of a key column pass the filter"""
+        present = keys.notna().to_numpy()
+        keep = np.ones(len(keys), dtype=bool) if self.include is None else np.zeros(len(keys), dtype=bool)
+        if not present.any() or not self.active:
+            return keep
+
+        key_text = keys[present].astype(str).to_numpy(dtype=object)
+        kept = np.ones(len(key_text), dtype=bool)
+        if self.include is not None:
+            kept &= self.include.contains(key_text)
+        if self.exclude is not None:
+            kept &= ~self.exclude.contains(key_text)
+        keep[present] = kept
+        return keep
+
+    def filter_table(self, table: pa.Table, key_field: str) -> pa.Table:
+        """Records of an Arrow table that pass the filter; a table without the key column has null keys"""
+        if not self.active:
+            return table
+        if key_field not in table.column_names:
+            return table if self.include is None else table.slice(0, 0)
+        keep = self.keep_mask(table[key_field].to_pandas())
+        return table if keep.all() else table.filter(pa.array(keep))
+
+    def scan_filter(self, key_field: str, key_type: pa.DataType) -> Optional[pc.Expression]:
+        """
+        The filter as a Parquet scan predicate, or None when it has to run after the read:
+        keys that are not text, or lists long enough for the Bloom filter
+        """
+        if not self.active or not (pa.types.is_string(key_type) or pa.types.is_large_string(key_type)):
+            return None
+        if any(key_set.bloom is not None for key_set in (self.include, self.exclude) if key_set is not None):
+            return None
+
+        key = pc.field(key_field)
+        predicate = None
+        if self.include is not None:
+            predicate = key.isin(self.include.values.tolist())
+        if self.exclude is not None:
+            excluded = key.is_null() | ~key.isin(self.exclude.values.tolist())
+            predicate = excluded if predicate is None else predicate & excluded
+        return predicate
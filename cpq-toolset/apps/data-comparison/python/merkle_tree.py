@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Merkle trees over one org's records of an object, to find the key ranges that differ between orgs
+Records are placed in key ranges of the foreign keys sorted across all orgs, so every org's tree
+has the same shape. A leaf hashes the records of its range and each inner node sums its two
+children, which makes the root a hash of the whole record set that needs no sorting at all:
+objects whose roots match are identical, and otherwise only ranges whose hashes differ are compared
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+LEAF_KEYS = 1024  # Keys per leaf range
+
+
+def record_hashes(record_digests: np.ndarray) -> np.ndarray:
+    """
+    Mixed hash per record digest
+    Summing mixed digests keeps equal record sets equal in any order, without duplicates cancelling
+    """
+    return pd.util.hash_array(np.asarray(record_digests, dtype=np.uint64))
+
+
+def root_hash(hashes: np.ndarray) -> np.uint64:
+    """Root of a record set's tree, whatever its key ranges"""
+    return np.add.reduce(hashes, dtype=np.uint64)
+
+
+def key_ranges(org_codes: Sequence[np.ndarray], key_order: np.ndarray,
+               leaf_keys: int = LEAF_KEYS) -> Tuple[List[np.ndarray], int]:
+    """
+    Key range of every record of each org, and how many ranges there are
+    org_codes hold each record's key code, shared by all orgs, and key_order the codes in sorted
+    key order; a range is a run of leaf_keys keys of that order, so every org shares the ranges
+    """
+    rank = np.empty(len(key_order), dtype=np.int64)
+    rank[key_order] = np.arange(len(key_order))
+    range_count = max(1, -(-len(key_order) // leaf_keys))
+    return [rank[codes] // leaf_keys for codes in org_codes], range_count
+
+
+class MerkleTree:
+    """Sum tree over the record hashes of one org, one leaf per key range"""
+
+    def __init__(self, leaf_of_record: np.ndarray, hashes: np.ndarray, leaf_count: int):
+        self.leaf_of_record = leaf_of_record
+        leaves = np.zeros(leaf_count, dtype=np.uint64)
+        np.add.at(leaves, leaf_of_record, hashes)
+
+        # levels[0] holds the leaves, the last level the root
+        self.levels = [leaves]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            if len(level) % 2:
+                level = np.append(level, np.uint64(0))
+            self.levels.append(level[0::2] + level[1::2])
+
+    @property
+    def root(self) -> np.uint64:
+        return self.levels[-1][0]
+
+
+def differing_leaves(trees: List[MerkleTree]) -> np.ndarray:
+    """Leaves whose hash is not the same in every tree, descending only into differing nodes"""
+    nodes = np.zeros(1, dtype=np.int64)
+    for depth in range(len(trees[0].levels) - 1, -1, -1):
+        level_size = len(trees[0].levels[depth])
+        nodes = nodes[nodes < level_size]
+        hashes = np.stack([tree.levels[depth][nodes] for tree in trees])
+        nodes = nodes[(hashes != hashes[0]).any(axis=0)]
+        if depth and len(nodes):
+            nodes = np.concatenate([2 * nodes, 2 * nodes + 1])
+            nodes.sort()
+    return nodes
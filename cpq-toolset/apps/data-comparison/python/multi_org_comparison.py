@@ -15,6 +15,7 @@ import json
 import argparse
 import logging
 import gc
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -25,8 +26,12 @@ import dask.dataframe as dd
 class SalesforceDataComparator:
     """Compare Salesforce data across multiple organizations with detailed field-level analysis."""
     
-    def __init__(self, chunk_size: int = 50000, exclude_fields: List[str] = None):
+    def __init__(self, chunk_size: int = 50000, exclude_fields: List[str] = None, workers: int = 1):
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        
         self.chunk_size = chunk_size
+        self.workers = workers
         self.logger = self._setup_logging()
         self.discovered_orgs = []
         self.common_objects = []
@@ -352,15 +357,15 @@ class SalesforceDataComparator:
             # Compare common records
             field_differences = {}
             if len(common_keys) > 0:
-                field_differences = self._compare_common_records(ref_df, comp_df, list(common_keys))
+                field_differences = self._compare_common_records(ref_df, comp_df, sorted(common_keys, key=str))
             
             return {
                 "record_counts": {
                     "common": len(common_keys),
                     f"{ref_instance}_only": len(ref_only),
                     f"{comp_instance}_only": len(comp_only),
-                    "ref_only_sample": list(ref_only)[:10],
-                    "comp_only_sample": list(comp_only)[:10]
+                    "ref_only_sample": sorted(ref_only, key=str)[:10],
+                    "comp_only_sample": sorted(comp_only, key=str)[:10]
                 },
                 "field_differences": field_differences
             }
@@ -372,7 +377,7 @@ class SalesforceDataComparator:
     def _compare_common_records(self, ref_df: pd.DataFrame, comp_df: pd.DataFrame, common_keys: List) -> Dict:
         """Compare field values for records that exist in both instances."""
         field_differences = {}
-        common_columns = list(set(ref_df.columns) & set(comp_df.columns))
+        common_columns = sorted(set(ref_df.columns) & set(comp_df.columns))
         
         for column in common_columns:
             try:
@@ -596,13 +601,43 @@ class SalesforceDataComparator:
         
         all_object_results = {}
         
+        # Send objects to a process pool, largest first; results are still collected in request order
+        if self.workers > 1 and len(objects_with_foreign_keys) > 1:
+            schedule = sorted(objects_with_foreign_keys,
+                              key=lambda obj: self._object_input_bytes(base_path, obj), reverse=True)
+            pool_size = min(self.workers, len(schedule))
+            self.logger.info(f"Comparing {len(schedule)} objects on {pool_size} worker processes, largest first: {schedule}")
+            with ProcessPoolExecutor(max_workers=pool_size) as executor:
+                object_futures = {
+                    sf_object: executor.submit(_compare_object_worker, self, base_path, sf_object)
+                    for sf_object in schedule
+                }
+                self._collect_object_results(base_path, objects_with_foreign_keys, object_futures,
+                                             all_object_results, overall_summary)
+        else:
+            self._collect_object_results(base_path, objects_with_foreign_keys, {},
+                                         all_object_results, overall_summary)
+        
+        overall_summary['total_execution_time'] = (datetime.now() - start_time).total_seconds()
+        
+        return {
+            'execution_summary': overall_summary,
+            'object_results': all_object_results
+        }
+    
+    def _collect_object_results(self, base_path: str, objects: List[str], object_futures: Dict,
+                                all_object_results: Dict, overall_summary: Dict):
+        """Gather each object's result in order, from its worker future or by comparing it here."""
         # Process each object
-        for sf_object in objects_with_foreign_keys:
+        for sf_object in objects:
             try:
                 self.logger.info(f"Processing {sf_object}")
                 object_start = datetime.now()
                 
-                object_result = self.compare_single_object_all_instances(base_path, sf_object)
+                if sf_object in object_futures:
+                    object_result = object_futures.pop(sf_object).result()
+                else:
+                    object_result = self.compare_single_object_all_instances(base_path, sf_object)
                 all_object_results[sf_object] = object_result
                 
                 if object_result.get('status') == 'completed':
@@ -623,13 +658,18 @@ class SalesforceDataComparator:
                     "status": "error", 
                     "reason": str(e)
                 }
-        
-        overall_summary['total_execution_time'] = (datetime.now() - start_time).total_seconds()
-        
-        return {
-            'execution_summary': overall_summary,
-            'object_results': all_object_results
-        }
+    
+    def _object_input_bytes(self, base_path: str, sf_object: str) -> int:
+        """Size on disk of the file each org would load for an object, used for largest-first scheduling."""
+        total_bytes = 0
+        for org in self.discovered_orgs:
+            # Same precedence as _load_sf_object_data
+            for extension in ('parquet', 'csv', 'jsonl'):
+                file_path = os.path.join(base_path, org, f"{sf_object}.{extension}")
+                if os.path.exists(file_path):
+                    total_bytes += os.path.getsize(file_path)
+                    break
+        return total_bytes
     
     def export_comparison_report(self, results: Dict, output_dir: str = "sf_comparison_results"):
         """Export comprehensive comparison reports with detailed field-by-field analysis."""
@@ -869,6 +909,11 @@ class SalesforceDataComparator:
             raise
 
 
+def _compare_object_worker(comparator: SalesforceDataComparator, base_path: str, sf_object: str) -> Dict:
+    """Process-pool entry point: compare one object with a copy of the parent comparator."""
+    return comparator.compare_single_object_all_instances(base_path, sf_object)
+
+
 def main():
     """Main execution function."""
     parser = argparse.ArgumentParser(
@@ -880,6 +925,7 @@ def main():
     parser.add_argument('--output-dir', type=str, default='sf_comparison_results', help='Output directory')
     parser.add_argument('--exclude-fields', nargs='*', 
                        help='Additional fields to exclude from comparison (e.g., --exclude-fields CustomField1__c CustomField2__c)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for comparing objects in parallel')
     
     args = parser.parse_args()
     
@@ -892,7 +938,8 @@ def main():
         # Initialize comparator with exclusions
         comparator = SalesforceDataComparator(
             chunk_size=args.chunk_size,
-            exclude_fields=args.exclude_fields
+            exclude_fields=args.exclude_fields,
+            workers=args.workers
         )
         
         print("Starting Salesforce Multi-Instance Data Comparison")
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Arrow-native engine for the multi-org comparison
+Keeps every object as pyarrow Tables from load to CSV output, using Arrow compute
+kernels for record signatures, keyed lookups, equality masks and filtering
+"""
+
+import io
+import os
+import json
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+from typing import Dict, List, Optional, Tuple
+
+import canonical_forms
+import field_kernels
+from multi_org_comparison_optimized import StreamingSalesforceDataComparator
+
+
+class ArrowSalesforceDataComparator(StreamingSalesforceDataComparator):
+    """
+    Same discovery, scheduling and output layout as the pandas engine
+    Cells stay in Arrow buffers instead of Python objects, which keeps text-heavy objects small
+    """
+
+    ENGINE = 'arrow'
+    NULL_TOKEN = '\x00'  # Stands in for null in record signatures
+    SIGNATURE_SEPARATOR = '\x1f'
+    NULL_SORT_KEY = '\U0010ffff'  # Sorts after any key text, where Arrow places nulls
+    HELPER_COLUMNS = ['_pair', '_row', '_field']
+    CSV_SPECIAL_CHARACTERS = r'[,"\r\n]'  # Values that may need quoting in all_differences.csv
+
+    def _load_org_frame(self, base_path: str, org: str, object_name: str) -> Optional[pa.Table]:
+        """Load and prepare one org's records of an object as an Arrow table"""
+        primary_key = self.foreign_key_mappings[object_name]
+        with self.metrics.phase('load', object_name, org) as counts:
+            table = self._load_sf_object_table(base_path, org, object_name, primary_key)
+            if table is not None:
+                counts['rows'] = table.num_rows
+                counts['bytes'] = self._org_input_bytes(base_path, org, object_name)
+
+        if table is None or table.num_rows == 0:
+            return None
+
+        with self.metrics.phase('key_build', object_name, org):
+            org_table = self._prepare_org_table(table, object_name, org, primary_key)
+        self.logger.debug(f"Added {org_table.num_rows} records for {object_name}/{org}")
+        return org_table
+
+    def _load_partition_frame(self, partitioner, bucket: int, org: str, object_name: str) -> Optional[pa.Table]:
+        """Load and prepare one org's records of a partition as an Arrow table"""
+        bucket_file = partitioner.bucket_file(bucket, org)
+        if bucket_file is None:
+            return None
+
+        with self.metrics.phase('load', object_name, org) as counts:
+            if bucket_file.endswith('.parquet'):
+                table = pq.read_table(bucket_file)
+            else:
+                table = pa.Table.from_pandas(partitioner.read_bucket(bucket, org), preserve_index=False)
+            counts['rows'] = table.num_rows
+            counts['bytes'] = os.path.getsize(bucket_file)
+
+        if table.num_rows == 0:
+            return None
+        with self.metrics.phase('key_build', object_name, org):
+            return self._prepare_org_table(table, object_name, org, self.foreign_key_mappings[object_name])
+
+    def _sort_keys(self, keys: pd.Series) -> np.ndarray:
+        """String form of foreign key values in Arrow's sort order, nulls last"""
+        return np.where(keys.isna().to_numpy(), self.NULL_SORT_KEY, keys.to_numpy(dtype=object).astype(str))
+
+    def _load_sf_object_table(self, base_path: str, org: str, sf_object: str, key_field: str) -> Optional[pa.Table]:
+        """Load Salesforce object data from parquet, JSONL or CSV straight into Arrow"""
+        parquet_file = os.path.join(base_path, org, f"{sf_object}.parquet")
+        jsonl_file = os.path.join(base_path, org, f"{sf_object}.jsonl")
+        csv_file = os.path.join(base_path, org, f"{sf_object}.csv")
+
+        try:
+            cached_table = self._read_ipc_cache(base_path, org, sf_object, key_field)
+            if cached_table is not None:
+                return cached_table
+
+            if os.path.exists(parquet_file):
+                self.logger.debug(f"Loading parquet: {parquet_file}")
+                self._write_ipc_cache([parquet_file])
+                return self._read_parquet_table(parquet_file, sf_object, key_field)
+
+            elif os.path.exists(jsonl_file):
+                # The first read goes through the shared JSONL loader so both engines use the same parquet cache
+                df = self._load_sf_object_data(base_path, org, sf_object, key_field)
+                return pa.Table.from_pandas(df, preserve_index=False) if df is not None else None
+
+            elif os.path.exists(csv_file):
+                self.logger.debug(f"Loading CSV: {csv_file}")
+                with open(csv_file, 'r') as f:
+                    header = f.readline().rstrip('\r\n').split(',')
+                columns = self._projected_columns(sf_object, key_field, header)
+                table = pv.read_csv(csv_file, convert_options=pv.ConvertOptions(
+                    include_columns=columns,
+                    column_types={col: pa.large_string() for col in columns}
+                ))
+                return self._filter_blacklisted_rows(table, sf_object, key_field, csv_file)
+
+            else:
+                return None
+
+        except Exception as e:
+            self.logger.error(f"Error loading {sf_object} for {org}: {e}")
+            return None
+
+    def _read_parquet_table(self, parquet_file: str, sf_object: str, key_field: str) -> pa.Table:
+        """Read only the compared columns of a Parquet file, dropping blacklisted keys in the scan"""
+        schema = pq.read_schema(parquet_file)
+        columns = self._projected_columns(sf_object, key_field, schema.names)
+
+        key_filter = self._key_filter(sf_object)
+        filters = key_filter.scan_filter(key_field, schema.field(key_field).type) if key_field in columns else None
+        table = pq.read_table(parquet_file, columns=columns, filters=filters)
+        if filters is None:
+            table = self._filter_blacklisted_rows(table, sf_object, key_field, parquet_file)
+        return table
+
+    def _prepare_org_table(self, table: pa.Table, object_name: str, org: str, primary_key: str) -> pa.Table:
+        """Keep the key and compared fields of one org's records"""
+        if primary_key in table.column_names:
+            keys = self._string_column(table[primary_key])
+        else:
+            keys = pa.chunked_array([pa.nulls(table.num_rows, pa.large_string())])
+        table = self._translate_lookup_columns(table, object_name, org)
+
+        compare_fields = self._get_compare_fields(table.column_names, object_name)
+        columns = {'primary_key': keys}
+        for field_name in compare_fields:
+            columns[field_name] = self._canonical_nested(table[field_name])
+        return pa.table(columns)
+
+    def _translate_lookup_columns(self, table: pa.Table, object_name: str, org: str) -> pa.Table:
+        """Arrow side of _translate_lookups; an object has few lookups, so they share the pandas join"""
+        for field_name, lookup in self.lookup_fields.get(object_name, {}).items():
+            ids = table[lookup['field']].to_pandas() if lookup['field'] in table.column_names else None
+            related = table[lookup['relationship']].to_pandas() if lookup['relationship'] in table.column_names else None
+            if ids is None and related is None:
+                continue
+
+            portable = self._portable_lookup_values(ids, related, lookup, org)
+            portable = pa.array(portable.to_numpy(dtype=object), from_pandas=True)
+            for col in ([field_name, lookup['field']] if ids is not None else [field_name]):
+                if col in table.column_names:
+                    table = table.set_column(table.column_names.index(col), col, portable)
+                else:
+                    table = table.append_column(col, portable)
+        return table
+
+    def _apply_canonical_forms(self, object_name: str, org_tables: Dict[str, pa.Table]) -> Dict[str, pa.Table]:
+        """Arrow side of the pandas method, adding record signatures instead of digests"""
+        fields = []
+        for table in org_tables.values():
+            fields.extend(f for f in self._get_compare_fields(table.column_names, object_name) if f not in fields)
+
+        for field_name in fields:
+            holders = [org for org, table in org_tables.items() if field_name in table.column_names]
+            columns = canonical_forms.arrow_canonical_columns([org_tables[org][field_name] for org in holders])
+            for org, column in zip(holders, columns):
+                table = org_tables[org]
+                org_tables[org] = table.set_column(table.column_names.index(field_name), field_name, column)
+
+        return {
+            org: table.append_column('_sig', self._record_signatures(table, self._get_compare_fields(table.column_names, object_name)))
+            for org, table in org_tables.items()
+        }
+
+    def _encode_shared_dictionaries(self, object_name: str, org_tables: Dict[str, pa.Table]) -> Dict[str, pa.Table]:
+        """Arrow string buffers hold no Python objects and are compared by kernels, so tables stay as loaded"""
+        return org_tables
+
+    def _canonical_nested(self, column: pa.ChunkedArray) -> pa.ChunkedArray:
+        """Turn struct/list cells into canonical JSON strings so they can be compared"""
+        if not pa.types.is_nested(column.type):
+            return column
+
+        return pa.chunked_array([pa.array(
+            [json.dumps(value, sort_keys=True) if value is not None else None for value in column.to_pylist()],
+            pa.large_string()
+        )])
+
+    def _string_column(self, column: pa.ChunkedArray) -> pa.ChunkedArray:
+        """Render a column as text, spelling booleans the way the pandas engine writes them"""
+        if pa.types.is_large_string(column.type):
+            return column
+        if pa.types.is_boolean(column.type):
+            return pc.if_else(column, 'True', 'False').cast(pa.large_string())
+        return pc.cast(column, pa.large_string())
+
+    def _record_signatures(self, table: pa.Table, fields: List[str]) -> pa.ChunkedArray:
+        """
+        Join the key and every compared field into one string per record
+        Sorted so the signature does not depend on column order, equal signatures mean equal records
+        """
+        parts = [pc.fill_null(self._string_column(table[col]), self.NULL_TOKEN)
+                 for col in ['primary_key'] + sorted(fields)]
+        return pc.binary_join_element_wise(*parts, pa.scalar(self.SIGNATURE_SEPARATOR, pa.large_string()))
+
+    def _first_rows(self, column: pa.ChunkedArray) -> pa.Array:
+        """Positions of the first record holding each non-null value"""
+        first = pc.index_in(column, value_set=column.combine_chunks(), skip_nulls=True)
+        is_first = pc.fill_null(pc.equal(first, pa.array(np.arange(len(column)))), False)
+        return self._nonzero(is_first)
+
+    def _nonzero(self, mask) -> pa.Array:
+        """Positions of the true values of a boolean mask"""
+        # indices_nonzero has no chunked kernel, so masks are combined into one array first
+        if isinstance(mask, pa.ChunkedArray):
+            mask = mask.combine_chunks()
+        return pc.indices_nonzero(mask)
+
+    def _frame_bytes(self, frame: pa.Table) -> int:
+        """In-memory size of one org's prepared table"""
+        return frame.nbytes
+
+    def _record_digests(self, org_tables: Dict[str, pa.Table]) -> Dict[str, np.ndarray]:
+        """Codes of the record signatures in one dictionary shared by every org"""
+        org_codes, _ = self._shared_codes([table['_sig'] for table in org_tables.values()])
+        return dict(zip(org_tables, org_codes))
+
+    def _record_key_codes(self, org_tables: Dict[str, pa.Table]) -> Optional[Tuple[Dict[str, np.ndarray], np.ndarray]]:
+        """Arrow side of the pandas method: keys are coded and sorted without leaving Arrow buffers"""
+        if any(table['primary_key'].null_count for table in org_tables.values()):
+            return None
+        org_codes, keys = self._shared_codes([table['primary_key'] for table in org_tables.values()])
+        return dict(zip(org_tables, org_codes)), pc.array_sort_indices(keys).to_numpy()
+
+    def _shared_codes(self, columns: List[pa.ChunkedArray]) -> Tuple[List[np.ndarray], pa.Array]:
+        """Codes of the values of several text columns in one dictionary, and that dictionary"""
+        # Chunks of one chunked array are encoded against one growing dictionary
+        encoded = pc.dictionary_encode(pa.chunked_array([chunk for column in columns for chunk in column.chunks],
+                                                        pa.large_string()))
+        if not encoded.num_chunks:
+            return [np.array([], dtype=np.int32) for _ in columns], pa.array([], pa.large_string())
+        codes = np.concatenate([chunk.indices.to_numpy() for chunk in encoded.chunks])
+        return np.split(codes, np.cumsum([len(column) for column in columns])[:-1]), encoded.chunks[-1].dictionary
+
+    def _frame_rows(self, frame: pa.Table, mask: np.ndarray) -> pa.Table:
+        return frame.filter(pa.array(mask))
+
+    def compare_object(self, object_name: str, org_frames: Dict[str, pa.Table],
+                       org_list: List[str]) -> pa.Table:
+        """Compare one object across orgs using the configured comparison mode"""
+        org_frames = self._differing_key_ranges(object_name, org_frames, org_list)
+        if self.comparison_mode == 'consensus':
+            differences = self._diff_tables_consensus(object_name, org_frames, org_list)
+        else:
+            differences = self._diff_tables_pairwise(object_name, org_frames, org_list)
+
+        self.logger.info(f"Compared {object_name}: {differences.num_rows} differences")
+        return differences
+
+    def _compare_object_incremental(self, object_name: str, org_frames: Dict[str, pa.Table]) -> pa.Table:
+        """Record indexes are built from pandas record digests, so the arrow engine compares in full"""
+        self.logger.warning(f"Incremental comparison is not available with the arrow engine - comparing {object_name} in full")
+        return self.compare_object(object_name, org_frames, self.discovered_orgs)
+
+    def _diff_tables_pairwise(self, object_name: str, org_tables: Dict[str, pa.Table],
+                              org_list: List[str]) -> pa.Table:
+        """Compare one object for every ordered org pair using signature hash sets"""
+        with self.metrics.phase('set_comparison', object_name):
+            org_signatures = {org: pc.unique(table['_sig']) for org, table in org_tables.items()}
+        pieces = []
+        pair_position = 0
+
+        for ref_org in org_list:
+            for comp_org in org_list:
+                if ref_org == comp_org:
+                    continue
+                pair_position += 1
+
+                ref = org_tables.get(ref_org)
+                if ref is None:
+                    continue
+                comp = org_tables.get(comp_org)
+
+                # Records with an identical record in the compared org drop out, one record per signature remains
+                with self.metrics.phase('set_comparison', object_name):
+                    first_rows = self._first_rows(ref['_sig'])
+                    if comp is not None:
+                        differs = pc.invert(pc.is_in(ref['_sig'].take(first_rows), value_set=org_signatures[comp_org]))
+                        candidate_rows = first_rows.filter(differs)
+                    else:
+                        candidate_rows = first_rows
+                if len(candidate_rows):
+                    with self.metrics.phase('field_diff', object_name):
+                        pieces.extend(self._diff_candidates(
+                            ref.take(candidate_rows), comp, ref_org, comp_org, object_name, org_list, pair_position
+                        ))
+
+        with self.metrics.phase('field_diff', object_name):
+            return self._ordered_differences(pieces, ['ForeignKeyValue', '_pair', '_row', '_field'])
+
+    def _diff_candidates(self, candidates: pa.Table, comp: Optional[pa.Table], ref_org: str,
+                         comp_org: str, object_name: str, org_list: List[str], pair_position: int) -> List[pa.Table]:
+        """Look candidate records up by key in the compared org and diff every field"""
+        if comp is None:
+            comp = pa.table({'primary_key': pa.array([], pa.large_string())})
+
+        # Only fields holding data on either side can differ
+        populated_columns = [col for col in candidates.column_names
+                             if candidates[col].null_count < candidates.num_rows
+                             or (col in comp.column_names and comp[col].null_count < comp.num_rows)]
+        fields_to_compare = [f for f in self._get_compare_fields(populated_columns, object_name)
+                             if f in comp.column_names]
+
+        # Hash lookup of each candidate key among the compared org's keys, first record per key
+        positions = pc.index_in(candidates['primary_key'], value_set=comp['primary_key'].combine_chunks(),
+                                skip_nulls=True)
+        matched = pc.is_valid(positions)
+        rows = pa.array(np.arange(candidates.num_rows))
+        pieces = []
+
+        # Records missing in compared org
+        missing = pc.invert(matched)
+        if pc.any(missing).as_py():
+            missing_count = pc.sum(missing).as_py()
+            pieces.append(self._difference_table(
+                object_name, object_name, 'RECORD_MISSING', candidates['primary_key'].filter(missing),
+                {ref_org: pa.repeat('EXISTS', missing_count), comp_org: pa.repeat('MISSING', missing_count)},
+                org_list, pair_position, rows.filter(missing), -1
+            ))
+
+        # Field-level differences for records present in both orgs
+        present = candidates.filter(matched)
+        present_rows = rows.filter(matched)
+        comp_present = comp.take(positions.filter(matched))
+        for position, field_name in enumerate(fields_to_compare):
+            diff_rows = self._nonzero(self._field_difference_mask(present[field_name], comp_present[field_name]))
+            if len(diff_rows):
+                pieces.append(self._difference_table(
+                    object_name, f"{object_name}.{field_name}", 'VALUE_DIFFERENCE',
+                    present['primary_key'].take(diff_rows),
+                    {ref_org: present[field_name].take(diff_rows), comp_org: comp_present[field_name].take(diff_rows)},
+                    org_list, pair_position, present_rows.take(diff_rows), position
+                ))
+
+        return pieces
+
+    def _field_difference_mask(self, ref_values, comp_values) -> pa.Array:
+        """Null-aware inequality using the comparison kernel for the field's value types"""
+        return field_kernels.arrow_difference_mask(ref_values, comp_values)
+
+    def _diff_tables_consensus(self, object_name: str, org_tables: Dict[str, pa.Table],
+                               org_list: List[str]) -> pa.Table:
+        """Compare one object across all orgs at once, one row per differing (key, field)"""
+        with self.metrics.phase('set_comparison', object_name):
+            # First record per key in each org, records without a key are skipped
+            keyed = {}
+            for org in org_list:
+                if org in org_tables:
+                    table = org_tables[org]
+                    keyed[org] = table.take(self._first_rows(table['primary_key']))
+                    skipped = table['primary_key'].null_count
+                    if skipped:
+                        self.logger.warning(f"Skipping {skipped} {object_name} records without a foreign key value in {org}")
+            if not keyed:
+                return self._ordered_differences([], ['_row', '_field'])
+
+            all_keys = pc.unique(pa.chunked_array([table['primary_key'] for table in keyed.values()],
+                                                  pa.large_string()))
+
+            # Position of every key in each org, null where the org has no such record
+            positions = {org: pc.index_in(all_keys, value_set=table['primary_key'].combine_chunks())
+                         for org, table in keyed.items()}
+            presence = {org: pc.is_valid(positions[org]) if org in positions else pa.repeat(False, len(all_keys))
+                        for org in org_list}
+
+            # Keys whose record exists in every org with one signature are identical everywhere
+            signatures = [keyed[org]['_sig'].take(positions[org]) for org in keyed]
+            reference_signature = pc.coalesce(*signatures)
+            differing = pc.invert(self._all(list(presence.values())))
+            for signature in signatures:
+                differing = pc.or_(differing, pc.fill_null(pc.not_equal(signature, reference_signature), False))
+
+            differing_keys = self._nonzero(differing)
+            differing_keys = differing_keys.take(pc.sort_indices(all_keys.take(differing_keys)))
+        if not len(differing_keys):
+            return self._ordered_differences([], ['_row', '_field'])
+
+        with self.metrics.phase('field_diff', object_name):
+            keys = all_keys.take(differing_keys)
+            presence = {org: present.take(differing_keys) for org, present in presence.items()}
+            positions = {org: position.take(differing_keys) for org, position in positions.items()}
+            rows = pa.array(np.arange(len(keys)))
+            pieces = []
+
+            # One RECORD_MISSING row per key absent from at least one org
+            missing = pc.invert(self._all(list(presence.values())))
+            if pc.any(missing).as_py():
+                pieces.append(self._difference_table(
+                    object_name, object_name, 'RECORD_MISSING', keys.filter(missing),
+                    {org: pc.if_else(present, 'EXISTS', 'MISSING').filter(missing) for org, present in presence.items()},
+                    org_list, 0, rows.filter(missing), -1
+                ))
+
+            # Only fields holding data in some org can differ
+            populated_columns = []
+            for table in keyed.values():
+                populated_columns.extend(col for col in table.column_names
+                                         if col not in populated_columns and table[col].null_count < table.num_rows)
+
+            for position, field_name in enumerate(self._get_compare_fields(populated_columns, object_name)):
+                values = {org: keyed[org][field_name].take(positions[org])
+                          if org in keyed and field_name in keyed[org].column_names
+                          else pa.nulls(len(keys), pa.large_string())
+                          for org in org_list}
+
+                if self._needs_value_kernels(list(values.values())):
+                    presence_matrix = np.column_stack([presence[org].to_numpy(zero_copy_only=False) for org in org_list])
+                    differs = pa.array(field_kernels.consensus_differences(
+                        [pd.Series(values[org].to_pandas()) for org in org_list], presence_matrix))
+                else:
+                    # Records absent from an org do not take part in the vote
+                    votes = [pc.if_else(presence[org], pc.fill_null(self._string_column(values[org]), self.NULL_TOKEN), None)
+                             for org in org_list]
+                    reference_vote = pc.coalesce(*votes)
+                    differs = pa.repeat(False, len(keys))
+                    for vote in votes:
+                        differs = pc.or_(differs, pc.fill_null(pc.not_equal(vote, reference_vote), False))
+
+                diff_rows = self._nonzero(differs)
+                if len(diff_rows):
+                    pieces.append(self._difference_table(
+                        object_name, f"{object_name}.{field_name}", 'VALUE_DIFFERENCE', keys.take(diff_rows),
+                        {org: pc.if_else(presence[org], self._string_column(values[org]), 'MISSING').take(diff_rows)
+                         for org in org_list},
+                        org_list, 0, diff_rows, position
+                    ))
+
+            return self._ordered_differences(pieces, ['_row', '_field'])
+
+    def _needs_value_kernels(self, columns: List) -> bool:
+        """
+        True when one field's columns hold values whose text form can differ while the values match:
+        floats and date-times, typed or as ISO 8601 text
+        """
+        populated = [column for column in columns if column.null_count < len(column)]
+        if any(pa.types.is_floating(column.type) or pa.types.is_decimal(column.type) or pa.types.is_timestamp(column.type)
+               for column in populated):
+            return True
+        return bool(populated) and all(
+            (pa.types.is_string(column.type) or pa.types.is_large_string(column.type))
+            and field_kernels.arrow_looks_like_datetime(column)
+            for column in populated
+        )
+
+    def _all(self, masks: List[pa.Array]) -> pa.Array:
+        """Element-wise AND over a list of boolean arrays"""
+        result = masks[0]
+        for mask in masks[1:]:
+            result = pc.and_(result, mask)
+        return result
+
+    def _difference_table(self, object_name: str, object_field_name: str, difference_type: str, keys,
+                          org_values: Dict[str, pa.Array], org_list: List[str], pair_position: int,
+                          rows, field_position: int) -> pa.Table:
+        """Build output rows in the all_differences.csv layout plus ordering helpers"""
+        count = len(keys)
+        columns = {
+            'ForeignKeyField': pa.repeat(self._get_foreign_key_field(object_name), count).cast(pa.large_string()),
+            'ForeignKeyValue': keys,
+            'ObjectFieldName': pa.repeat(object_field_name, count).cast(pa.large_string()),
+            'DifferenceType': pa.repeat(difference_type, count).cast(pa.large_string())
+        }
+        for org in org_list:
+            values = org_values.get(org)
+            columns[f'Org_{org}'] = self._string_column(values) if values is not None \
+                else pa.nulls(count, pa.large_string())
+        columns['_pair'] = pa.repeat(pair_position, count).cast(pa.int64())
+        columns['_row'] = pc.cast(rows, pa.int64())
+        columns['_field'] = pa.repeat(field_position, count).cast(pa.int64())
+
+        return pa.table({name: pa.chunked_array([column]) if isinstance(column, pa.Array) else column
+                         for name, column in columns.items()})
+
+    def _ordered_differences(self, pieces: List[pa.Table], sort_columns: List[str]) -> pa.Table:
+        """Concatenate difference pieces in output order and drop the ordering helpers"""
+        if not pieces:
+            return pa.table({col: pa.array([], pa.large_string()) for col in self._output_columns()})
+
+        differences = pa.concat_tables(pieces)
+        differences = differences.sort_by([(col, 'ascending') for col in sort_columns])
+        return differences.drop_columns(self.HELPER_COLUMNS)
+
+    def _render_differences(self, differences: pa.Table, start: int, stop: int) -> bytes:
+        """all_differences.csv rows for one batch of differences, without the header line"""
+        batch = differences.slice(start, stop - start)
+        for col in self._output_columns():
+            if col not in batch.column_names:
+                batch = batch.append_column(col, pa.nulls(batch.num_rows, pa.large_string()))
+
+        batch = batch.select(self._output_columns())
+
+        # Arrow either quotes every text value or none, where the pandas engine quotes only values
+        # that need it; the rare batch with such values is written by pandas, the rest unquoted
+        if any(pc.any(pc.match_substring_regex(column, self.CSV_SPECIAL_CHARACTERS)).as_py() for column in batch.columns):
+            return batch.to_pandas().to_csv(index=False, header=False).encode('utf-8')
+        sink = io.BytesIO()
+        pv.write_csv(batch, sink, write_options=pv.WriteOptions(include_header=False, quoting_style='none'))
+        return sink.getvalue()
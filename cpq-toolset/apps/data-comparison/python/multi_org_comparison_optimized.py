@@ -7,34 +7,101 @@ Maintains exact same interface as original multi_org_comparison.py
 
 import os
 import sys
+import ast
 import json
 import argparse
 import logging
 import gc
+import shutil
+import tempfile
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Set, Any
+from typing import Dict, List, Optional, Tuple, Set, Any, Iterable, Iterator
 from itertools import combinations
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import time
 
-class OptimizedSalesforceDataComparator:
+# The bundled runtime's ._pth file keeps the script directory off sys.path; modules shared
+# between apps sit in shared/modules/python in the source tree and in the runtime alike
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'shared', 'modules', 'python'))
+
+import ipc_cache
+import canonical_forms
+import difference_rollup
+import field_kernels
+import merkle_tree
+from run_metrics import RunMetrics
+from comparison_cache import ComparisonResultCache
+from difference_writer import DifferenceWriter
+from key_filter import KeyFilter
+from merkle_tree import MerkleTree
+from object_partitioner import ObjectPartitioner
+
+class StreamingSalesforceDataComparator:
     """
-    High-performance org comparison using set-based operations
-    Drop-in replacement maintaining all existing functionality and interfaces
+    Comparison flow shared by the engines: discovery, one object at a time loading, scheduling,
+    caching and output, with the pandas implementation of loading and diffing
     """
     
-    def __init__(self, chunk_size: int = 50000, exclude_fields: List[str] = None):
+    COMPARISON_MODES = ('pairwise', 'consensus')
+    ENGINE = 'pandas'
+    PREFETCH_BUDGET_BYTES = 512 * 1024 * 1024  # On-disk bytes loading ahead when --max-memory is not set
+    MAX_PARTITIONS = 256  # Bucket files stay open while an org is spilled
+    ROW_SAMPLE_BYTES = 1024 * 1024  # Leading bytes of a CSV or JSONL extract read to estimate its records
+    ROLLUP_FILE = 'parent_rollup.csv'
+    DICTIONARY_MAX_RATIO = 0.5  # Fields with more distinct values than this share of cells stay as text
+    
+    def __init__(self, chunk_size: int = 50000, exclude_fields: List[str] = None,
+                 comparison_mode: str = 'pairwise', max_memory_mb: Optional[float] = None,
+                 workers: int = 1, io_threads: int = 4, incremental: bool = False,
+                 result_cache: bool = False, result_cache_mb: Optional[float] = None,
+                 parquet_output: bool = False, partitions: Optional[int] = None,
+                 ipc_cache: bool = False, profile: bool = False):
+        if comparison_mode not in self.COMPARISON_MODES:
+            raise ValueError(f"Unknown comparison mode: {comparison_mode}")
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        if partitions is not None and partitions < 1:
+            raise ValueError(f"partitions must be at least 1, got {partitions}")
+        
         self.chunk_size = chunk_size
+        self.comparison_mode = comparison_mode
+        self.workers = workers
+        self.io_threads = max(1, io_threads)
+        self.incremental = incremental
+        self.record_index_dir = None  # Set per run when incremental comparison is enabled
+        self.use_result_cache = result_cache
+        self.result_cache_bytes = int(result_cache_mb * 1024 * 1024) if result_cache_mb else None
+        self.result_cache = None  # Opened per run under the output directory
+        self._cache_keys = {}
+        self._fingerprints = {}  # Input file digests, computed once per run
+        self.parquet_output = parquet_output
+        self.partitions = partitions
+        self.use_ipc_cache = ipc_cache
+        self.profile = profile
+        self._partition_counts = {}  # Objects compared out of core this run, by bucket count
         self.logger = self._setup_logging()
         self.discovered_orgs = []
         self.common_objects = []
         self.foreign_key_mappings = {}
         self.org_display_names = {}
-        self.final_differences_df = []
+        self._difference_writer = None  # Opened per run by _start_output
+        self.final_differences_df = []  # Difference records of run_set_comparisons
+        self.metrics = RunMetrics('multi_org_comparison')  # Replaced per run by run_full_comparison
+        self.total_differences = 0
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024) if max_memory_mb else None
         self.blacklisted_fks = set()  # Set to store blacklisted foreign keys
+        self._key_filters = {}  # Per object, built from the blacklist when the object is first loaded
         self.configured_fields = {}  # Dict to store configured fields per object
+        self.lookup_fields = {}  # Per object, configured lookup fields that resolve to a parent's foreign key
+        self.parent_indexes = {}  # (org, parent object) -> parent foreign key by 15-character Id, built per run
+        self.child_parent_links = None  # Child key -> parent key pairs for the roll-up, read per run
         
         # Default exclusion list for common Salesforce system fields and metadata
         default_exclusions = [
@@ -52,6 +119,18 @@ class OptimizedSalesforceDataComparator:
             self.logger.info(f"Added custom exclusions: {exclude_fields}")
         
         self.logger.info(f"Excluding fields from comparison: {sorted(list(self.exclude_fields))}")
+    
+    def __getstate__(self):
+        """
+        Settings and per-run indexes for a worker process's copy of the comparator
+        The output files, result cache and metrics stay with the parent: the pool pickles its
+        tasks as workers free up, after the parent has opened them
+        """
+        state = self.__dict__.copy()
+        state['_difference_writer'] = None
+        state['result_cache'] = None
+        state['metrics'] = RunMetrics(self.metrics.tool)  # Workers record into their own and export it
+        return state
         
     def _setup_logging(self) -> logging.Logger:
         """Set up logging configuration."""
@@ -70,43 +149,45 @@ class OptimizedSalesforceDataComparator:
         """Discover all organizations and common objects in the base directory."""
         self.logger.info(f"Starting discovery in {base_path}")
         
-        # Load configuration
-        config_loaded = self._load_foreign_key_config(base_path)
-        
-        # Load blacklisted foreign keys
-        self._load_blacklisted_fks(base_path)
-        
-        # Discover organization folders (exclude known non-org directories)
-        exclude_dirs = {'.buffers', 'comparison_results', 'results', 'output', 'temp', 'tmp'}
-        org_folders = [d for d in os.listdir(base_path) 
-                      if os.path.isdir(os.path.join(base_path, d)) 
-                      and not d.startswith('.') 
-                      and d not in exclude_dirs]
-        
-        # Map folder names to display names
-        for folder in org_folders:
-            display_name = self.org_display_names.get(folder, folder)
-            self.logger.info(f"Mapped folder '{folder}' to org '{display_name}'")
-        
-        # Find common objects across all orgs
-        all_org_objects = {}
-        for org in org_folders:
-            org_path = os.path.join(base_path, org)
-            # Look for .parquet, .csv, or .jsonl files
-            objects = []
-            for f in os.listdir(org_path):
-                if f.endswith('.parquet'):
-                    objects.append(f.replace('.parquet', ''))
-                elif f.endswith('.csv'):
-                    objects.append(f.replace('.csv', ''))
-                elif f.endswith('.jsonl'):
-                    objects.append(f.replace('.jsonl', ''))
-            all_org_objects[org] = set(objects)
-        
-        if all_org_objects:
-            common_objects = set.intersection(*all_org_objects.values())
-            self.common_objects = sorted(list(common_objects))
-            self.discovered_orgs = sorted(org_folders)
+        with self.metrics.phase('config_load'):
+            # Load configuration
+            config_loaded = self._load_foreign_key_config(base_path)
+            
+            # Load blacklisted foreign keys
+            self._load_blacklisted_fks(base_path)
+        
+        with self.metrics.phase('discovery'):
+            # Discover organization folders (exclude known non-org directories)
+            exclude_dirs = {'.buffers', 'comparison_results', 'results', 'output', 'temp', 'tmp'}
+            org_folders = [d for d in os.listdir(base_path) 
+                          if os.path.isdir(os.path.join(base_path, d)) 
+                          and not d.startswith('.') 
+                          and d not in exclude_dirs]
+            
+            # Map folder names to display names
+            for folder in org_folders:
+                display_name = self.org_display_names.get(folder, folder)
+                self.logger.info(f"Mapped folder '{folder}' to org '{display_name}'")
+            
+            # Find common objects across all orgs
+            all_org_objects = {}
+            for org in org_folders:
+                org_path = os.path.join(base_path, org)
+                # Look for .parquet, .csv, or .jsonl files
+                objects = []
+                for f in os.listdir(org_path):
+                    if f.endswith('.parquet'):
+                        objects.append(f.replace('.parquet', ''))
+                    elif f.endswith('.csv'):
+                        objects.append(f.replace('.csv', ''))
+                    elif f.endswith('.jsonl'):
+                        objects.append(f.replace('.jsonl', ''))
+                all_org_objects[org] = set(objects)
+            
+            if all_org_objects:
+                common_objects = set.intersection(*all_org_objects.values())
+                self.common_objects = sorted(list(common_objects))
+                self.discovered_orgs = sorted(org_folders)
         
         self.logger.info(f"Discovery complete: {len(self.discovered_orgs)} orgs, {len(self.common_objects)} common objects")
         
@@ -163,6 +244,8 @@ class OptimizedSalesforceDataComparator:
                     if folder_name:
                         self.org_display_names[folder_name] = alias
             
+            self._resolve_lookup_fields()
+            
             self.logger.info(f"Extracted {len(self.foreign_key_mappings)} foreign key mappings from config")
             self.logger.info(f"Configured field counts by object: {[(obj, len(fields)) for obj, fields in self.configured_fields.items()]}")
             return True
@@ -171,6 +254,36 @@ class OptimizedSalesforceDataComparator:
             self.logger.error(f"Error loading config: {e}")
             return False
     
+    def _resolve_lookup_fields(self):
+        """
+        Find the configured lookup fields that point at another configured object's foreign key
+        SBQQ__Rule__c.Price_Rule_Foreign_Key__c on a price condition names the lookup field
+        SBQQ__Rule__c, whose org-specific Id is compared as the price rule's foreign key instead
+        """
+        parents_by_key = {key_field: obj for obj, key_field in self.foreign_key_mappings.items()}
+        self.lookup_fields = {}
+        for object_name, fields in self.configured_fields.items():
+            for field_name in fields:
+                lookup_field, _, parent_key = field_name.partition('.')
+                if parent_key not in parents_by_key:
+                    continue
+                # The REST API nests the parent under the relationship name: SBQQ__Rule__r, Account for AccountId
+                if lookup_field.endswith('__c'):
+                    relationship = lookup_field[:-3] + '__r'
+                elif lookup_field.endswith('Id'):
+                    relationship = lookup_field[:-2]
+                else:
+                    continue
+                self.lookup_fields.setdefault(object_name, {})[field_name] = {
+                    'field': lookup_field,
+                    'relationship': relationship,
+                    'parent': parents_by_key[parent_key],
+                    'parent_key': parent_key
+                }
+        
+        for object_name, lookups in self.lookup_fields.items():
+            self.logger.info(f"Translating lookups of {object_name} to parent foreign keys: {sorted(lookups)}")
+    
     def _load_blacklisted_fks(self, base_path: str):
         """Load blacklisted foreign keys from duplicate resolution."""
         blacklist_file = os.path.join(base_path, 'blacklisted_foreign_keys.json')
@@ -185,30 +298,83 @@ class OptimizedSalesforceDataComparator:
             
             blacklisted_fks = blacklist_data.get('blacklisted_fks', [])
             self.blacklisted_fks = set(blacklisted_fks)
+            self._key_filters = {}
             
             self.logger.info(f"Loaded {len(self.blacklisted_fks)} blacklisted foreign keys from {blacklist_file}")
             if self.blacklisted_fks:
-                self.logger.info(f"Blacklisted FKs: {sorted(list(self.blacklisted_fks))}")
+                self.logger.debug(f"Blacklisted FKs: {sorted(list(self.blacklisted_fks))}")
             
         except Exception as e:
             self.logger.error(f"Error loading blacklist file: {e}")
             # Don't fail the entire process - continue without blacklisting
     
-    def _filter_blacklisted_fks(self, df: pd.DataFrame, object_name: str) -> pd.DataFrame:
-        """Filter out records with blacklisted foreign keys."""
-        if not self.blacklisted_fks or 'primary_key' not in df.columns:
+    def _key_filter(self, object_name: str) -> KeyFilter:
+        """Filter dropping an object's blacklisted foreign keys, shared by every org's load"""
+        key_filter = self._key_filters.get(object_name)
+        if key_filter is None:
+            key_filter = self._key_filters[object_name] = KeyFilter(exclude=self._blacklisted_fk_values(object_name))
+        return key_filter
+    
+    def _filter_blacklisted_fks(self, df: pd.DataFrame, object_name: str, key_field: str, source_file: str) -> pd.DataFrame:
+        """Filter out loaded records with blacklisted foreign keys"""
+        key_filter = self._key_filter(object_name)
+        if not key_filter.active or key_field not in df.columns:
             return df
         
-        # Create the blacklist key format: object_name:fk_value
-        def is_blacklisted(row):
-            if pd.isna(row['primary_key']) or row['primary_key'] is None:
-                return False
-            blacklist_key = f"{object_name}:{row['primary_key']}"
-            return blacklist_key in self.blacklisted_fks
+        keep = key_filter.keep_mask(df[key_field])
+        if keep.all():
+            return df
+        self.logger.info(f"Filtered {len(df) - keep.sum()} records with blacklisted FKs from {source_file}")
+        return df[keep]
+    
+    def _filter_blacklisted_rows(self, table: pa.Table, object_name: str, key_field: str, source_file: str) -> pa.Table:
+        """Filter out records with blacklisted foreign keys from a table before it becomes a DataFrame"""
+        filtered = self._key_filter(object_name).filter_table(table, key_field)
+        if filtered.num_rows != table.num_rows:
+            self.logger.info(f"Filtered {table.num_rows - filtered.num_rows} records with blacklisted FKs from {source_file}")
+        return filtered
+    
+    def _blacklisted_fk_values(self, object_name: str) -> List[str]:
+        """Foreign key values blacklisted for one object"""
+        prefix = f"{object_name}:"
+        return sorted(fk[len(prefix):] for fk in self.blacklisted_fks if fk.startswith(prefix))
+    
+    def _projected_columns(self, object_name: str, key_field: str, available_columns) -> List[str]:
+        """
+        Columns worth reading for an object: the foreign key plus its configured fields,
+        or every column when no fields are configured, minus excluded fields
+        """
+        configured_fields = self.configured_fields.get(object_name)
+        wanted = [key_field] + list(configured_fields) if configured_fields else list(available_columns)
+        available = set(available_columns)
         
-        # Filter out blacklisted records
-        mask = ~df.apply(is_blacklisted, axis=1)
-        return df[mask]
+        columns = []
+        for col in wanted:
+            if col in available and col not in self.exclude_fields and col not in columns:
+                columns.append(col)
+        
+        # Lookup fields are compared through their Id and relationship columns, excluded or not
+        for field_name, lookup in self.lookup_fields.get(object_name, {}).items():
+            if field_name in self.exclude_fields:
+                continue
+            for col in (lookup['field'], lookup['relationship']):
+                if col in available and col not in columns:
+                    columns.append(col)
+        return columns
+    
+    def _read_parquet_projected(self, parquet_file: str, sf_object: str, key_field: str) -> pd.DataFrame:
+        """Read only the compared columns of a Parquet file, dropping blacklisted keys in the scan"""
+        schema = pq.read_schema(parquet_file)
+        columns = self._projected_columns(sf_object, key_field, schema.names)
+        
+        # Push the FK blacklist into the Parquet scan when it can be expressed there
+        key_filter = self._key_filter(sf_object)
+        filters = key_filter.scan_filter(key_field, schema.field(key_field).type) if key_field in columns else None
+        if filters is None and key_filter.active:
+            table = pq.read_table(parquet_file, columns=columns)
+            return self._filter_blacklisted_rows(table, sf_object, key_field, parquet_file).to_pandas()
+        
+        return pd.read_parquet(parquet_file, columns=columns, filters=filters)
     
     def _load_sf_object_data(self, base_path: str, org: str, sf_object: str, key_field: str) -> Optional[pd.DataFrame]:
         """Load Salesforce object data from parquet, CSV, or JSONL file with optimized caching."""
@@ -218,10 +384,16 @@ class OptimizedSalesforceDataComparator:
         csv_file = os.path.join(base_path, org, f"{sf_object}.csv")
         
         try:
+            # Method 0: memory-mapped Arrow IPC cache of the Parquet or JSONL file
+            cached_table = self._read_ipc_cache(base_path, org, sf_object, key_field)
+            if cached_table is not None:
+                return cached_table.to_pandas()
+            
             # Method 1: Direct parquet load (fastest)
             if os.path.exists(parquet_file):
                 self.logger.debug(f"Loading parquet: {parquet_file}")
-                return pd.read_parquet(parquet_file)
+                self._write_ipc_cache([parquet_file])
+                return self._read_parquet_projected(parquet_file, sf_object, key_field)
             
             # Method 2: JSONL with parquet caching (optimized)
             elif os.path.exists(jsonl_file):
@@ -230,7 +402,8 @@ class OptimizedSalesforceDataComparator:
                 if os.path.exists(parquet_cache_path):
                     # Use cached parquet file if available
                     self.logger.debug(f"Using cached parquet file: {parquet_cache_path}")
-                    return pd.read_parquet(parquet_cache_path)
+                    self._write_ipc_cache([parquet_cache_path])
+                    return self._read_parquet_projected(parquet_cache_path, sf_object, key_field)
                 else:
                     # Load JSONL and convert to DataFrame with caching
                     self.logger.debug(f"Loading and caching JSONL: {jsonl_file}")
@@ -251,19 +424,29 @@ class OptimizedSalesforceDataComparator:
                     # Convert to pandas DataFrame
                     df = pd.DataFrame(records)
                     
-                    # Save as parquet for future use
+                    # Save as parquet for future use, with every column so the cache serves any config
                     try:
                         df.to_parquet(parquet_cache_path, index=False)
                         self.logger.info(f"Created parquet cache: {parquet_cache_path}")
                     except Exception as e:
                         self.logger.warning(f"Could not create parquet cache: {e}")
                     
-                    return df
+                    # The IPC cache stands for the JSONL file and, when it was written, its parquet cache
+                    cached_sources = [jsonl_file]
+                    if os.path.exists(parquet_cache_path):
+                        cached_sources.append(parquet_cache_path)
+                    self._write_ipc_cache(cached_sources, df)
+                    
+                    df = df[self._projected_columns(sf_object, key_field, df.columns)]
+                    return self._filter_blacklisted_fks(df, sf_object, key_field, jsonl_file)
             
             # Method 3: CSV fallback (slowest)
             elif os.path.exists(csv_file):
                 self.logger.debug(f"Loading CSV: {csv_file}")
-                return pd.read_csv(csv_file, dtype=str, low_memory=False)
+                header = pd.read_csv(csv_file, nrows=0).columns
+                df = pd.read_csv(csv_file, dtype=str, low_memory=False,
+                                 usecols=self._projected_columns(sf_object, key_field, header))
+                return self._filter_blacklisted_fks(df, sf_object, key_field, csv_file)
             
             else:
                 return None
@@ -272,292 +455,636 @@ class OptimizedSalesforceDataComparator:
             self.logger.error(f"Error loading {sf_object} for {org}: {e}")
             return None
     
-    def create_mega_dataframe(self, org_list: List[str], base_path: str) -> pd.DataFrame:
+    def _read_ipc_cache(self, base_path: str, org: str, sf_object: str, key_field: str) -> Optional[pa.Table]:
+        """Compared columns from the memory-mapped IPC cache of the file the loader would read, if fresh"""
+        if not self.use_ipc_cache:
+            return None
+        source_file = self._source_file(base_path, org, sf_object)
+        # CSV is read as text by one engine and typed by the other, so it has no engine-neutral cache
+        if source_file is None or source_file.endswith('.csv'):
+            return None
+        
+        table = ipc_cache.read_table(source_file)
+        if table is None:
+            return None
+        self.logger.debug(f"Memory-mapping IPC cache: {ipc_cache.cache_path(source_file)}")
+        table = table.select(self._projected_columns(sf_object, key_field, table.column_names))
+        return self._filter_blacklisted_rows(table, sf_object, key_field, source_file)
+    
+    def _write_ipc_cache(self, source_files: List[str], df: Optional[pd.DataFrame] = None):
+        """Build the IPC cache of a source file with every column, reading the file when no frame is given"""
+        if not self.use_ipc_cache:
+            return
+        try:
+            if df is None:
+                ipc_cache.write_table(source_files, pq.read_table(source_files[0]))
+            else:
+                ipc_cache.write_frame(source_files, df)
+            self.logger.info(f"Created IPC cache: {ipc_cache.cache_path(source_files[0])}")
+        except Exception as e:
+            self.logger.warning(f"Could not create IPC cache: {e}")
+    
+    def _load_object_frames(self, base_path: str, org_list: List[str], object_name: str) -> Dict[str, pd.DataFrame]:
+        """Load and prepare one object from every org, keeping only the columns needed for comparison"""
+        org_frames = {}
+        
+        for org in org_list:
+            org_frame = self._load_org_frame(base_path, org, object_name)
+            if org_frame is not None:
+                org_frames[org] = org_frame
+        
+        return self._prepare_object_frames(object_name, org_frames)
+    
+    def _load_org_frame(self, base_path: str, org: str, object_name: str) -> Optional[pd.DataFrame]:
+        """Load and prepare one org's records of an object, releasing the raw frame"""
+        primary_key = self.foreign_key_mappings[object_name]
+        with self.metrics.phase('load', object_name, org) as counts:
+            df = self._load_sf_object_data(base_path, org, object_name, primary_key)
+            if df is not None:
+                counts['rows'] = len(df)
+                counts['bytes'] = self._org_input_bytes(base_path, org, object_name)
+        
+        if df is None or df.empty:
+            return None
+        
+        with self.metrics.phase('key_build', object_name, org):
+            org_frame = self._prepare_org_frame(df, object_name, org, primary_key)
+        self.logger.debug(f"Added {len(org_frame)} records for {object_name}/{org}")
+        return org_frame
+    
+    def _iter_loaded_objects(self, base_path: str, objects: List[str]) -> Iterator[Tuple[str, Dict[str, pd.DataFrame]]]:
         """
-        Phase 1: Combine all objects into single mega DataFrame
-        Adds metadata columns for set-based operations
+        Yield (object, org frames) in order while the following objects load on a thread pool
+        Objects are queued while their combined file size fits the prefetch budget, so reading
+        object k+1 overlaps comparing object k; the next object is always admitted. Profiled runs
+        load on the calling thread instead, because cProfile only follows the thread that enables it
         """
-        self.logger.info("Creating mega DataFrame for set-based comparison")
-        all_dataframes = []
+        if self.profile:
+            for object_name in objects:
+                org_frames = {org: self._load_org_frame(base_path, org, object_name) for org in self.discovered_orgs}
+                org_frames = {org: org_frame for org, org_frame in org_frames.items() if org_frame is not None}
+                yield object_name, self._prepare_object_frames(object_name, org_frames)
+            return
         
-        # Filter to objects with foreign keys only
-        objects_with_keys = [obj for obj in self.common_objects 
-                           if obj in self.foreign_key_mappings]
+        budget = self.max_memory_bytes or self.PREFETCH_BUDGET_BYTES
+        object_bytes = {obj: self._object_input_bytes(base_path, obj) for obj in objects}
+        queued = deque()
+        queued_bytes = 0
+        next_index = 0
         
-        if not objects_with_keys:
-            raise ValueError("No objects with foreign keys found")
+        with ThreadPoolExecutor(max_workers=self.io_threads) as executor:
+            while queued or next_index < len(objects):
+                while next_index < len(objects):
+                    object_name = objects[next_index]
+                    if queued and queued_bytes + object_bytes[object_name] > budget:
+                        break
+                    futures = {
+                        org: executor.submit(self._load_org_frame, base_path, org, object_name)
+                        for org in self.discovered_orgs
+                    }
+                    queued.append((object_name, futures))
+                    queued_bytes += object_bytes[object_name]
+                    next_index += 1
+                
+                object_name, futures = queued.popleft()
+                org_frames = {}
+                for org, future in futures.items():
+                    org_frame = future.result()
+                    if org_frame is not None:
+                        org_frames[org] = org_frame
+                
+                yield object_name, self._prepare_object_frames(object_name, org_frames)
+                
+                # The caller has finished with this object: drop every reference and free its budget share
+                del org_frames, futures
+                queued_bytes -= object_bytes[object_name]
+    
+    def _prepare_org_frame(self, df: pd.DataFrame, object_name: str, org: str, primary_key: str) -> pd.DataFrame:
+        """Add comparison metadata columns to one org's records of an object"""
+        keys = df[primary_key] if primary_key in df.columns and primary_key not in self.exclude_fields else None
         
-        self.logger.info(f"Processing {len(objects_with_keys)} objects with foreign keys")
+        # Lookups read their Id and relationship columns whether or not those are excluded
+        df = self._translate_lookups(df.copy(deep=False), object_name, org)
         
-        for object_name in objects_with_keys:
-            primary_key = self.foreign_key_mappings[object_name]
+        # Exclude system fields
+        df_filtered = df.drop(columns=[col for col in df.columns 
+                                     if col in self.exclude_fields], 
+                            errors='ignore')
+        
+        # Add metadata columns
+        df_filtered['object_name'] = object_name
+        df_filtered['org_name'] = org
+        df_filtered['primary_key'] = keys
+        
+        # Drop columns that never take part in the comparison
+        compare_fields = self._get_compare_fields(df_filtered.columns, object_name)
+        return df_filtered[['object_name', 'org_name', 'primary_key'] + compare_fields].copy()
+    
+    def _translate_lookups(self, df: pd.DataFrame, object_name: str, org: str) -> pd.DataFrame:
+        """Fill each configured lookup field, and the Id column it reads, with the parent's foreign key"""
+        for field_name, lookup in self.lookup_fields.get(object_name, {}).items():
+            ids = df[lookup['field']] if lookup['field'] in df.columns else None
+            related = df[lookup['relationship']] if lookup['relationship'] in df.columns else None
+            if ids is None and related is None:
+                continue
             
-            for org in org_list:
-                df = self._load_sf_object_data(base_path, org, object_name, primary_key)
-                
-                if df is not None and not df.empty:
-                    # Exclude system fields
-                    df_filtered = df.drop(columns=[col for col in df.columns 
-                                                 if col in self.exclude_fields], 
-                                        errors='ignore')
-                    
-                    # Add metadata columns
-                    df_filtered['object_name'] = object_name
-                    df_filtered['org_name'] = org
-                    df_filtered['primary_key'] = df_filtered[primary_key] if primary_key in df_filtered.columns else None
-                    
-                    # Filter out blacklisted foreign keys
-                    if self.blacklisted_fks:
-                        original_count = len(df_filtered)
-                        df_filtered = self._filter_blacklisted_fks(df_filtered, object_name)
-                        filtered_count = len(df_filtered)
-                        
-                        if original_count != filtered_count:
-                            self.logger.info(f"Filtered {original_count - filtered_count} records with blacklisted FKs for {object_name}/{org}")
-                    
-                    # Create composite key for set operations
-                    df_filtered['composite_key'] = df_filtered.apply(
-                        lambda row: self._create_composite_key(row, primary_key), axis=1
-                    )
+            portable = self._portable_lookup_values(ids, related, lookup, org)
+            df[field_name] = portable
+            if ids is not None:
+                df[lookup['field']] = portable
+        return df
+    
+    def _portable_lookup_values(self, ids: Optional[pd.Series], related: Optional[pd.Series],
+                                lookup: Dict, org: str) -> pd.Series:
+        """
+        Parent foreign key of each record's lookup: the org's parent index joined on the Id, else the
+        key nested in the relationship column, else the Id itself when the parent was not extracted
+        """
+        rows = ids.index if ids is not None else related.index
+        portable = pd.Series(None, index=rows, dtype=object)
+        
+        index = self.parent_indexes.get((org, lookup['parent']))
+        if ids is not None and index is not None:
+            present = ids.notna().to_numpy()
+            positions = index.index.get_indexer(ids[present].astype(str).str[:15])
+            found = positions >= 0
+            values = portable.to_numpy(copy=True)
+            values[np.flatnonzero(present)[found]] = index.to_numpy()[positions[found]]
+            portable = pd.Series(values, index=rows, dtype=object)
+        
+        # Only values the join left unresolved are parsed out of the relationship column, row by row
+        if related is not None:
+            unresolved = portable.isna().to_numpy() & related.notna().to_numpy()
+            if unresolved.any():
+                values = portable.to_numpy(copy=True)
+                values[unresolved] = [_nested_value(value, lookup['parent_key']) for value in related[unresolved]]
+                portable = pd.Series(values, index=rows, dtype=object)
+        if ids is not None:
+            portable = portable.where(portable.notna(), ids.astype(object))
+        return portable
+    
+    def _build_parent_indexes(self, base_path: str, objects: List[str]) -> Dict[Tuple[str, str], pd.Series]:
+        """Index every org's records of the parents the objects' lookup fields point at"""
+        parents = sorted({lookup['parent'] for object_name in objects
+                          for lookup in self.lookup_fields.get(object_name, {}).values()})
+        indexes = {}
+        for parent_object in parents:
+            for org in self.discovered_orgs:
+                index = self._read_parent_index(base_path, org, parent_object)
+                if index is not None:
+                    indexes[(org, parent_object)] = index
+                    self.logger.info(f"Indexed {len(index)} {parent_object} Ids for {org}")
+        return indexes
+    
+    def _read_parent_index(self, base_path: str, org: str, parent_object: str) -> Optional[pd.Series]:
+        """Foreign key of each of an org's parent records by 15-character Id, reading only those two columns"""
+        key_field = self.foreign_key_mappings[parent_object]
+        frame = self._read_columns(base_path, org, parent_object, ['Id', key_field])
+        if frame is None or 'Id' not in frame.columns or key_field not in frame.columns:
+            return None
+        
+        frame = frame[frame['Id'].notna()]
+        ids = pd.Index(frame['Id'].astype(str).str[:15].to_numpy(dtype=object))
+        index = pd.Series(frame[key_field].to_numpy(dtype=object), index=ids)
+        return index[~ids.duplicated()]
+    
+    def _read_columns(self, base_path: str, org: str, object_name: str, columns: List[str]) -> Optional[pd.DataFrame]:
+        """The given columns of an org's records of an object, those the source has, without the rest"""
+        source_file = self._source_file(base_path, org, object_name)
+        if source_file is None:
+            return None
+        
+        try:
+            if source_file.endswith('.parquet'):
+                available = set(pq.read_schema(source_file).names)
+                return pd.read_parquet(source_file, columns=[col for col in columns if col in available])
+            if source_file.endswith('.csv'):
+                available = set(pd.read_csv(source_file, nrows=0).columns)
+                return pd.read_csv(source_file, dtype=str, usecols=[col for col in columns if col in available])
+            
+            rows = []
+            present = set()
+            with open(source_file, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        rows.append([record.get(col) for col in columns])
+                        present.update(col for col in columns if col in record)
+            return pd.DataFrame(rows, columns=columns)[[col for col in columns if col in present]]
+        except Exception as e:
+            self.logger.warning(f"Could not read {columns} of {object_name} for {org}: {e}")
+            return None
+    
+    def _read_child_parent_links(self, base_path: str, objects: List[str]) -> pd.DataFrame:
+        """Every parent key each child record's lookups point at in any org, reading each child file once"""
+        links = []
+        for object_name in objects:
+            key_field = self.foreign_key_mappings[object_name]
+            lookups = list(self.lookup_fields.get(object_name, {}).values())
+            if not lookups:
+                continue
+            
+            link_columns = [key_field]
+            for lookup in lookups:
+                for col in (lookup['field'], lookup['relationship']):
+                    if col not in link_columns:
+                        link_columns.append(col)
+            for org in self.discovered_orgs:
+                frame = self._read_columns(base_path, org, object_name, link_columns)
+                if frame is None or key_field not in frame.columns:
+                    continue
+                for lookup in lookups:
+                    ids = frame[lookup['field']] if lookup['field'] in frame.columns else None
+                    related = frame[lookup['relationship']] if lookup['relationship'] in frame.columns else None
+                    if ids is None and related is None:
+                        continue
                     
-                    all_dataframes.append(df_filtered)
-                    self.logger.debug(f"Added {len(df_filtered)} records for {object_name}/{org}")
+                    links.append(pd.DataFrame({
+                        'child_object': object_name,
+                        'child_key': frame[key_field].to_numpy(dtype=object),
+                        'parent_object': lookup['parent'],
+                        'parent_key': self._portable_lookup_values(ids, related, lookup, org).to_numpy()
+                    }))
         
-        if not all_dataframes:
-            raise ValueError(f"No data found for orgs: {org_list}")
+        if not links:
+            return pd.DataFrame(columns=difference_rollup.LINK_COLUMNS)
+        links = pd.concat(links, ignore_index=True).dropna()
+        # Keys are matched as all_differences.csv writes them
+        links['child_key'] = links['child_key'].astype(str)
+        links['parent_key'] = links['parent_key'].astype(str)
+        return links.drop_duplicates(ignore_index=True)
+    
+    def _prepare_object_frames(self, object_name: str, org_frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """Finish the prepared org frames of one object: steps that need every org's records at once"""
+        with self.metrics.phase('key_build', object_name):
+            org_frames = self._apply_canonical_forms(object_name, org_frames)
+        return self._encode_shared_dictionaries(object_name, org_frames)
+    
+    def _apply_canonical_forms(self, object_name: str, org_frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Canonical forms of every compared field, each decided over all orgs' columns so one raw value
+        gets one spelling in every org, then the 64-bit record digest for set operations
+        """
+        fields = []
+        for frame in org_frames.values():
+            fields.extend(f for f in self._get_compare_fields(frame.columns, object_name) if f not in fields)
         
-        mega_df = pd.concat(all_dataframes, ignore_index=True)
-        self.logger.info(f"Created mega DataFrame: {len(mega_df)} total records across {len(objects_with_keys)} objects")
-        return mega_df
+        for field_name in fields:
+            holders = [frame for frame in org_frames.values() if field_name in frame.columns]
+            columns = canonical_forms.canonical_columns([frame[field_name] for frame in holders])
+            for frame, column in zip(holders, columns):
+                frame[field_name] = column
+        
+        for frame in org_frames.values():
+            frame['composite_key'] = self._compute_record_digests(frame, object_name)
+        return org_frames
+    
+    def _encode_shared_dictionaries(self, object_name: str, org_frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Replace low-cardinality text fields with codes into one dictionary per field shared by every org
+        Equal codes mean equal values in any org, so field comparison becomes an integer test
+        """
+        fields = []
+        for frame in org_frames.values():
+            fields.extend(f for f in self._get_compare_fields(frame.columns, object_name) if f not in fields)
+        
+        for field_name in fields:
+            holders = [(org, frame) for org, frame in org_frames.items() if field_name in frame.columns]
+            if not all(pd.api.types.is_object_dtype(frame[field_name]) or pd.api.types.is_string_dtype(frame[field_name])
+                       for _, frame in holders):
+                continue
+            
+            combined = pd.concat([frame[field_name] for _, frame in holders], ignore_index=True)
+            non_null = combined.dropna()
+            if non_null.empty or isinstance(non_null.iloc[0], (dict, list)):
+                continue
+            
+            codes, categories = pd.factorize(combined)
+            if len(categories) > len(combined) * self.DICTIONARY_MAX_RATIO:
+                continue
+            
+            # Nulls keep code -1, so they compare equal to each other and unequal to any value
+            offset = 0
+            for org, frame in holders:
+                frame[field_name] = pd.Categorical.from_codes(codes[offset:offset + len(frame)], categories=categories)
+                offset += len(frame)
+        
+        return org_frames
     
-    def _create_composite_key(self, row: pd.Series, primary_key: str) -> Tuple:
-        """Create hashable tuple for set operations"""
-        # Include all data except metadata for complete record comparison
+    def _get_compare_fields(self, columns, object_name: str) -> List[str]:
+        """Get the fields of an object that take part in record comparison"""
         exclude_cols = {'org_name', 'composite_key', 'object_name', 'primary_key'}
-        data_cols = [col for col in row.index if col not in exclude_cols]
-        
-        # Create tuple with object and primary key for uniqueness
-        key_data = [row.get('object_name', ''), row.get('primary_key', '')]
-        
-        # Process each column value to ensure it's hashable
-        for col in data_cols:
-            value = row[col]
-            
-            # Handle different data types
-            if value is None or pd.isna(value):
-                key_data.append(None)
-            elif isinstance(value, (dict, list)):
-                # Convert complex types to JSON string for hashing
-                key_data.append(json.dumps(value, sort_keys=True))
-            elif isinstance(value, (int, float, str, bool)):
-                # Simple types can be used directly
-                key_data.append(value)
-            else:
-                # Convert any other type to string
-                key_data.append(str(value))
+        metadata_fields = {'_sourceOrg', '_fetchTimestamp', '_recordIndex', '_primaryKey', '_objectName'}
         
-        return tuple(key_data)
+        # Get configured fields for this object
+        configured_fields = self.configured_fields.get(object_name, [])
+        
+        # If no fields configured, compare all non-metadata fields
+        if configured_fields:
+            fields_to_compare = [f for f in configured_fields if f in columns]
+        else:
+            fields_to_compare = list(columns)
+        
+        return [f for f in fields_to_compare 
+                if f not in exclude_cols and f not in metadata_fields]
     
-    def run_set_comparisons(self, mega_df: pd.DataFrame, org_list: List[str], base_path: str):
+    def _normalize_nested_values(self, series: pd.Series) -> pd.Series:
+        """Convert dict/list cells to canonical JSON strings so they can be hashed"""
+        if series.dtype != object:
+            return series
+        
+        non_null = series.dropna()
+        if non_null.empty or not isinstance(non_null.iloc[0], (dict, list)):
+            return series
+        
+        return series.map(
+            lambda value: json.dumps(value, sort_keys=True) if isinstance(value, (dict, list)) else value
+        )
+    
+    def _compute_record_digests(self, df: pd.DataFrame, object_name: str) -> np.ndarray:
         """
-        Phase 2: Run optimized set-based comparisons
-        Uses pandas groupby and set operations for maximum performance
+        Build a 64-bit digest per record in one column-wise pass
+        Covers the primary key and every compared field, so equal digests mean equal records
         """
-        self.logger.info(f"Running set-based comparisons for {len(org_list)} orgs")
+        # Sorted so the digest does not depend on column order in the source file
+        fields = sorted(self._get_compare_fields(df.columns, object_name))
+        hash_frame = pd.DataFrame(
+            {col: self._normalize_nested_values(df[col]) for col in ['primary_key'] + fields},
+            index=df.index
+        )
         
-        # Split mega DataFrame by org for faster lookups
-        org_datasets = {}
-        for org in org_list:
-            org_data = mega_df[mega_df['org_name'] == org].copy()
-            org_datasets[org] = org_data
-            self.logger.debug(f"Org {org}: {len(org_data)} records")
+        digests = pd.util.hash_pandas_object(hash_frame, index=False, categorize=True).to_numpy(dtype=np.uint64)
+        
+        # Mix in the object name so digests stay unique across objects in the mega DataFrame
+        object_hash = pd.util.hash_array(np.array([object_name], dtype=object))[0]
+        return digests ^ object_hash
+    
+    def compare_object(self, object_name: str, org_frames: Dict[str, pd.DataFrame],
+                       org_list: List[str]) -> pd.DataFrame:
+        """Compare one object across orgs using the configured comparison mode"""
+        org_frames = self._differing_key_ranges(object_name, org_frames, org_list)
+        if self.comparison_mode == 'consensus':
+            if not org_frames:
+                return pd.DataFrame()
+            object_records = pd.concat([org_frames[org] for org in org_list if org in org_frames],
+                                       ignore_index=True)
+            differences = self._diff_object_consensus(object_records, org_list, object_name)
+        else:
+            differences = self._diff_object_pairwise(object_name, org_frames, org_list)
+        
+        self.logger.info(f"Compared {object_name}: {len(differences)} differences")
+        return differences
+    
+    def _diff_object_pairwise(self, object_name: str, org_frames: Dict[str, pd.DataFrame],
+                            org_list: List[str]) -> pd.DataFrame:
+        """Compare one object for every ordered org pair using digest set operations"""
+        empty = pd.DataFrame(columns=['primary_key', 'composite_key'])
+        with self.metrics.phase('set_comparison', object_name):
+            org_digests = {
+                org: np.unique(org_frames[org]['composite_key'].to_numpy(dtype=np.uint64))
+                if org in org_frames else np.array([], dtype=np.uint64)
+                for org in org_list
+            }
         
         # Generate all org pairs for comparison
         comparison_count = 0
         total_comparisons = len(org_list) * (len(org_list) - 1)
+        pair_differences = []
         
         for ref_org in org_list:
             for comp_org in org_list:
                 if ref_org != comp_org:
                     comparison_count += 1
-                    self.logger.info(f"Comparison {comparison_count}/{total_comparisons}: {ref_org} vs {comp_org}")
-                    
-                    # Get sets for comparison
-                    ref_set = set(org_datasets[ref_org]['composite_key'])
-                    comp_set = set(org_datasets[comp_org]['composite_key'])
+                    self.logger.debug(f"{object_name} comparison {comparison_count}/{total_comparisons}: {ref_org} vs {comp_org}")
                     
-                    # Find differences using set operations (very fast)
-                    differences = ref_set - comp_set
+                    # Find differences using sorted array set operations (very fast)
+                    # Records with identical digests have identical compared fields
+                    with self.metrics.phase('set_comparison', object_name):
+                        differences = np.setdiff1d(org_digests[ref_org], org_digests[comp_org], assume_unique=True)
                     
-                    if differences:
-                        self.logger.debug(f"Found {len(differences)} differences")
-                        self._process_differences(
-                            differences, ref_org, comp_org, 
-                            org_datasets, mega_df
-                        )
-                    
-                    # Check for value differences in common records
-                    common_keys = ref_set & comp_set
-                    if common_keys:
-                        self._check_value_differences(
-                            common_keys, ref_org, comp_org, org_datasets
-                        )
-        
-        self.logger.info(f"Completed {comparison_count} set comparisons")
-    
-    def _process_differences(self, differences: Set[Tuple], reference_org: str, 
-                           compared_org: str, org_datasets: Dict, mega_df: pd.DataFrame):
-        """Process differences found by set operations"""
-        ref_records = org_datasets[reference_org]
-        comp_records = org_datasets[compared_org]
-        
-        for diff_tuple in differences:
-            # Find the record in reference org
-            matching_ref = ref_records[ref_records['composite_key'] == diff_tuple]
-            
-            if matching_ref.empty:
-                continue
-                
-            ref_record = matching_ref.iloc[0]
-            primary_key_value = ref_record['primary_key']
-            object_name = ref_record['object_name']
-            
-            # Check if record exists in compared org
-            matching_comp = comp_records[
-                (comp_records['primary_key'] == primary_key_value) & 
-                (comp_records['object_name'] == object_name)
-            ]
-            
-            if matching_comp.empty:
-                # Record missing in compared org
-                self._record_missing_difference(
-                    ref_record, reference_org, compared_org, object_name
-                )
-            else:
-                # Record exists but values differ
-                comp_record = matching_comp.iloc[0]
-                self._find_and_record_field_differences(
-                    ref_record, comp_record, reference_org, compared_org, object_name
-                )
+                    if differences.size:
+                        self.logger.debug(f"Found {differences.size} differences")
+                        with self.metrics.phase('field_diff', object_name):
+                            pair_differences.append(self._process_differences(
+                                differences, ref_org, comp_org, object_name,
+                                org_frames.get(ref_org, empty), org_frames.get(comp_org, empty)
+                            ))
+        
+        if not pair_differences:
+            return pd.DataFrame()
+        
+        # Key-major order: all pairs of one record together, pairs in comparison order
+        with self.metrics.phase('field_diff', object_name):
+            differences = pd.concat(pair_differences, ignore_index=True)
+            order = np.argsort(self._sort_keys(differences['ForeignKeyValue']), kind='stable')
+            return differences.iloc[order].reset_index(drop=True)
     
-    def _check_value_differences(self, common_keys: Set[Tuple], ref_org: str,
-                               comp_org: str, org_datasets: Dict):
-        """Check for value differences in records that exist in both orgs"""
-        ref_records = org_datasets[ref_org]
-        comp_records = org_datasets[comp_org]
+    def _diff_object_consensus(self, object_records: pd.DataFrame, org_list: List[str],
+                             object_name: str) -> pd.DataFrame:
+        """Compare one object across all orgs at once, one row per differing (key, field)"""
+        with self.metrics.phase('set_comparison', object_name):
+            keyed = object_records[object_records['primary_key'].notna()]
+            if len(keyed) != len(object_records):
+                self.logger.warning(f"Skipping {len(object_records) - len(keyed)} {object_name} records without a foreign key value")
+            
+            # First record per key in each org
+            keyed = keyed.drop_duplicates(subset=['org_name', 'primary_key'])
+            
+            # Keys whose record exists in every org with one digest are identical everywhere
+            key_stats = keyed.groupby('primary_key', sort=False).agg(
+                org_count=('org_name', 'size'),
+                digest_count=('composite_key', 'nunique')
+            )
+            differing = key_stats[(key_stats['org_count'] < len(org_list)) | (key_stats['digest_count'] > 1)]
+        if differing.empty:
+            return pd.DataFrame()
         
-        for key_tuple in common_keys:
-            ref_match = ref_records[ref_records['composite_key'] == key_tuple]
-            comp_match = comp_records[comp_records['composite_key'] == key_tuple]
+        with self.metrics.phase('field_diff', object_name):
+            keys = differing.index.to_series()
+            keys = pd.Index(keys.iloc[np.argsort(self._sort_keys(keys), kind='stable')])
+            
+            populated_columns = [col for col in keyed.columns if keyed[col].notna().any()]
+            fields_to_compare = self._get_compare_fields(populated_columns, object_name)
+            
+            # Align every org on the same key order
+            aligned = {}
+            presence = np.zeros((len(keys), len(org_list)), dtype=bool)
+            for org_index, org in enumerate(org_list):
+                org_records = keyed[keyed['org_name'] == org].set_index('primary_key')
+                presence[:, org_index] = keys.isin(org_records.index)
+                aligned[org] = org_records.reindex(keys)
             
-            if not ref_match.empty and not comp_match.empty:
-                ref_record = ref_match.iloc[0]
-                comp_record = comp_match.iloc[0]
+            org_count = presence.sum(axis=1)
+            key_values = keys.to_numpy(dtype=object)
+            foreign_key_field = self._get_foreign_key_field(object_name)
+            difference_frames = []
+            
+            # One RECORD_MISSING row per key absent from at least one org
+            missing_rows = np.flatnonzero(org_count < len(org_list))
+            if missing_rows.size:
+                missing = {
+                    'ForeignKeyField': foreign_key_field,
+                    'ForeignKeyValue': key_values[missing_rows],
+                    'ObjectFieldName': object_name,
+                    'DifferenceType': 'RECORD_MISSING'
+                }
+                for org_index, org in enumerate(org_list):
+                    missing[f'Org_{org}'] = np.where(presence[missing_rows, org_index], 'EXISTS', 'MISSING')
+                missing['_row'] = missing_rows
+                missing['_field'] = -1
+                difference_frames.append(pd.DataFrame(missing))
+            
+            # Per-field value signatures shared by all orgs: one factorization per field
+            comparable = org_count >= 2
+            for position, field_name in enumerate(fields_to_compare):
+                columns = [aligned[org][field_name] if field_name in aligned[org].columns
+                           else pd.Series(None, index=keys, dtype=object)
+                           for org in org_list]
+                if self._share_dictionary(*columns):
+                    codes = np.column_stack([col.cat.codes.to_numpy() for col in columns])
+                    # Records absent from an org do not take part in the vote
+                    lowest = np.where(presence, codes, np.iinfo(codes.dtype).max).min(axis=1)
+                    highest = np.where(presence, codes, np.iinfo(codes.dtype).min).max(axis=1)
+                    differs = lowest != highest
+                else:
+                    differs = field_kernels.consensus_differences(columns, presence)
+                diff_rows = np.flatnonzero(comparable & differs)
+                if not diff_rows.size:
+                    continue
                 
-                # This should rarely happen with proper composite keys
-                # but let's handle it gracefully
-                if not self._records_identical(ref_record, comp_record):
-                    object_name = ref_record['object_name']
-                    self._find_and_record_field_differences(
-                        ref_record, comp_record, ref_org, comp_org, object_name
-                    )
-    
-    def _records_identical(self, record1: pd.Series, record2: pd.Series) -> bool:
-        """Check if two records are identical (excluding metadata)"""
-        exclude_cols = {'org_name', 'composite_key', 'object_name', 'primary_key'}
-        object_name = record1.get('object_name', '')
+                differences = {
+                    'ForeignKeyField': foreign_key_field,
+                    'ForeignKeyValue': key_values[diff_rows],
+                    'ObjectFieldName': f"{object_name}.{field_name}",
+                    'DifferenceType': 'VALUE_DIFFERENCE'
+                }
+                for org_index, org in enumerate(org_list):
+                    # Only the differing rows are decoded back to values
+                    values = aligned[org][field_name].iloc[diff_rows].to_numpy(dtype=object) \
+                        if field_name in aligned[org].columns else np.full(diff_rows.size, None, dtype=object)
+                    differences[f'Org_{org}'] = np.where(presence[diff_rows, org_index], values, 'MISSING')
+                differences['_row'] = diff_rows
+                differences['_field'] = position
+                difference_frames.append(pd.DataFrame(differences))
+            
+            if not difference_frames:
+                return pd.DataFrame()
+            
+            differences = pd.concat(difference_frames, ignore_index=True)
+            differences = differences.sort_values(['_row', '_field'], kind='stable')
+            return differences.drop(columns=['_row', '_field']).reset_index(drop=True)
+    
+    def _process_differences(self, differences: np.ndarray, reference_org: str, 
+                           compared_org: str, object_name: str,
+                           ref_records: pd.DataFrame, comp_records: pd.DataFrame) -> pd.DataFrame:
+        """
+        Process differences found by set operations
+        Uses one keyed join per object instead of scanning the compared org per difference
+        """
+        # Find the records in reference org (first record per digest)
+        matching_ref = ref_records[ref_records['composite_key'].isin(differences)]
+        matching_ref = matching_ref.drop_duplicates(subset='composite_key')
         
-        # Get configured fields for this object
-        configured_fields = self.configured_fields.get(object_name, [])
+        return self._diff_object_records(
+            matching_ref, comp_records, reference_org, compared_org, object_name
+        )
+    
+    def _diff_object_records(self, ref_object: pd.DataFrame, comp_object: pd.DataFrame,
+                           ref_org: str, comp_org: str, object_name: str) -> pd.DataFrame:
+        """Join reference records to the compared org on primary key and diff every field in one pass"""
+        # Only fields holding data on either side can differ
+        populated_columns = [col for col in ref_object.columns 
+                             if ref_object[col].notna().any() 
+                             or (col in comp_object.columns and comp_object[col].notna().any())]
+        fields_to_compare = [f for f in self._get_compare_fields(populated_columns, object_name)
+                             if f in comp_object.columns]
         
-        # If no fields configured, compare all non-metadata fields
-        if configured_fields:
-            fields_to_compare = configured_fields
-        else:
-            # Fallback to all fields except metadata
-            metadata_fields = {'_sourceOrg', '_fetchTimestamp', '_recordIndex', '_primaryKey', '_objectName'}
-            fields_to_compare = [f for f in record1.index 
-                               if f not in exclude_cols and f not in metadata_fields]
-        
-        for col in fields_to_compare:
-            if col not in exclude_cols and col in record1.index and col in record2.index:
-                if pd.isna(record1[col]) and pd.isna(record2[col]):
-                    continue
-                if record1[col] != record2[col]:
-                    return False
-        return True
-    
-    def _find_and_record_field_differences(self, ref_record: pd.Series, 
-                                         comp_record: pd.Series, ref_org: str,
-                                         comp_org: str, object_name: str):
-        """Find exact field differences between two records"""
-        exclude_cols = {'org_name', 'composite_key', 'object_name', 'primary_key'}
-        primary_key_value = ref_record['primary_key']
+        # First record per key in the compared org, records without a key never match
+        comp_keyed = comp_object[comp_object['primary_key'].notna()]
+        comp_keyed = comp_keyed.drop_duplicates(subset='primary_key')[['primary_key'] + fields_to_compare]
         
-        # Get configured fields for this object
-        configured_fields = self.configured_fields.get(object_name, [])
+        joined = ref_object[['primary_key'] + fields_to_compare].merge(
+            comp_keyed, on='primary_key', how='left', suffixes=('', '__comp'),
+            indicator=True, sort=False
+        )
+        joined['_row'] = np.arange(len(joined))
+        matched = joined['_merge'].to_numpy() == 'both'
         
-        # If no fields configured, compare all non-metadata fields
-        if configured_fields:
-            fields_to_compare = configured_fields
-        else:
-            # Fallback to all fields except metadata
-            metadata_fields = {'_sourceOrg', '_fetchTimestamp', '_recordIndex', '_primaryKey', '_objectName'}
-            fields_to_compare = [f for f in ref_record.index 
-                               if f not in exclude_cols and f not in metadata_fields]
-        
-        for field_name in fields_to_compare:
-            if field_name not in exclude_cols and field_name in ref_record.index and field_name in comp_record.index:
-                ref_val = ref_record[field_name]
-                comp_val = comp_record[field_name]
-                
-                if pd.isna(ref_val) and pd.isna(comp_val):
-                    continue
-                    
-                if ref_val != comp_val:
-                    self._record_field_difference(
-                        primary_key_value, object_name, field_name,
-                        ref_org, ref_val, comp_org, comp_val
-                    )
-    
-    def _record_missing_difference(self, ref_record: pd.Series, ref_org: str,
-                                 comp_org: str, object_name: str):
-        """Record when entire record is missing in compared org"""
-        primary_key_value = ref_record['primary_key']
-        foreign_key_field = self._get_foreign_key_field(object_name)
+        # Records missing in compared org
+        difference_frames = [
+            self._record_missing_differences(joined.loc[~matched], ref_org, comp_org, object_name)
+        ]
+        
+        # Field-level differences for records present in both orgs
+        present = joined.loc[matched]
+        for position, field_name in enumerate(fields_to_compare):
+            diff_mask = self._field_difference_mask(present[field_name], present[f"{field_name}__comp"])
+            if diff_mask.any():
+                difference_frames.append(self._record_field_differences(
+                    present.loc[diff_mask], object_name, field_name, position,
+                    ref_org, comp_org
+                ))
+        
+        differences = pd.concat(difference_frames, ignore_index=True)
+        
+        # Order output by key, then by field order within each record
+        differences['_key'] = self._sort_keys(differences['ForeignKeyValue'])
+        differences = differences.sort_values(['_key', '_row', '_field'], kind='stable')
+        return differences.drop(columns=['_key', '_row', '_field']).reset_index(drop=True)
+    
+    def _sort_keys(self, keys: pd.Series) -> np.ndarray:
+        """String form of foreign key values that output rows are ordered by; nulls read 'None' or 'nan'"""
+        return keys.to_numpy(dtype=object).astype(str)
+    
+    def _field_difference_mask(self, ref_values: pd.Series, comp_values: pd.Series) -> np.ndarray:
+        """Rows where a field differs, using the comparison kernel for the field's value types"""
+        if self._share_dictionary(ref_values, comp_values):
+            # Shared dictionary: integer test on codes, -1 marks null on both sides
+            return ref_values.cat.codes.to_numpy() != comp_values.cat.codes.to_numpy()
         
+        return field_kernels.difference_mask(ref_values, comp_values)
+    
+    def _share_dictionary(self, *columns: pd.Series) -> bool:
+        """True when every column is dictionary-encoded against the same categories"""
+        if not all(isinstance(col.dtype, pd.CategoricalDtype) for col in columns):
+            return False
+        categories = columns[0].cat.categories
+        return all(col.cat.categories.equals(categories) for col in columns[1:])
+    
+    def _record_missing_differences(self, missing: pd.DataFrame, ref_org: str,
+                                  comp_org: str, object_name: str) -> pd.DataFrame:
+        """Record entire records missing in compared org"""
         # For missing records, create a single entry showing the record is missing
         # NOT an entry for each field!
-        diff_record = {
-            'ForeignKeyField': foreign_key_field,
-            'ForeignKeyValue': primary_key_value,
+        return pd.DataFrame({
+            'ForeignKeyField': self._get_foreign_key_field(object_name),
+            'ForeignKeyValue': missing['primary_key'].to_numpy(dtype=object),
             'ObjectFieldName': object_name,  # Just the object name, not individual fields
             'DifferenceType': 'RECORD_MISSING',
             f'Org_{ref_org}': 'EXISTS',
-            f'Org_{comp_org}': 'MISSING'
-        }
-        
-        self.final_differences_df.append(diff_record)
+            f'Org_{comp_org}': 'MISSING',
+            '_row': missing['_row'].to_numpy(),
+            '_field': -1
+        })
     
-    def _record_field_difference(self, primary_key_value: Any, object_name: str,
-                               field_name: str, org1: str, val1: Any,
-                               org2: str, val2: Any):
-        """Record a single field difference in the final differences list"""
-        # This method should only be called for field value differences
-        # Missing records are handled by _record_missing_difference
-        diff_type = 'VALUE_DIFFERENCE'
-        
-        # Create difference record - exact same format as original
-        diff_record = {
+    def _record_field_differences(self, differing: pd.DataFrame, object_name: str,
+                                field_name: str, field_position: int,
+                                org1: str, org2: str) -> pd.DataFrame:
+        """Record the differences of one field for all differing records"""
+        # Missing records are handled by _record_missing_differences
+        return pd.DataFrame({
             'ForeignKeyField': self._get_foreign_key_field(object_name),
-            'ForeignKeyValue': primary_key_value,
+            'ForeignKeyValue': differing['primary_key'].to_numpy(dtype=object),
             'ObjectFieldName': f"{object_name}.{field_name}",
-            'DifferenceType': diff_type,
-            f'Org_{org1}': val1,
-            f'Org_{org2}': val2
-        }
-        
-        self.final_differences_df.append(diff_record)
+            'DifferenceType': 'VALUE_DIFFERENCE',
+            f'Org_{org1}': differing[field_name].to_numpy(dtype=object),
+            f'Org_{org2}': differing[f"{field_name}__comp"].to_numpy(dtype=object),
+            '_row': differing['_row'].to_numpy(),
+            '_field': field_position
+        })
     
     def _get_foreign_key_field(self, object_name: str) -> str:
         """Get foreign key field for object from config"""
@@ -570,6 +1097,9 @@ class OptimizedSalesforceDataComparator:
         """
         self.logger.info("Starting optimized ALL-vs-ALL comparison")
         start_time = time.time()
+        self.metrics = RunMetrics('multi_org_comparison', profile=self.profile, engine=self.ENGINE,
+                                  comparison_mode=self.comparison_mode, workers=self.workers,
+                                  incremental=self.incremental)
         
         try:
             # Discovery phase
@@ -587,65 +1117,626 @@ class OptimizedSalesforceDataComparator:
             
             self.logger.info(f"Processing {len(objects_with_keys)} objects with foreign keys: {objects_with_keys}")
             
-            # Create mega DataFrame for set operations
-            mega_df = self.create_mega_dataframe(self.discovered_orgs, base_path)
+            # Stream one object at a time: load, compare, write, free
+            # Peak memory follows the largest object instead of the whole extraction
+            self._start_output(output_dir)
+            self.record_index_dir = os.path.join(output_dir, 'record_index') if self.incremental else None
+            with self.metrics.phase('result_cache_lookup'):
+                cached_objects = self._open_result_cache(base_path, objects_with_keys, output_dir)
+            objects_to_compare = [obj for obj in objects_with_keys if obj not in cached_objects]
+            with self.metrics.phase('parent_index'):
+                # Cached objects need the indexes too, for the parent roll-up
+                self.parent_indexes = self._build_parent_indexes(base_path, objects_with_keys)
+            
+            # Objects over the memory budget are compared out of core, in key-range partitions
+            self._partition_counts = {}
+            for object_name in objects_to_compare:
+                partition_count = self._partition_count(base_path, object_name)
+                if partition_count > 1:
+                    self._partition_counts[object_name] = partition_count
+            objects_in_memory = [obj for obj in objects_to_compare if obj not in self._partition_counts]
+            
+            if self.workers > 1 and len(objects_in_memory) > 1:
+                self._compare_objects_parallel(base_path, objects_with_keys, objects_in_memory, output_dir)
+            else:
+                loaded_objects = self._iter_loaded_objects(base_path, objects_in_memory)
+                for index, object_name in enumerate(objects_with_keys, 1):
+                    self.logger.info(f"Processing object {index}/{len(objects_with_keys)}: {object_name}")
+                    if object_name in cached_objects:
+                        self._write_cached_differences(object_name)
+                        continue
+                    if object_name in self._partition_counts:
+                        self._write_object_parts(object_name, self._compare_object_partitioned(base_path, object_name))
+                        continue
+                    
+                    _, org_frames = next(loaded_objects)
+                    self._check_memory_budget(object_name, org_frames)
+                    self._write_object_differences(object_name, self._compare_loaded_object(object_name, org_frames))
+                    
+                    # Memory cleanup
+                    del org_frames
+                    gc.collect()
             
-            # Run optimized set-based comparisons
-            self.run_set_comparisons(mega_df, self.discovered_orgs, base_path)
+            # Child records' parent keys for the roll-up of differences
+            self.child_parent_links = None
+            if self.lookup_fields and self._difference_writer.rows_written:
+                with self.metrics.phase('rollup_links'):
+                    self.child_parent_links = self._read_child_parent_links(base_path, objects_with_keys)
             
             # Consolidate and output results
-            summary = self._generate_output_files(output_dir)
+            with self.metrics.phase('output'):
+                summary = self._generate_output_files(output_dir)
             
             end_time = time.time()
             execution_time = end_time - start_time
+            metrics_file = self.metrics.write(output_dir)
             
             self.logger.info(f"Optimized comparison completed in {execution_time:.2f} seconds")
+            self.logger.info(f"Phase metrics written to {metrics_file}")
             
             return {
                 'success': True,
                 'execution_time': execution_time,
                 'total_orgs': len(self.discovered_orgs),
                 'total_objects': len(objects_with_keys),
-                'total_differences': len(self.final_differences_df),
+                'total_differences': self.total_differences,
                 'output_files': summary.get('output_files', []),
-                'performance_improvement': f"Set-based operations used for {len(self.discovered_orgs)}x{len(self.discovered_orgs)} comparisons"
+                'metrics_file': metrics_file,
+                'comparison_mode': self.comparison_mode,
+                'engine': self.ENGINE,
+                'workers': self.workers,
+                'incremental': self.incremental,
+                'result_cache': self.result_cache.summary() if self.result_cache else None,
+                'performance_improvement': self._describe_comparison_strategy()
             }
             
         except Exception as e:
             self.logger.error(f"Comparison failed: {e}")
             raise
     
+    def _compare_object_from_disk(self, base_path: str, object_name: str) -> pd.DataFrame:
+        """Load one object from every org, compare it and release the loaded frames"""
+        org_frames = self._load_object_frames(base_path, self.discovered_orgs, object_name)
+        self._check_memory_budget(object_name, org_frames)
+        
+        differences = self._compare_loaded_object(object_name, org_frames)
+        
+        # Memory cleanup
+        del org_frames
+        gc.collect()
+        return differences
+    
+    def _compare_loaded_object(self, object_name: str, org_frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Compare one loaded object, incrementally against the previous run when enabled"""
+        if self.record_index_dir:
+            return self._compare_object_incremental(object_name, org_frames)
+        return self.compare_object(object_name, org_frames, self.discovered_orgs)
+    
+    def _compare_object_incremental(self, object_name: str, org_frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Re-diff only keys whose content hash changed in any org since the previous run
+        Differences of every other key are taken from the result stored by that run
+        """
+        index_dir = os.path.join(self.record_index_dir, object_name)
+        with self.metrics.phase('key_build', object_name):
+            key_digests = {org: self._key_digests(frame) for org, frame in org_frames.items()}
+        previous = self._load_record_index(index_dir, object_name)
+        
+        if previous is not None and any(frame['primary_key'].isna().any() for frame in org_frames.values()):
+            self.logger.info(f"{object_name} has records without a foreign key value - comparing in full")
+            previous = None
+        
+        if previous is None:
+            differences = self.compare_object(object_name, org_frames, self.discovered_orgs)
+        else:
+            previous_digests, previous_differences = previous
+            changed_keys = self._changed_keys(previous_digests, key_digests)
+            total_keys = len(set().union(*(digests.index for digests in key_digests.values())))
+            self.logger.info(f"{object_name}: re-comparing {len(changed_keys)} of {total_keys} keys, "
+                             f"reusing stored differences for the rest")
+            
+            changed_frames = {}
+            for org, frame in org_frames.items():
+                changed = frame[frame['primary_key'].astype(str).isin(changed_keys)]
+                if not changed.empty:
+                    changed_frames[org] = changed
+            
+            new_differences = self.compare_object(object_name, changed_frames, self.discovered_orgs) \
+                if changed_frames else pd.DataFrame()
+            kept = previous_differences[~previous_differences['ForeignKeyValue'].isin(changed_keys)]
+            
+            # Each key's rows come from one side, so a stable key sort restores full-run order
+            differences = pd.concat([kept, new_differences], ignore_index=True)
+            if not differences.empty:
+                order = np.argsort(self._sort_keys(differences['ForeignKeyValue']), kind='stable')
+                differences = differences.iloc[order].reset_index(drop=True)
+        
+        self._save_record_index(index_dir, object_name, key_digests, differences)
+        return differences
+    
+    def _partition_count(self, base_path: str, object_name: str) -> int:
+        """Key-range partitions to compare an object in; 1 means it is loaded whole"""
+        if self.partitions:
+            return min(self.partitions, self.MAX_PARTITIONS)
+        if not self.max_memory_bytes:
+            return 1
+        
+        estimated_bytes, largest_org_rows = self._estimated_object_size(base_path, object_name)
+        if estimated_bytes <= self.max_memory_bytes:
+            return 1
+        
+        # Each partition of every org takes up to half the budget, leaving room for the comparison,
+        # but holds at least a chunk_size batch of the largest org: smaller buckets only add spill files
+        by_memory = int(np.ceil(2 * estimated_bytes / self.max_memory_bytes))
+        by_rows = max(1, int(np.ceil(largest_org_rows / self.chunk_size)))
+        return min(by_memory, by_rows, self.MAX_PARTITIONS)
+    
+    def _estimated_object_size(self, base_path: str, object_name: str) -> Tuple[int, int]:
+        """
+        Rough in-memory size of an object across orgs, with the record count of its largest org
+        Parquet metadata gives both; other formats count as their file size, with records
+        estimated from the lines in the file's first ROW_SAMPLE_BYTES
+        """
+        total_bytes = 0
+        largest_org_rows = 0
+        for org in self.discovered_orgs:
+            source_file = self._source_file(base_path, org, object_name)
+            if source_file is None:
+                continue
+            if source_file.endswith('.parquet'):
+                metadata = pq.read_metadata(source_file)
+                total_bytes += sum(metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups))
+                org_rows = metadata.num_rows
+            else:
+                file_bytes = os.path.getsize(source_file)
+                total_bytes += file_bytes
+                with open(source_file, 'rb') as f:
+                    sample = f.read(self.ROW_SAMPLE_BYTES)
+                org_rows = sample.count(b'\n') if len(sample) == file_bytes \
+                    else int(file_bytes * max(1, sample.count(b'\n')) / len(sample))
+            largest_org_rows = max(largest_org_rows, org_rows)
+        return total_bytes, largest_org_rows
+    
+    def _compare_object_partitioned(self, base_path: str, object_name: str) -> Iterator[pd.DataFrame]:
+        """
+        Compare an object too large for the memory budget one key-range partition at a time
+        Each org's records are spilled to a temporary directory in chunk_size batches; every key's
+        records share a partition and partitions follow output order, so the differences match a
+        comparison of the whole object
+        """
+        key_field = self.foreign_key_mappings[object_name]
+        if self.record_index_dir:
+            # Stored digests would no longer match this run's differences, so drop them
+            self.logger.warning(f"Incremental comparison is not available for partitioned {object_name} - comparing in full")
+            shutil.rmtree(os.path.join(self.record_index_dir, object_name), ignore_errors=True)
+        
+        sources = {}
+        for org in self.discovered_orgs:
+            source_file = self._source_file(base_path, org, object_name)
+            if source_file is not None:
+                sources[org] = source_file
+        
+        with tempfile.TemporaryDirectory(prefix=f"{object_name}_partitions_") as spill_dir:
+            partitioner = ObjectPartitioner(
+                spill_dir, key_field, self._partition_counts[object_name], self.chunk_size,
+                lambda columns: self._projected_columns(object_name, key_field, columns),
+                self._sort_keys, self.logger, key_filter=self._key_filter(object_name)
+            )
+            with self.metrics.phase('partition_spill', object_name) as counts:
+                partitioner.spill(sources)
+                counts['bytes'] = sum(os.path.getsize(source_file) for source_file in sources.values())
+            self.logger.info(f"Comparing {object_name} out of core in {partitioner.bucket_count} partitions")
+            
+            for bucket in range(partitioner.bucket_count):
+                org_frames = {}
+                for org in sources:
+                    org_frame = self._load_partition_frame(partitioner, bucket, org, object_name)
+                    if org_frame is not None:
+                        org_frames[org] = org_frame
+                
+                org_frames = self._prepare_object_frames(object_name, org_frames)
+                self.logger.debug(f"{object_name} partition {bucket + 1}/{partitioner.bucket_count}")
+                yield self.compare_object(object_name, org_frames, self.discovered_orgs)
+                
+                del org_frames
+                gc.collect()
+    
+    def _load_partition_frame(self, partitioner: ObjectPartitioner, bucket: int, org: str,
+                              object_name: str) -> Optional[pd.DataFrame]:
+        """Load and prepare one org's records of a partition"""
+        with self.metrics.phase('load', object_name, org) as counts:
+            df = partitioner.read_bucket(bucket, org)
+            if df is not None:
+                counts['rows'] = len(df)
+                counts['bytes'] = os.path.getsize(partitioner.bucket_file(bucket, org))
+        
+        if df is None or df.empty:
+            return None
+        with self.metrics.phase('key_build', object_name, org):
+            return self._prepare_org_frame(df, object_name, org, self.foreign_key_mappings[object_name])
+    
+    def _key_digests(self, frame: pd.DataFrame) -> pd.Series:
+        """Content hash per primary key: XOR of the digests of the records holding it"""
+        codes, keys = pd.factorize(frame['primary_key'].astype(str))
+        digests = np.zeros(len(keys), dtype=np.uint64)
+        np.bitwise_xor.at(digests, codes, frame['composite_key'].to_numpy(dtype=np.uint64))
+        return pd.Series(digests, index=keys)
+    
+    def _changed_keys(self, previous_digests: Dict[str, pd.Series], key_digests: Dict[str, pd.Series]) -> Set[str]:
+        """Keys added, removed or edited in any org"""
+        empty = pd.Series([], dtype=np.uint64)
+        changed = set()
+        
+        for org in self.discovered_orgs:
+            before = previous_digests.get(org, empty)
+            after = key_digests.get(org, empty)
+            changed.update(before.index.symmetric_difference(after.index))
+            
+            common = before.index.intersection(after.index)
+            edited = before.loc[common].to_numpy() != after.loc[common].to_numpy()
+            changed.update(common[edited])
+        
+        return changed
+    
+    def _record_index_state(self, object_name: str) -> Dict:
+        """Settings the stored differences depend on beyond record content"""
+        return {
+            'engine': self.ENGINE,
+            'comparison_mode': self.comparison_mode,
+            'foreign_key': self.foreign_key_mappings.get(object_name),
+            'canonical_forms': canonical_forms.CANONICAL_FORMS_VERSION,
+            'output_columns': self._output_columns()
+        }
+    
+    def _load_record_index(self, index_dir: str, object_name: str) -> Optional[Tuple[Dict[str, pd.Series], pd.DataFrame]]:
+        """Read the key digests and differences stored by the previous run, if they still apply"""
+        state_file = os.path.join(index_dir, 'state.json')
+        if not os.path.exists(state_file):
+            return None
+        
+        try:
+            with open(state_file, 'r') as f:
+                state = json.load(f)
+            if state.get('settings') != self._record_index_state(object_name):
+                self.logger.info(f"Comparison settings changed for {object_name} - comparing in full")
+                return None
+            
+            previous_digests = {}
+            for org in state.get('orgs', []):
+                index = pd.read_parquet(os.path.join(index_dir, f"{org}.parquet"))
+                previous_digests[org] = pd.Series(index['digest'].to_numpy(dtype=np.uint64), index=index['primary_key'])
+            
+            # Stored as rendered text so reused rows are written exactly as before
+            previous_differences = pd.read_csv(os.path.join(index_dir, 'differences.csv'),
+                                               dtype=str, keep_default_na=False)
+            return previous_digests, previous_differences
+            
+        except Exception as e:
+            self.logger.warning(f"Could not read record index for {object_name}: {e}")
+            return None
+    
+    def _save_record_index(self, index_dir: str, object_name: str, key_digests: Dict[str, pd.Series],
+                           differences: pd.DataFrame):
+        """Store this run's key digests and differences for the next incremental run"""
+        try:
+            os.makedirs(index_dir, exist_ok=True)
+            
+            # Drop the state first so an interrupted save is never mistaken for a valid index
+            state_file = os.path.join(index_dir, 'state.json')
+            if os.path.exists(state_file):
+                os.remove(state_file)
+            
+            for org, digests in key_digests.items():
+                pd.DataFrame({'primary_key': digests.index, 'digest': digests.to_numpy()}).to_parquet(
+                    os.path.join(index_dir, f"{org}.parquet"), index=False
+                )
+            differences.reindex(columns=self._output_columns()).to_csv(
+                os.path.join(index_dir, 'differences.csv'), index=False
+            )
+            
+            with open(state_file, 'w') as f:
+                json.dump({'settings': self._record_index_state(object_name), 'orgs': sorted(key_digests)}, f, indent=2)
+                
+        except Exception as e:
+            self.logger.warning(f"Could not save record index for {object_name}: {e}")
+    
+    def _compare_objects_parallel(self, base_path: str, objects_with_keys: List[str],
+                                  objects_to_compare: List[str], output_dir: str):
+        """
+        Compare objects on a process pool, scheduling the largest inputs first
+        Results are written in the serial object order so the output matches a single-process run
+        """
+        schedule = sorted(objects_to_compare, key=lambda obj: self._object_input_bytes(base_path, obj), reverse=True)
+        pool_size = min(self.workers, len(schedule))
+        self.logger.info(f"Comparing {len(schedule)} objects on {pool_size} worker processes, largest first: {schedule}")
+        
+        with ProcessPoolExecutor(max_workers=pool_size) as executor:
+            futures = {
+                object_name: executor.submit(_compare_object_worker, self, base_path, object_name)
+                for object_name in schedule
+            }
+            
+            for index, object_name in enumerate(objects_with_keys, 1):
+                if object_name in futures:
+                    differences, worker_metrics = futures.pop(object_name).result()
+                    self.metrics.merge(worker_metrics)
+                    self._write_object_differences(object_name, differences)
+                elif object_name in self._partition_counts:
+                    # Partitioned objects run here, one bucket at a time, to stay within the memory budget
+                    self._write_object_parts(object_name, self._compare_object_partitioned(base_path, object_name))
+                else:
+                    self._write_cached_differences(object_name)
+                self.logger.info(f"Merged object {index}/{len(objects_with_keys)}: {object_name}")
+    
+    def _open_result_cache(self, base_path: str, objects: List[str], output_dir: str) -> Set[str]:
+        """Open the result cache for this run and return the objects whose stored differences still apply"""
+        self._cache_keys = {}
+        self._fingerprints = {}
+        if not self.use_result_cache:
+            self.result_cache = None
+            return set()
+        
+        self.result_cache = ComparisonResultCache(os.path.join(output_dir, 'result_cache'),
+                                                  self.result_cache_bytes, self.logger)
+        cached_objects = set()
+        for object_name in objects:
+            fingerprints = {org: self._input_fingerprint(base_path, org, object_name) for org in self.discovered_orgs}
+            # Translated lookups also depend on the parents' Ids and keys
+            for parent_object in sorted({lookup['parent'] for lookup in self.lookup_fields.get(object_name, {}).values()}):
+                fingerprints.update({f"{org}/{parent_object}": self._input_fingerprint(base_path, org, parent_object)
+                                     for org in self.discovered_orgs})
+            key = self.result_cache.object_key(object_name, fingerprints, self._object_settings(object_name))
+            self._cache_keys[object_name] = key
+            if self.result_cache.lookup(object_name, key):
+                cached_objects.add(object_name)
+        
+        return cached_objects
+    
+    def _input_fingerprint(self, base_path: str, org: str, object_name: str) -> Optional[str]:
+        """Digest of the extracted file an org's records come from, computed once per run"""
+        source_file = self._extracted_file(base_path, org, object_name)
+        if source_file is None:
+            return None
+        if source_file not in self._fingerprints:
+            extension = os.path.splitext(source_file)[1].lstrip('.')
+            self._fingerprints[source_file] = f"{extension}:{ComparisonResultCache.fingerprint_file(source_file)}"
+        return self._fingerprints[source_file]
+    
+    def _extracted_file(self, base_path: str, org: str, object_name: str) -> Optional[str]:
+        """
+        File an org's records of an object were extracted to
+        A JSONL extract counts over the Parquet copy the loader writes beside it, so writing that copy
+        does not change the fingerprint
+        """
+        jsonl_file = os.path.join(base_path, org, f"{object_name}.jsonl")
+        if os.path.exists(jsonl_file):
+            return jsonl_file
+        return self._source_file(base_path, org, object_name)
+    
+    def _source_file(self, base_path: str, org: str, object_name: str) -> Optional[str]:
+        """File an org's records of an object are loaded from, following the loader's precedence"""
+        # Same precedence as _load_sf_object_data
+        for extension in ('parquet', 'jsonl', 'csv'):
+            file_path = os.path.join(base_path, org, f"{object_name}.{extension}")
+            if os.path.exists(file_path):
+                return file_path
+        return None
+    
+    def _object_settings(self, object_name: str) -> Dict:
+        """Effective settings an object's differences depend on besides its input files"""
+        return {
+            'engine': self.ENGINE,
+            'comparison_mode': self.comparison_mode,
+            'foreign_key': self.foreign_key_mappings.get(object_name),
+            'fields': self.configured_fields.get(object_name),
+            'exclude_fields': sorted(self.exclude_fields),
+            'blacklisted_fks': self._blacklisted_fk_values(object_name),
+            'lookup_fields': self.lookup_fields.get(object_name),
+            'canonical_forms': canonical_forms.CANONICAL_FORMS_VERSION,
+            'output_columns': self._output_columns()
+        }
+    
+    def _object_input_bytes(self, base_path: str, object_name: str) -> int:
+        """Size on disk of the file each org would load for an object"""
+        return sum(self._org_input_bytes(base_path, org, object_name) for org in self.discovered_orgs)
+    
+    def _org_input_bytes(self, base_path: str, org: str, object_name: str) -> int:
+        """Size on disk of the file one org's records of an object are loaded from"""
+        source_file = self._source_file(base_path, org, object_name)
+        return os.path.getsize(source_file) if source_file is not None else 0
+    
+    def _describe_comparison_strategy(self) -> str:
+        """Describe how the orgs were compared for the run result"""
+        org_count = len(self.discovered_orgs)
+        if self.comparison_mode == 'consensus':
+            return f"N-way consensus comparison across {org_count} orgs in a single pass per object"
+        return f"Set-based operations used for {org_count}x{org_count} comparisons"
+    
+    def _check_memory_budget(self, object_name: str, org_frames: Dict[str, pd.DataFrame]):
+        """Report an object's in-memory size against the --max-memory budget"""
+        if not self.max_memory_bytes:
+            return
+        
+        object_bytes = sum(self._frame_bytes(frame) for frame in org_frames.values())
+        budget_mb = self.max_memory_bytes / (1024 * 1024)
+        self.logger.info(f"{object_name} holds {object_bytes / (1024 * 1024):.1f} MB of a {budget_mb:.0f} MB budget")
+        
+        if object_bytes > self.max_memory_bytes:
+            self.logger.warning(f"{object_name} alone exceeds the --max-memory budget of {budget_mb:.0f} MB")
+    
+    def _frame_bytes(self, frame: pd.DataFrame) -> int:
+        """In-memory size of one org's prepared frame"""
+        return int(frame.memory_usage(deep=True).sum())
+    
+    def _differing_key_ranges(self, object_name: str, org_frames: Dict[str, pd.DataFrame],
+                              org_list: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Records of the key ranges whose Merkle tree hashes differ between orgs
+        None at all when every org's root matches; frames with records without a key are kept whole
+        """
+        if len(org_list) < 2 or not org_frames:
+            return org_frames
+        
+        with self.metrics.phase('merkle_tree', object_name):
+            # Roots need no keys, so objects identical in every org never build them
+            no_records = np.array([], dtype=np.uint64)
+            hashes = {org: merkle_tree.record_hashes(digests) for org, digests in self._record_digests(org_frames).items()}
+            if len({merkle_tree.root_hash(hashes.get(org, no_records)) for org in org_list}) == 1:
+                self.logger.info(f"{object_name}: Merkle roots match in every org - skipping comparison")
+                return {}
+            
+            key_codes = self._record_key_codes(org_frames)
+            if key_codes is None:
+                return org_frames
+            org_codes, key_order = key_codes
+            org_ranges, range_count = merkle_tree.key_ranges(list(org_codes.values()), key_order)
+            trees = {org: MerkleTree(ranges, hashes[org], range_count) for org, ranges in zip(org_codes, org_ranges)}
+            no_tree = MerkleTree(np.array([], dtype=np.int64), no_records, range_count)
+            leaves = merkle_tree.differing_leaves([trees.get(org, no_tree) for org in org_list])
+            self.logger.info(f"{object_name}: {len(leaves)} of {range_count} key ranges differ")
+            
+            differing_frames = {}
+            for org, tree in trees.items():
+                in_leaves = np.isin(tree.leaf_of_record, leaves)
+                if in_leaves.all():
+                    differing_frames[org] = org_frames[org]
+                elif in_leaves.any():
+                    differing_frames[org] = self._frame_rows(org_frames[org], in_leaves)
+            return differing_frames
+    
+    def _record_digests(self, org_frames: Dict[str, pd.DataFrame]) -> Dict[str, np.ndarray]:
+        """Digest of every record of each org, equal for equal records in any org"""
+        return {org: frame['composite_key'].to_numpy(dtype=np.uint64) for org, frame in org_frames.items()}
+    
+    def _record_key_codes(self, org_frames: Dict[str, pd.DataFrame]) -> Optional[Tuple[Dict[str, np.ndarray], np.ndarray]]:
+        """
+        Code of every record's key in one numbering shared by all orgs, and the codes in sorted key order
+        None when some record has no key
+        """
+        if any(frame['primary_key'].isna().any() for frame in org_frames.values()):
+            return None
+        keys = [frame['primary_key'].astype(str).to_numpy(dtype=object) for frame in org_frames.values()]
+        codes, unique_keys = pd.factorize(np.concatenate(keys))
+        org_codes = np.split(codes, np.cumsum([len(org_keys) for org_keys in keys])[:-1])
+        return dict(zip(org_frames, org_codes)), np.argsort(unique_keys.astype(str))
+    
+    def _frame_rows(self, frame: pd.DataFrame, mask: np.ndarray) -> pd.DataFrame:
+        return frame[mask]
+    
+    def _output_columns(self) -> List[str]:
+        """Fixed column layout of all_differences.csv so objects can be appended one at a time"""
+        base_cols = ['ForeignKeyField', 'ForeignKeyValue', 'ObjectFieldName', 'DifferenceType']
+        return base_cols + [f'Org_{org}' for org in self.discovered_orgs]
+    
+    def _start_output(self, output_dir: str):
+        """Reset the differences file and open a writer streaming the new run into it"""
+        os.makedirs(output_dir, exist_ok=True)
+        main_output = os.path.join(output_dir, 'all_differences.csv')
+        parquet_output = os.path.join(output_dir, 'all_differences_parquet')
+        if os.path.exists(main_output):
+            os.remove(main_output)
+        if os.path.exists(parquet_output):
+            shutil.rmtree(parquet_output)
+        self._difference_writer = DifferenceWriter(
+            main_output, self._output_columns(), self._render_differences, self.chunk_size,
+            parquet_dir=parquet_output if self.parquet_output else None
+        )
+        self.total_differences = 0
+    
+    def _write_object_differences(self, object_name: str, differences: pd.DataFrame):
+        """Stream one object's differences to all_differences.csv and into its result cache entry"""
+        self._write_object_parts(object_name, [differences])
+    
+    def _write_object_parts(self, object_name: str, parts: Iterable[pd.DataFrame]):
+        """Stream an object's differences, produced in consecutive parts, to the output and result cache"""
+        cache_entry = None
+        if self.result_cache is not None:
+            cache_entry = self.result_cache.open_entry(object_name, self._cache_keys[object_name])
+        
+        row_count = 0
+        try:
+            for differences in parts:
+                with self.metrics.phase('output', object_name) as counts:
+                    self._difference_writer.write(differences, object_name, tee=cache_entry)
+                    counts['rows'] = len(differences)
+                row_count += len(differences)
+        finally:
+            if cache_entry is not None:
+                cache_entry.close()
+        
+        if cache_entry is not None:
+            self.result_cache.commit(object_name, self._cache_keys[object_name], row_count)
+    
+    def _write_cached_differences(self, object_name: str):
+        """Copy an object's differences stored by an earlier run to the output"""
+        with self.metrics.phase('output', object_name) as counts:
+            rows_path, row_count = self.result_cache.entry(self._cache_keys[object_name])
+            self._difference_writer.write_file(rows_path, row_count, object_name)
+            counts['rows'] = row_count
+            counts['bytes'] = os.path.getsize(rows_path)
+    
+    def _write_parent_rollup(self, differences_file: str, output_dir: str) -> Optional[str]:
+        """Write parent_rollup.csv: each parent key's own differences and its children's, most first"""
+        if self.child_parent_links is None:
+            return None
+        
+        parent_key_fields = {lookup['parent']: lookup['parent_key']
+                             for lookups in self.lookup_fields.values() for lookup in lookups.values()}
+        rollup = difference_rollup.rollup_differences(
+            difference_rollup.read_difference_keys(differences_file), self.child_parent_links, parent_key_fields
+        )
+        rollup_output = os.path.join(output_dir, self.ROLLUP_FILE)
+        rollup.to_csv(rollup_output, index=False)
+        self.logger.info(f"Roll-up of {len(rollup)} parent records written to {rollup_output}")
+        return rollup_output
+    
+    def _render_differences(self, differences: pd.DataFrame, start: int, stop: int) -> bytes:
+        """all_differences.csv rows for one batch of differences, without the header line"""
+        batch = differences.iloc[start:stop].reindex(columns=self._output_columns())
+        return batch.to_csv(index=False, header=False).encode('utf-8')
+    
     def _generate_output_files(self, output_dir: str) -> Dict:
         """Generate output files in the same format as original"""
         os.makedirs(output_dir, exist_ok=True)
+        if self._difference_writer is not None:
+            self._difference_writer.close()
+            self.total_differences = self._difference_writer.rows_written
+        if self.result_cache is not None:
+            self.result_cache.evict()
         
-        if not self.final_differences_df:
+        if not self.total_differences:
             self.logger.info("No differences found")
             summary = {
                 'timestamp': datetime.now().isoformat(),
                 'total_differences': 0,
                 'organizations': self.discovered_orgs,
                 'objects_processed': self.common_objects,
-                'output_files': []
+                'output_files': [],
+                'result_cache': self.result_cache.summary() if self.result_cache else None
             }
         else:
-            # Convert to DataFrame and save
-            differences_df = pd.DataFrame(self.final_differences_df)
-            
-            # Main differences file
+            # Main differences file, written object by object
             main_output = os.path.join(output_dir, 'all_differences.csv')
-            differences_df.to_csv(main_output, index=False)
             
             # Summary file
             summary_output = os.path.join(output_dir, 'comparison_summary.json')
+            output_files = [main_output, summary_output]
+            if self.parquet_output:
+                output_files.append(self._difference_writer.parquet_dir)
+            rollup_output = self._write_parent_rollup(main_output, output_dir)
+            if rollup_output:
+                output_files.append(rollup_output)
             summary = {
                 'timestamp': datetime.now().isoformat(),
-                'total_differences': len(differences_df),
+                'total_differences': self.total_differences,
                 'organizations': self.discovered_orgs,
                 'objects_processed': [obj for obj in self.common_objects 
                                     if obj in self.foreign_key_mappings],
-                'output_files': [main_output, summary_output],
-                'performance_mode': 'optimized_set_based'
+                'output_files': output_files,
+                'performance_mode': 'optimized_set_based',
+                'comparison_mode': self.comparison_mode,
+                'engine': self.ENGINE,
+                'result_cache': self.result_cache.summary() if self.result_cache else None
             }
             
             with open(summary_output, 'w') as f:
@@ -657,6 +1748,85 @@ class OptimizedSalesforceDataComparator:
         return summary
 
 
+class OptimizedSalesforceDataComparator(StreamingSalesforceDataComparator):
+    """
+    High-performance org comparison using set-based operations
+    Drop-in replacement maintaining all existing functionality and interfaces
+    """
+    
+    def create_mega_dataframe(self, org_list: List[str], base_path: str) -> pd.DataFrame:
+        """
+        Phase 1: Combine all objects into single mega DataFrame
+        Adds metadata columns for set-based operations
+        
+        run_full_comparison streams one object at a time instead; this is kept for callers
+        that want every object in one frame, which only the pandas engine can hold
+        """
+        self.logger.info("Creating mega DataFrame for set-based comparison")
+        all_dataframes = []
+        
+        # Filter to objects with foreign keys only
+        objects_with_keys = [obj for obj in self.common_objects 
+                           if obj in self.foreign_key_mappings]
+        
+        if not objects_with_keys:
+            raise ValueError("No objects with foreign keys found")
+        
+        self.logger.info(f"Processing {len(objects_with_keys)} objects with foreign keys")
+        
+        for object_name in objects_with_keys:
+            org_frames = self._load_object_frames(base_path, org_list, object_name)
+            all_dataframes.extend(org_frames.values())
+        
+        if not all_dataframes:
+            raise ValueError(f"No data found for orgs: {org_list}")
+        
+        mega_df = pd.concat(all_dataframes, ignore_index=True)
+        self.logger.info(f"Created mega DataFrame: {len(mega_df)} total records across {len(objects_with_keys)} objects")
+        return mega_df
+    
+    def run_set_comparisons(self, mega_df: pd.DataFrame, org_list: List[str], base_path: str):
+        """
+        Phase 2: Run optimized set-based comparisons over a mega DataFrame
+        Uses pandas groupby and set operations for maximum performance
+        
+        The difference records are collected in final_differences_df; run_full_comparison
+        streams them to all_differences.csv instead and leaves it empty
+        """
+        self.logger.info(f"Running set-based comparisons for {len(org_list)} orgs")
+        self.final_differences_df = []
+        
+        for object_name, object_records in mega_df.groupby('object_name', sort=False):
+            org_frames = {org: records for org, records in object_records.groupby('org_name', sort=False)}
+            object_differences = self.compare_object(object_name, org_frames, org_list)
+            if not object_differences.empty:
+                self.final_differences_df.extend(object_differences.to_dict('records'))
+
+
+def _nested_value(value, key: str):
+    """One field of a nested relationship cell; CSV extractions hold the cell as JSON or Python literal text"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            try:
+                value = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                return None
+    return value.get(key) if isinstance(value, dict) else None
+
+
+def _compare_object_worker(comparator: StreamingSalesforceDataComparator, base_path: str,
+                           object_name: str) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Process-pool entry point: compare one object with a copy of the parent comparator
+    Returns the differences with this process's phase metrics and profiles for the parent to merge
+    """
+    comparator.metrics = RunMetrics(comparator.metrics.tool, profile=comparator.profile)
+    differences = comparator._compare_object_from_disk(base_path, object_name)
+    return differences, comparator.metrics.export()
+
+
 def main():
     """
     Command-line interface - maintains exact same parameters as original
@@ -666,6 +1836,28 @@ def main():
     parser.add_argument('--output-dir', help='Output directory for results')
     parser.add_argument('--chunk-size', type=int, default=50000, help='Chunk size for processing')
     parser.add_argument('--exclude-fields', nargs='*', help='Additional fields to exclude')
+    parser.add_argument('--mode', choices=OptimizedSalesforceDataComparator.COMPARISON_MODES, default='pairwise',
+                       help='pairwise: every ordered org pair (default); consensus: one N-way pass per object')
+    parser.add_argument('--engine', choices=['pandas', 'arrow'], default='pandas',
+                       help='pandas: DataFrame pipeline (default); arrow: keep data in pyarrow Tables end to end')
+    parser.add_argument('--max-memory', type=float,
+                       help='Memory budget in MB for a single object; larger objects are compared out of core in partitions')
+    parser.add_argument('--partitions', type=int,
+                       help='Compare every object out of core in this many key-range partitions of --chunk-size batches')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for comparing objects in parallel')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Re-compare only records changed since the previous run into the same output directory')
+    parser.add_argument('--result-cache', action='store_true',
+                       help='Reuse stored differences of objects whose input files and settings are unchanged')
+    parser.add_argument('--result-cache-size', type=float, help='Result cache size limit in MB (default 1024)')
+    parser.add_argument('--parquet-output', action='store_true',
+                       help='Also write differences as a Parquet dataset partitioned by object')
+    parser.add_argument('--ipc-cache', action='store_true',
+                       help='Keep a memory-mapped Arrow IPC copy of each Parquet/JSONL extract for fast reloads')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile every phase with cProfile and tracemalloc; writes .pstats files and allocations.txt with the results. '
+                            'Objects then load one at a time without --io-threads prefetching')
+    parser.add_argument('--io-threads', type=int, default=4, help='Threads loading org files ahead of the comparison')
     
     args = parser.parse_args()
     
@@ -678,10 +1870,26 @@ def main():
         sys.exit(1)
     
     try:
+        comparator_class = OptimizedSalesforceDataComparator
+        if args.engine == 'arrow':
+            from multi_org_comparison_arrow import ArrowSalesforceDataComparator
+            comparator_class = ArrowSalesforceDataComparator
+        
         # Initialize comparator with optimizations
-        comparator = OptimizedSalesforceDataComparator(
+        comparator = comparator_class(
             chunk_size=args.chunk_size,
-            exclude_fields=args.exclude_fields
+            exclude_fields=args.exclude_fields,
+            comparison_mode=args.mode,
+            max_memory_mb=args.max_memory,
+            workers=args.workers,
+            io_threads=args.io_threads,
+            incremental=args.incremental,
+            result_cache=args.result_cache,
+            result_cache_mb=args.result_cache_size,
+            parquet_output=args.parquet_output,
+            partitions=args.partitions,
+            ipc_cache=args.ipc_cache,
+            profile=args.profile
         )
         
         # Run comparison
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Key-range partitioning of one object for out-of-core comparison
+Every org's records are split into buckets by ranges of their foreign key and spilled to disk,
+so an object of any size can be compared one bucket at a time in bounded memory
+"""
+
+import os
+import json
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from key_filter import KeyFilter
+
+
+class ObjectPartitioner:
+    """
+    Splits one object's source files into key-range buckets under a spill directory
+
+    Ranges follow the string form of the foreign key, the same order comparison output is
+    sorted by, so all records of a key share a bucket and buckets compared in order produce
+    the rows of a full comparison in the same order. Boundaries come from a bounded sample of
+    keys taken in a first pass. Each bucket is spilled in its source format (Parquet, JSONL or
+    CSV) so reading it back goes through the same parsing as loading the whole file. Records a
+    key filter rejects are dropped while spilling and never reach a bucket
+    """
+
+    SAMPLE_SIZE = 100000  # Keys kept to place the bucket boundaries
+
+    def __init__(self, spill_dir: str, key_field: str, partitions: int, chunk_size: int,
+                 project: Callable[[List[str]], List[str]], sort_keys: Callable[[pd.Series], np.ndarray],
+                 logger: logging.Logger = None, key_filter: Optional[KeyFilter] = None):
+        self.spill_dir = spill_dir
+        self.key_field = key_field
+        self.partitions = max(1, partitions)
+        self.chunk_size = max(1, chunk_size)
+        self.project = project  # Columns worth reading given the columns a source has
+        self.sort_keys = sort_keys  # String form of keys in the comparison's output order
+        self.logger = logger or logging.getLogger(__name__)
+        self.key_filter = key_filter if key_filter is not None and key_filter.active else None
+        self.boundaries = np.array([], dtype=str)
+        self.layouts = {}  # org -> (extension, JSONL column template)
+
+    @property
+    def bucket_count(self) -> int:
+        return len(self.boundaries) + 1
+
+    def bucket_file(self, bucket: int, org: str) -> Optional[str]:
+        """Spilled records of one org in one bucket, or None when it holds none"""
+        if org not in self.layouts:
+            return None
+        extension, _ = self.layouts[org]
+        path = os.path.join(self.spill_dir, f"bucket-{bucket:04d}", f"{org}.{extension}")
+        return path if os.path.exists(path) else None
+
+    def spill(self, sources: Dict[str, str]):
+        """Place the bucket boundaries, then write every org's records into their buckets"""
+        templates = {}
+        sample = []
+        stride = 1
+        seen = 0
+
+        for org, source_file in sources.items():
+            extension = os.path.splitext(source_file)[1].lstrip('.')
+            if extension == 'jsonl':
+                templates[org] = self._jsonl_template(source_file)
+
+            for keys in self._iter_source_keys(source_file, extension, templates.get(org)):
+                # Keep every stride-th key, halving the sample and doubling the stride when it fills up
+                positions = np.arange(seen, seen + len(keys))
+                sample.extend(keys[positions % stride == 0])
+                seen += len(keys)
+                while len(sample) > self.SAMPLE_SIZE:
+                    sample = sample[::2]
+                    stride *= 2
+
+        if sample:
+            ordered = np.sort(np.array(sample, dtype=str))
+            cuts = ordered[(np.arange(1, self.partitions) * len(ordered)) // self.partitions]
+            self.boundaries = np.unique(cuts)
+        self.logger.info(f"Partitioning {seen} records into {self.bucket_count} key ranges")
+
+        for org, source_file in sources.items():
+            extension = os.path.splitext(source_file)[1].lstrip('.')
+            try:
+                if extension == 'parquet':
+                    self._spill_parquet(org, source_file)
+                elif extension == 'jsonl':
+                    self._spill_jsonl(org, source_file, templates[org])
+                else:
+                    self._spill_csv(org, source_file)
+                self.layouts[org] = (extension, templates.get(org))
+            except Exception as e:
+                self.logger.error(f"Error partitioning {source_file} for {org}: {e}")
+
+    def read_bucket(self, bucket: int, org: str) -> Optional[pd.DataFrame]:
+        """One org's records of a bucket as the loader would have read them"""
+        bucket_file = self.bucket_file(bucket, org)
+        if bucket_file is None:
+            return None
+
+        extension, template = self.layouts[org]
+        if extension == 'parquet':
+            return pd.read_parquet(bucket_file)
+        if extension == 'csv':
+            return pd.read_csv(bucket_file, dtype=str, low_memory=False)
+
+        with open(bucket_file, 'r') as f:
+            df = pd.DataFrame([json.loads(line) for line in f])
+        return self._apply_template(df, template)
+
+    def _bucket_ids(self, keys: np.ndarray, raw_keys: Optional[pd.Series] = None) -> np.ndarray:
+        """Bucket of each record, -1 for records the key filter drops"""
+        bucket_ids = np.searchsorted(self.boundaries, keys, side='right')
+        if self.key_filter is not None:
+            if raw_keys is None:
+                raw_keys = pd.Series([None] * len(keys), dtype=object)
+            bucket_ids[~self.key_filter.keep_mask(raw_keys)] = -1
+        return bucket_ids
+
+    def _key_strings(self, keys: Optional[pd.Series], row_count: int) -> np.ndarray:
+        """Keys as the comparison output sorts them; a missing key column means null keys"""
+        if keys is None:
+            keys = pd.Series([None] * row_count, dtype=object)
+        return self.sort_keys(keys)
+
+    def _iter_source_keys(self, source_file: str, extension: str,
+                          template: Optional[pd.DataFrame]) -> Iterator[np.ndarray]:
+        """Key strings of a source in chunks, reading as little as the format allows"""
+        if extension == 'parquet':
+            parquet_file = pq.ParquetFile(source_file)
+            if self.key_field not in parquet_file.schema_arrow.names:
+                yield self._key_strings(None, parquet_file.metadata.num_rows)
+                return
+            for batch in parquet_file.iter_batches(batch_size=self.chunk_size, columns=[self.key_field]):
+                yield self._key_strings(batch.column(0).to_pandas(), batch.num_rows)
+
+        elif extension == 'jsonl':
+            for _, records in self._iter_jsonl_chunks(source_file):
+                yield self._jsonl_keys(records, template)
+
+        else:
+            header = pd.read_csv(source_file, nrows=0).columns
+            if self.key_field not in header:
+                for chunk in pd.read_csv(source_file, dtype=str, usecols=[header[0]], chunksize=self.chunk_size):
+                    yield self._key_strings(None, len(chunk))
+                return
+            for chunk in pd.read_csv(source_file, dtype=str, usecols=[self.key_field], chunksize=self.chunk_size):
+                yield self._key_strings(chunk[self.key_field], len(chunk))
+
+    def _spill_parquet(self, org: str, source_file: str):
+        parquet_file = pq.ParquetFile(source_file)
+        columns = self.project(parquet_file.schema_arrow.names)
+        writers = {}
+        try:
+            for batch in parquet_file.iter_batches(batch_size=self.chunk_size, columns=columns):
+                keys = batch.column(self.key_field).to_pandas() if self.key_field in columns else None
+                bucket_ids = self._bucket_ids(self._key_strings(keys, batch.num_rows), keys)
+                for bucket in np.unique(bucket_ids[bucket_ids >= 0]):
+                    if bucket not in writers:
+                        # Keep the pandas metadata so the bucket reads back with the source's dtypes
+                        schema = batch.schema.with_metadata(parquet_file.schema_arrow.metadata)
+                        writers[bucket] = pq.ParquetWriter(self._new_bucket_file(bucket, org, 'parquet'), schema)
+                    writers[bucket].write_batch(batch.filter(pa.array(bucket_ids == bucket)))
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+    def _spill_csv(self, org: str, source_file: str):
+        header = pd.read_csv(source_file, nrows=0).columns
+        files = {}
+        try:
+            for chunk in pd.read_csv(source_file, dtype=str, low_memory=False,
+                                     usecols=self.project(list(header)), chunksize=self.chunk_size):
+                keys = chunk[self.key_field] if self.key_field in chunk.columns else None
+                bucket_ids = self._bucket_ids(self._key_strings(keys, len(chunk)), keys)
+                for bucket in np.unique(bucket_ids[bucket_ids >= 0]):
+                    if bucket not in files:
+                        files[bucket] = open(self._new_bucket_file(bucket, org, 'csv'), 'w', newline='')
+                        chunk.iloc[:0].to_csv(files[bucket], index=False)
+                    chunk[bucket_ids == bucket].to_csv(files[bucket], header=False, index=False)
+        finally:
+            for f in files.values():
+                f.close()
+
+    def _spill_jsonl(self, org: str, source_file: str, template: pd.DataFrame):
+        files = {}
+        try:
+            for lines, records in self._iter_jsonl_chunks(source_file):
+                keys = self._jsonl_key_values(records, template)
+                bucket_ids = self._bucket_ids(self._key_strings(keys, len(records)), keys)
+                for line, bucket in zip(lines, bucket_ids):
+                    if bucket < 0:
+                        continue
+                    if bucket not in files:
+                        files[bucket] = open(self._new_bucket_file(bucket, org, 'jsonl'), 'w')
+                    files[bucket].write(line)
+        finally:
+            for f in files.values():
+                f.close()
+
+    def _new_bucket_file(self, bucket: int, org: str, extension: str) -> str:
+        bucket_dir = os.path.join(self.spill_dir, f"bucket-{bucket:04d}")
+        os.makedirs(bucket_dir, exist_ok=True)
+        return os.path.join(bucket_dir, f"{org}.{extension}")
+
+    def _iter_jsonl_chunks(self, source_file: str) -> Iterator[Tuple[List[str], List[dict]]]:
+        """Valid JSONL lines with their parsed records, chunk_size at a time"""
+        lines, records = [], []
+        with open(source_file, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+                lines.append(line if line.endswith('\n') else line + '\n')
+
+                if len(records) >= self.chunk_size:
+                    yield lines, records
+                    lines, records = [], []
+        if records:
+            yield lines, records
+
+    def _jsonl_template(self, source_file: str) -> pd.DataFrame:
+        """
+        Empty frame with the columns and dtypes pandas infers when loading the whole file
+        Columns keep their first-seen order; a column missing or null in part of the file
+        widens its dtype the way it would in one DataFrame
+        """
+        columns = []
+        samples = []
+        for _, records in self._iter_jsonl_chunks(source_file):
+            chunk = pd.DataFrame(records)
+            columns.extend(col for col in chunk.columns if col not in columns)
+            # One row per chunk keeps its dtypes; a column left out of a chunk's row is filled with NaN
+            # by the concat below, widening it as the chunk's missing values would
+            typed = [col for col in chunk.columns if chunk[col].notna().any()]
+            samples.append(chunk[typed].iloc[:1])
+
+        typed_columns = pd.concat(samples, ignore_index=True) if samples else pd.DataFrame()
+        return pd.DataFrame({
+            col: pd.Series(dtype=typed_columns[col].dtype if col in typed_columns.columns else object)
+            for col in columns
+        })
+
+    def _jsonl_keys(self, records: List[dict], template: pd.DataFrame) -> np.ndarray:
+        return self._key_strings(self._jsonl_key_values(records, template), len(records))
+
+    def _jsonl_key_values(self, records: List[dict], template: pd.DataFrame) -> Optional[pd.Series]:
+        """Keys of parsed records as the loader types them, or None when the file has no key column"""
+        if self.key_field not in template.columns:
+            return None
+        # A record without the key loads as NaN, an explicit null as None
+        keys = pd.Series([record.get(self.key_field, np.nan) for record in records])
+        return self._cast(keys, template[self.key_field].dtype)
+
+    def _apply_template(self, df: pd.DataFrame, template: pd.DataFrame) -> pd.DataFrame:
+        df = df.reindex(columns=template.columns)
+        for col in df.columns:
+            df[col] = self._cast(df[col], template[col].dtype)
+        return df[self.project(list(df.columns))]
+
+    def _cast(self, values: pd.Series, dtype) -> pd.Series:
+        if values.dtype == dtype:
+            return values
+        try:
+            return values.astype(dtype)
+        except (TypeError, ValueError):
+            return values
@@ -1,227 +1,251 @@
 #!/usr/bin/env python3
 """
-Performance Test for Optimized vs Original Comparison
-Demonstrates the performance improvement of set-based operations
+Benchmark suite for the legacy and optimized comparison engines
+Runs SalesforceDataComparator and OptimizedSalesforceDataComparator over a matrix of
+orgs x price rules x extra fields x drift rate on synthetic CPQ extractions, recording wall
+time, peak memory and difference counts, and checks them against a saved baseline so
+slowdowns beyond a tolerance are flagged
 """
 
+import os
 import sys
-import time
-import pandas as pd
-import numpy as np
-from typing import Dict, List
 import json
+import time
+import shutil
+import argparse
+import platform
 import tempfile
-import os
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# The bundled runtime's ._pth file keeps the script directory off sys.path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'shared', 'modules', 'python'))
+
+from run_metrics import peak_rss_bytes
+from synthetic_cpq_data import SyntheticCPQDataGenerator
 
-def create_test_data(num_orgs: int = 3, records_per_org: int = 10000) -> Dict:
-    """Create synthetic test data to demonstrate performance differences"""
-    print(f"Creating test data: {num_orgs} orgs, {records_per_org:,} records each")
-    
+COMPARATORS = ('legacy', 'optimized')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'performance_baseline.json')
+DEFAULT_TOLERANCE = 0.25  # Allowed fractional growth in wall time and peak memory over the baseline
+
+
+def create_test_data(num_orgs: int, price_rules: int, extra_fields: int, drift_rate: float,
+                     seed: int = 0) -> Dict:
+    """Write one scenario's synthetic extraction to a temporary directory"""
     test_dir = tempfile.mkdtemp(prefix='cpq_perf_test_')
-    print(f"Test directory: {test_dir}")
-    
-    # Create config file
-    config = {
-        "version": "2.0.0",
-        "orgs": [f"org{i+1}@test.com" for i in range(num_orgs)],
-        "objects": {
-            "Account": {
-                "fields": ["Name", "Type", "Industry", "Phone"],
-                "foreignKey": "Id"
-            },
-            "Contact": {
-                "fields": ["FirstName", "LastName", "Email"],
-                "foreignKey": "Id"
-            }
-        }
-    }
-    
-    config_path = os.path.join(test_dir, 'config_test.json')
-    with open(config_path, 'w') as f:
-        json.dump(config, f, indent=2)
-    
-    # Create org directories and data
-    for org_idx in range(num_orgs):
-        org_name = f"org{org_idx+1}_test_com"
-        org_dir = os.path.join(test_dir, org_name)
-        os.makedirs(org_dir, exist_ok=True)
-        
-        # Create Account data
-        account_data = []
-        for i in range(records_per_org):
-            # Introduce some variations for differences
-            variation = "" if org_idx == 0 else f"_org{org_idx+1}"
-            account_data.append({
-                "Id": f"001{str(i).zfill(6)}000000{org_idx}",
-                "Name": f"Test Account {i}{variation}",
-                "Type": "Customer" if i % 2 == 0 else "Prospect",
-                "Industry": ["Technology", "Finance", "Healthcare"][i % 3],
-                "Phone": f"555-{str(i % 1000).zfill(3)}-{str(i % 10000).zfill(4)}"
-            })
-        
-        account_df = pd.DataFrame(account_data)
-        account_df.to_parquet(os.path.join(org_dir, 'Account.parquet'), index=False)
-        
-        # Create Contact data
-        contact_data = []
-        for i in range(records_per_org // 2):  # Fewer contacts than accounts
-            variation = "" if org_idx == 0 else f"_org{org_idx+1}"
-            contact_data.append({
-                "Id": f"003{str(i).zfill(6)}000000{org_idx}",
-                "FirstName": f"First{i}{variation}",
-                "LastName": f"Last{i}{variation}",
-                "Email": f"test{i}{variation}@example.com"
-            })
-        
-        contact_df = pd.DataFrame(contact_data)
-        contact_df.to_parquet(os.path.join(org_dir, 'Contact.parquet'), index=False)
-    
-    print(f"✅ Test data created: {num_orgs * records_per_org * 1.5:,.0f} total records")
+    generator = SyntheticCPQDataGenerator(orgs=num_orgs, price_rules=price_rules, extra_fields=extra_fields,
+                                          drift_rate=drift_rate, seed=seed)
+    summary = generator.generate(test_dir)
     return {
         'test_dir': test_dir,
-        'config_path': config_path,
+        'config_path': summary['config_path'],
         'num_orgs': num_orgs,
-        'records_per_org': records_per_org
+        'total_records': summary['total_records']
+    }
+
+
+def _run_legacy(test_dir: str, output_dir: str) -> int:
+    from multi_org_comparison import SalesforceDataComparator
+
+    comparator = SalesforceDataComparator()
+    results = comparator.compare_all_objects(test_dir)
+    if 'error' in results:
+        raise RuntimeError(results['error'])
+    comparator.export_detailed_differences_only(results, output_dir)
+
+    return sum(
+        object_result.get('detailed_comparison', {}).get('total_difference_rows', 0)
+        for object_result in results['object_results'].values()
+        if object_result.get('status') == 'completed'
+    )
+
+
+def _run_optimized(test_dir: str, output_dir: str) -> int:
+    from multi_org_comparison_optimized import OptimizedSalesforceDataComparator
+
+    # Every repeat must do the full comparison, not replay the previous one's results
+    comparator = OptimizedSalesforceDataComparator(result_cache=False)
+    result = comparator.run_full_comparison(test_dir, output_dir)
+    if not result.get('success'):
+        raise RuntimeError(result.get('error', 'comparison failed'))
+    return result['total_differences']
+
+
+def _benchmark_run(comparator: str, test_dir: str, output_dir: str) -> Dict:
+    """Child-process entry point: one comparison, timed, with the child's peak memory"""
+    runner = _run_legacy if comparator == 'legacy' else _run_optimized
+    start = time.perf_counter()
+    differences = runner(test_dir, output_dir)
+    return {
+        'wall_seconds': time.perf_counter() - start,
+        'peak_rss_bytes': peak_rss_bytes(),
+        'differences': differences
     }
 
-def test_optimized_performance(test_data: Dict) -> Dict:
-    """Test the optimized set-based comparison"""
-    print("\n🚀 Testing OPTIMIZED set-based comparison...")
-    
-    start_time = time.time()
-    
-    try:
-        # Import and run optimized comparison
-        sys.path.append(os.path.dirname(__file__))
-        from multi_org_comparison_optimized import OptimizedSalesforceDataComparator
-        
-        comparator = OptimizedSalesforceDataComparator()
-        
-        # Create output directory
-        output_dir = os.path.join(test_data['test_dir'], 'optimized_results')
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Run comparison
-        result = comparator.run_full_comparison(test_data['test_dir'], output_dir)
-        
-        end_time = time.time()
-        execution_time = end_time - start_time
-        
-        print(f"✅ Optimized comparison completed")
-        print(f"⚡ Execution time: {execution_time:.2f} seconds")
-        print(f"📊 Found {result.get('total_differences', 0)} differences")
-        print(f"🎯 Performance mode: {result.get('performance_improvement', 'N/A')}")
-        
-        return {
-            'success': True,
-            'execution_time': execution_time,
-            'differences_found': result.get('total_differences', 0),
-            'algorithm': 'optimized_set_based'
-        }
-        
-    except Exception as e:
-        end_time = time.time()
-        print(f"❌ Optimized comparison failed: {e}")
-        return {
-            'success': False,
-            'execution_time': end_time - start_time,
-            'error': str(e),
-            'algorithm': 'optimized_set_based'
-        }
-
-def simulate_original_performance(test_data: Dict) -> Dict:
-    """Simulate original algorithm performance (without actually running it)"""
-    print("\n📊 Simulating ORIGINAL algorithm performance...")
-    
-    # Calculate theoretical performance based on algorithm complexity
-    num_orgs = test_data['num_orgs']
-    records_per_org = test_data['records_per_org']
-    
-    # Original algorithm: O(n²) with nested loops
-    # Estimated operations: orgs² * records² * fields
-    total_records = num_orgs * records_per_org * 1.5  # Account + Contact
-    operations = num_orgs * num_orgs * total_records * 7  # 7 avg fields
-    
-    # Estimate time based on operation complexity (rough approximation)
-    # Original algorithm processes ~1000 operations per second for comparison
-    estimated_time = operations / 1000
-    
-    print(f"📈 Estimated operations: {operations:,}")
-    print(f"⏱️ Estimated execution time: {estimated_time:.2f} seconds")
-    print(f"🔄 Algorithm complexity: O(n²) nested record comparison")
-    
+
+def run_benchmark(comparator: str, test_data: Dict, repeat: int) -> Dict:
+    """
+    Time one comparator on one scenario, each repeat in a fresh process so peak memory belongs
+    to that run alone; the fastest repeat is reported
+    """
+    runs = []
+    for attempt in range(repeat):
+        output_dir = os.path.join(test_data['test_dir'], f"{comparator}_results_{attempt}")
+        # Spawn rather than fork so no run inherits the parent's or an earlier run's memory
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            try:
+                runs.append(executor.submit(_benchmark_run, comparator, test_data['test_dir'], output_dir).result())
+            except Exception as e:
+                return {'success': False, 'error': f"{type(e).__name__}: {e}"}
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    best = min(runs, key=lambda run: run['wall_seconds'])
     return {
-        'estimated': True,
-        'execution_time': estimated_time,
-        'operations': operations,
-        'algorithm': 'original_nested_loops'
+        'success': True,
+        'wall_seconds': best['wall_seconds'],
+        'peak_rss_bytes': max(filter(None, (run['peak_rss_bytes'] for run in runs)), default=None),
+        'differences': best['differences'],
+        'runs': [run['wall_seconds'] for run in runs]
     }
 
-def compare_performance():
-    """Run performance comparison between optimized and original algorithms"""
-    print("🏁 CPQ Toolset Performance Comparison Test")
-    print("=" * 50)
-    
-    # Test with different dataset sizes
-    test_scenarios = [
-        {"orgs": 2, "records": 1000, "name": "Small Dataset"},
-        {"orgs": 3, "records": 5000, "name": "Medium Dataset"},
-        {"orgs": 4, "records": 10000, "name": "Large Dataset"}
-    ]
-    
-    results = []
-    
-    for scenario in test_scenarios:
-        print(f"\n🎯 Testing {scenario['name']}: {scenario['orgs']} orgs, {scenario['records']:,} records each")
+
+def scenario_key(comparator: str, orgs: int, price_rules: int, extra_fields: int, drift_rate: float) -> str:
+    return f"{comparator}/orgs={orgs}/price_rules={price_rules}/extra_fields={extra_fields}/drift_rate={drift_rate:g}"
+
+
+def check_regressions(results: Dict[str, Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """Describe every result slower, bigger or with a different difference count than its baseline"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get('results', {}).get(key)
+        if not result.get('success') or not base or not base.get('success'):
+            continue
+
+        if result['wall_seconds'] > base['wall_seconds'] * (1 + tolerance):
+            regressions.append(f"{key}: wall time {result['wall_seconds']:.2f}s vs baseline {base['wall_seconds']:.2f}s")
+        if result['peak_rss_bytes'] and base.get('peak_rss_bytes') and \
+                result['peak_rss_bytes'] > base['peak_rss_bytes'] * (1 + tolerance):
+            regressions.append(f"{key}: peak memory {_megabytes(result['peak_rss_bytes'])} "
+                               f"vs baseline {_megabytes(base['peak_rss_bytes'])}")
+        # The data is seeded, so any change in the count is a change in behaviour
+        if result['differences'] != base['differences']:
+            regressions.append(f"{key}: {result['differences']} differences vs baseline {base['differences']}")
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: Dict[str, Dict], tolerance: float, seed: int):
+    baseline = {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'tolerance': tolerance,
+        'results': results
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+
+
+def _megabytes(size: Optional[int]) -> str:
+    return f"{size / (1024 * 1024):.1f} MB" if size else 'n/a'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the legacy and optimized comparison engines')
+    parser.add_argument('--orgs', type=int, nargs='+', default=[2, 3], help='Org counts to test')
+    parser.add_argument('--price-rules', type=int, nargs='+', default=[500, 5000],
+                        help='Price rules per org to test; conditions and actions scale with them')
+    parser.add_argument('--extra-fields', type=int, nargs='+', default=[0],
+                        help='Text fields added to every object on top of the standard ones')
+    parser.add_argument('--drift-rates', type=float, nargs='+', default=[0.02],
+                        help='Mean probability that a value differs from the reference org')
+    parser.add_argument('--comparators', nargs='+', choices=COMPARATORS, default=list(COMPARATORS),
+                        help='Engines to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per scenario; the fastest is reported')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the generated data')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON to check against')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help=f"Allowed fractional slowdown or memory growth (default: the baseline's, else {DEFAULT_TOLERANCE})")
+    parser.add_argument('--output', help='Also write this run\'s results to a JSON file')
+
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    if baseline is not None and baseline.get('seed', args.seed) != args.seed:
+        parser.error(f"the baseline was recorded with --seed {baseline['seed']}")
+    tolerance = args.tolerance if args.tolerance is not None else \
+        (baseline or {}).get('tolerance', DEFAULT_TOLERANCE)
+
+    print("🏁 CPQ Toolset Comparison Benchmark")
+    print("=" * 60)
+
+    results = {}
+    scenarios = list(itertools.product(args.orgs, args.price_rules, args.extra_fields, args.drift_rates))
+    for orgs, price_rules, extra_fields, drift_rate in scenarios:
+        print(f"\n🎯 {orgs} orgs, {price_rules:,} price rules each, {extra_fields} extra fields, drift rate {drift_rate:g}")
         print("-" * 60)
-        
-        # Create test data
-        test_data = create_test_data(scenario['orgs'], scenario['records'])
-        
-        # Test optimized algorithm
-        optimized_result = test_optimized_performance(test_data)
-        
-        # Simulate original algorithm
-        original_result = simulate_original_performance(test_data)
-        
-        # Calculate improvement
-        if optimized_result['success']:
-            improvement_factor = original_result['execution_time'] / optimized_result['execution_time']
-            print(f"\n📈 Performance Improvement: {improvement_factor:.1f}x faster")
-            print(f"⚡ Time saved: {original_result['execution_time'] - optimized_result['execution_time']:.1f} seconds")
-        else:
-            improvement_factor = None
-            print(f"\n❌ Could not calculate improvement due to error")
-        
-        results.append({
-            'scenario': scenario['name'],
-            'orgs': scenario['orgs'],
-            'records_per_org': scenario['records'],
-            'optimized': optimized_result,
-            'original_estimated': original_result,
-            'improvement_factor': improvement_factor
-        })
-        
-        # Cleanup
-        import shutil
-        shutil.rmtree(test_data['test_dir'])
-        print(f"🧹 Cleaned up test directory")
-    
-    # Summary
+        test_data = create_test_data(orgs, price_rules, extra_fields, drift_rate, args.seed)
+        print(f"  {test_data['total_records']:,} records in total")
+        try:
+            for comparator in args.comparators:
+                key = scenario_key(comparator, orgs, price_rules, extra_fields, drift_rate)
+                result = run_benchmark(comparator, test_data, args.repeat)
+                results[key] = result
+                if result['success']:
+                    print(f"  {comparator:<10} {result['wall_seconds']:8.2f}s  {_megabytes(result['peak_rss_bytes']):>10}  "
+                          f"{result['differences']:,} differences")
+                else:
+                    print(f"  {comparator:<10} ❌ {result['error']}")
+        finally:
+            shutil.rmtree(test_data['test_dir'], ignore_errors=True)
+
     print("\n" + "=" * 60)
-    print("📊 PERFORMANCE SUMMARY")
+    print("📊 SPEEDUP (legacy / optimized wall time)")
     print("=" * 60)
-    
-    for result in results:
-        if result['improvement_factor']:
-            print(f"📈 {result['scenario']}: {result['improvement_factor']:.1f}x improvement")
-            print(f"   - Optimized: {result['optimized']['execution_time']:.2f}s")
-            print(f"   - Original (est): {result['original_estimated']['execution_time']:.2f}s")
-        else:
-            print(f"❌ {result['scenario']}: Test failed")
-    
-    print("\n🚀 Set-based operations provide exponential performance improvements!")
-    print("💡 Larger datasets benefit even more from the optimization.")
+    for orgs, price_rules, extra_fields, drift_rate in scenarios:
+        legacy = results.get(scenario_key('legacy', orgs, price_rules, extra_fields, drift_rate), {})
+        optimized = results.get(scenario_key('optimized', orgs, price_rules, extra_fields, drift_rate), {})
+        if legacy.get('success') and optimized.get('success'):
+            print(f"  {scenario_key('', orgs, price_rules, extra_fields, drift_rate)[1:]}: "
+                  f"{legacy['wall_seconds'] / optimized['wall_seconds']:.1f}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'tolerance': tolerance, 'results': results}, f, indent=2)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, tolerance, args.seed)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    regressions = check_regressions(results, baseline, tolerance)
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} regression(s) beyond {tolerance:.0%} of the baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+
+    print(f"\n✅ No regressions beyond {tolerance:.0%} of the baseline")
+    return 0
+
 
 if __name__ == "__main__":
-    compare_performance()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic CPQ extractions for benchmarks and scale tests
+Writes price rules with their conditions and actions for several orgs the way the fetcher
+extracts them: org-specific 18-character Ids, parent lookups with the parent's foreign key
+nested under SBQQ__Rule__r, long formula text, and drift concentrated on a few rules and
+fields. Every org folder gets JSONL and/or Parquet files plus a matching config_*.json
+"""
+
+import os
+import json
+import zlib
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+PRICE_RULE = 'SBQQ__PriceRule__c'
+PRICE_CONDITION = 'SBQQ__PriceCondition__c'
+PRICE_ACTION = 'SBQQ__PriceAction__c'
+
+FOREIGN_KEYS = {
+    PRICE_RULE: 'Price_Rule_Foreign_Key__c',
+    PRICE_CONDITION: 'Price_Condition_Foreign_Key__c',
+    PRICE_ACTION: 'Price_Action_Foreign_Key__c'
+}
+KEY_PREFIXES = {PRICE_RULE: 'a0N', PRICE_CONDITION: 'a0L', PRICE_ACTION: 'a0K'}
+FORMATS = ('jsonl', 'parquet')
+
+_BASE62 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+_ID_SUFFIX = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ012345'
+
+_EVALUATION_EVENTS = ['On Calculate', 'Before Calculate', 'After Calculate',
+                      'Before Calculate;On Calculate', 'On Calculate;After Calculate']
+_CONFIGURATOR_EVENTS = [None, 'Save', 'Edit', 'Always']
+_CONDITIONS_MET = ['All', 'Any', 'Custom']
+_OBJECTS = ['Quote', 'Quote Line', 'Product Option', 'Configuration Attributes']
+_TARGET_OBJECTS = ['Calculator', 'Configurator', 'Product Option', 'Quote Line']
+_LOOKUP_OBJECTS = [None, 'SBQQ__LookupData__c', 'Pricing_Matrix__c', 'Discount_Schedule_Lookup__c']
+_FILTER_TYPES = ['Value', 'Value', 'Value', 'Variable', 'Formula']
+_OPERATORS = ['equals', 'not equals', 'less than', 'less or equals', 'greater than',
+              'greater or equals', 'starts with', 'contains']
+_QUOTE_FIELDS = ['SBQQ__ListPrice__c', 'SBQQ__Quantity__c', 'SBQQ__Discount__c', 'SBQQ__NetPrice__c',
+                 'SBQQ__ProductFamily__c', 'SBQQ__SubscriptionTerm__c', 'Region__c', 'Segment__c',
+                 'SBQQ__CustomerPrice__c', 'SBQQ__RegularPrice__c', 'Tier__c', 'Channel__c']
+_FORMULA_CLAUSES = [
+    "IF({field} > {n}, {field} * {x}, {field})",
+    "AND(SBQQ__Quote__r.SBQQ__Type__c = 'Renewal', {field} >= {n})",
+    "OR(ISPICKVAL(SBQQ__Quote__r.Region__c, 'EMEA'), {field} < {n})",
+    "ROUND({field} * (1 - {x} / 100), 2)",
+    "CASE(SBQQ__Quote__r.Segment__c, 'Enterprise', {n}, 'Mid-Market', {n} / 2, 0)",
+    "MAX({field}, SBQQ__Quote__r.SBQQ__SubscriptionTerm__c * {x})"
+]
+
+
+class SyntheticCPQDataGenerator:
+    """
+    Writes one seeded dataset of price rules, conditions and actions across several orgs
+
+    The first org holds the reference values. Every org, the first included, loses a share of
+    its rules (with their children) and gains duplicates: copies of records under a new Id
+    with the same foreign key. Orgs after the first also drift from the reference; each rule
+    and each field gets a heavy-tailed weight, so most drift lands on a few hot rules and
+    fields while drift_rate stays the average chance that a value differs. The same seed and
+    settings always produce byte-identical files
+    """
+
+    def __init__(self, orgs: int = 3, price_rules: int = 1000, conditions_per_rule: float = 3.0,
+                 actions_per_rule: float = 2.0, drift_rate: float = 0.02, duplicate_rate: float = 0.0,
+                 missing_rate: float = 0.01, extra_fields: int = 0, formats: Sequence[str] = FORMATS,
+                 seed: int = 0):
+        if orgs < 1:
+            raise ValueError(f"orgs must be at least 1, got {orgs}")
+        for name, rate in (('drift_rate', drift_rate), ('duplicate_rate', duplicate_rate),
+                           ('missing_rate', missing_rate)):
+            if not 0 <= rate <= 1:
+                raise ValueError(f"{name} must be between 0 and 1, got {rate}")
+        unknown = set(formats) - set(FORMATS)
+        if unknown or not formats:
+            raise ValueError(f"formats must be a non-empty subset of {FORMATS}, got {list(formats)}")
+
+        self.orgs = orgs
+        self.price_rules = price_rules
+        self.conditions_per_rule = conditions_per_rule
+        self.actions_per_rule = actions_per_rule
+        self.drift_rate = drift_rate
+        self.duplicate_rate = duplicate_rate
+        self.missing_rate = missing_rate
+        self.extra_fields = extra_fields  # Benchmark_Field_NN__c text fields added to every object
+        self.formats = tuple(formats)
+        self.seed = seed
+
+    @property
+    def usernames(self) -> List[str]:
+        return [f"org{i + 1}@synthetic.test" for i in range(self.orgs)]
+
+    @staticmethod
+    def org_folder(username: str) -> str:
+        """Folder the extraction of an org is written to, as discovery derives it"""
+        return username.replace('@', '_').replace('.', '_')
+
+    def config(self) -> Dict:
+        """Comparison config covering the three objects, lookups included"""
+        extra = [f"Benchmark_Field_{i + 1:02d}__c" for i in range(self.extra_fields)]
+        parent_lookup = f"SBQQ__Rule__c.{FOREIGN_KEYS[PRICE_RULE]}"
+        objects = {
+            PRICE_RULE: {
+                "fields": ["Name", "SBQQ__Active__c", "SBQQ__AdvancedCondition__c", "SBQQ__ConditionsMet__c",
+                           "SBQQ__ConfiguratorEvaluationEvent__c", "SBQQ__EvaluationEvent__c",
+                           "SBQQ__EvaluationOrder__c", "SBQQ__LookupObject__c", "SBQQ__TargetObject__c",
+                           FOREIGN_KEYS[PRICE_RULE]] + extra,
+                "foreignKey": FOREIGN_KEYS[PRICE_RULE],
+                "orgFilters": {username: {"customFilter": "SBQQ__Active__c = TRUE "} for username in self.usernames}
+            },
+            PRICE_CONDITION: {
+                "fields": ["SBQQ__Field__c", "SBQQ__FilterFormula__c", "SBQQ__FilterType__c", "SBQQ__Index__c",
+                           "SBQQ__Object__c", "SBQQ__Operator__c", "SBQQ__ParentRuleIsActive__c",
+                           "SBQQ__RuleTargetsCalculator__c", "SBQQ__TestedFormula__c", "SBQQ__Value__c",
+                           FOREIGN_KEYS[PRICE_CONDITION], parent_lookup] + extra,
+                "foreignKey": FOREIGN_KEYS[PRICE_CONDITION],
+                "orgFilters": {username: {"customFilter": "SBQQ__ParentRuleIsActive__c = TRUE"}
+                               for username in self.usernames}
+            },
+            PRICE_ACTION: {
+                "fields": [FOREIGN_KEYS[PRICE_ACTION], "SBQQ__ValueField__c", "SBQQ__Value__c", "SBQQ__TargetObject__c",
+                           "SBQQ__SourceLookupField__c", "SBQQ__RuleTargetsCalculator__c", "SBQQ__RuleLookupObject__c",
+                           "SBQQ__ParentRuleIsActive__c", "SBQQ__Order__c", "SBQQ__Formula__c", "SBQQ__Field__c",
+                           parent_lookup] + extra,
+                "foreignKey": FOREIGN_KEYS[PRICE_ACTION],
+                "orgFilters": {username: {"customFilter": "SBQQ__ParentRuleIsActive__c = TRUE"}
+                               for username in self.usernames}
+            }
+        }
+        return {
+            "version": "2.0.0",
+            "createdAt": "2025-01-01T00:00:00.000Z",
+            "orgs": self.usernames,
+            "objects": objects,
+            "metadata": {
+                "totalOrgs": self.orgs,
+                "totalObjects": len(objects),
+                "totalFields": sum(len(obj["fields"]) for obj in objects.values()),
+                "configGenerator": "synthetic",
+                "seed": self.seed
+            }
+        }
+
+    def generate(self, base_path: str) -> Dict:
+        """Write the config and every org's extraction under base_path and report what was written"""
+        os.makedirs(base_path, exist_ok=True)
+        config_path = os.path.join(base_path, 'config_synthetic.json')
+        with open(config_path, 'w') as f:
+            json.dump(self.config(), f, indent=2)
+
+        reference = self._reference_records()
+        rule_weights = reference.pop('_rule_weights')
+        record_counts = {}
+        for org_index, username in enumerate(self.usernames):
+            org_dir = os.path.join(base_path, self.org_folder(username))
+            os.makedirs(org_dir, exist_ok=True)
+            org_records = self._org_records(org_index, username, reference, rule_weights)
+            record_counts[username] = {}
+            for object_name, df in org_records.items():
+                self._write_object(org_dir, object_name, df)
+                record_counts[username][object_name] = len(df)
+
+        return {
+            'base_path': base_path,
+            'config_path': config_path,
+            'orgs': self.usernames,
+            'records': record_counts,
+            'total_records': sum(sum(counts.values()) for counts in record_counts.values())
+        }
+
+    def _reference_records(self) -> Dict[str, pd.DataFrame]:
+        """Every object's records as the first org holds them before losses and duplicates"""
+        rng = self._rng(0)
+        rule_count = self.price_rules
+
+        rules = pd.DataFrame({
+            'Name': [f"PR {i:06d} - {rng.choice(_QUOTE_FIELDS)[:-3].replace('SBQQ__', '')} adjustment"
+                     for i in range(rule_count)],
+            'SBQQ__Active__c': rng.random(rule_count) < 0.85,
+            'SBQQ__AdvancedCondition__c': [None] * rule_count,
+            'SBQQ__ConditionsMet__c': rng.choice(_CONDITIONS_MET, rule_count, p=[0.6, 0.3, 0.1]),
+            'SBQQ__ConfiguratorEvaluationEvent__c': rng.choice(np.array(_CONFIGURATOR_EVENTS, dtype=object), rule_count),
+            'SBQQ__EvaluationEvent__c': rng.choice(_EVALUATION_EVENTS, rule_count),
+            'SBQQ__EvaluationOrder__c': rng.integers(1, 100, rule_count).astype(float),
+            'SBQQ__LookupObject__c': rng.choice(np.array(_LOOKUP_OBJECTS, dtype=object), rule_count,
+                                                p=[0.7, 0.1, 0.1, 0.1]),
+            'SBQQ__TargetObject__c': rng.choice(_TARGET_OBJECTS, rule_count, p=[0.7, 0.1, 0.1, 0.1]),
+            FOREIGN_KEYS[PRICE_RULE]: [f"PR-{i:07d}" for i in range(rule_count)]
+        })
+
+        # Child counts are skewed: most rules have a few children, some have many
+        condition_parents = self._child_parents(rng, rule_count, self.conditions_per_rule)
+        action_parents = self._child_parents(rng, rule_count, self.actions_per_rule)
+        conditions = self._conditions(rng, condition_parents)
+        actions = self._actions(rng, action_parents)
+
+        custom = rules['SBQQ__ConditionsMet__c'] == 'Custom'
+        condition_totals = np.bincount(condition_parents, minlength=rule_count)
+        rules.loc[custom, 'SBQQ__AdvancedCondition__c'] = [
+            self._advanced_condition(rng, count) for count in condition_totals[custom.to_numpy()]
+        ]
+
+        extra_rng = self._rng(0, 1)
+        for df in (rules, conditions, actions):
+            for i in range(self.extra_fields):
+                df[f"Benchmark_Field_{i + 1:02d}__c"] = [f"value {n % 997}" for n in extra_rng.integers(0, 10 ** 6, len(df))]
+
+        # Heavy-tailed drift weight per rule, scaled to a mean of 1; children share their rule's
+        rule_weights = self._rng(0, 2).lognormal(0, 1.5, rule_count)
+        rule_weights /= rule_weights.mean()
+        return {PRICE_RULE: rules, PRICE_CONDITION: conditions, PRICE_ACTION: actions,
+                '_rule_weights': rule_weights}
+
+    def _rng(self, *stream: int) -> np.random.Generator:
+        """Independent random stream, so changing one setting leaves the draws of the others alone"""
+        return np.random.default_rng([self.seed, *stream])
+
+    def _child_parents(self, rng: np.random.Generator, rule_count: int, mean_children: float) -> np.ndarray:
+        if rule_count == 0 or mean_children <= 0:
+            return np.array([], dtype=np.int64)
+        counts = rng.geometric(1 / (mean_children + 1), rule_count) - 1
+        return np.repeat(np.arange(rule_count), counts)
+
+    def _conditions(self, rng: np.random.Generator, parents: np.ndarray) -> pd.DataFrame:
+        count = len(parents)
+        filter_types = rng.choice(_FILTER_TYPES, count)
+        formulas = np.array([self._formula(rng) for _ in range(count)], dtype=object)
+        values = rng.integers(0, 5000, count).astype(str).astype(object)
+        return pd.DataFrame({
+            'SBQQ__Rule__c': parents,
+            'SBQQ__Field__c': rng.choice(_QUOTE_FIELDS, count),
+            'SBQQ__FilterFormula__c': np.where(filter_types == 'Formula', formulas, None),
+            'SBQQ__FilterType__c': filter_types,
+            'SBQQ__Index__c': (self._sibling_positions(parents) + 1).astype(float),
+            'SBQQ__Object__c': rng.choice(_OBJECTS, count),
+            'SBQQ__Operator__c': rng.choice(_OPERATORS, count),
+            'SBQQ__ParentRuleIsActive__c': rng.random(count) < 0.85,
+            'SBQQ__RuleTargetsCalculator__c': rng.random(count) < 0.7,
+            'SBQQ__TestedFormula__c': np.where(rng.random(count) < 0.2, formulas, None),
+            'SBQQ__Value__c': np.where(filter_types == 'Value', values, None),
+            FOREIGN_KEYS[PRICE_CONDITION]: [f"PC-{i:08d}" for i in range(count)]
+        })
+
+    def _actions(self, rng: np.random.Generator, parents: np.ndarray) -> pd.DataFrame:
+        count = len(parents)
+        has_formula = rng.random(count) < 0.4
+        return pd.DataFrame({
+            'SBQQ__Rule__c': parents,
+            FOREIGN_KEYS[PRICE_ACTION]: [f"PA-{i:08d}" for i in range(count)],
+            'SBQQ__ValueField__c': rng.choice(np.array([None] + _QUOTE_FIELDS[:4], dtype=object), count),
+            'SBQQ__Value__c': np.where(has_formula, None, rng.integers(0, 100, count).astype(str).astype(object)),
+            'SBQQ__TargetObject__c': rng.choice(_TARGET_OBJECTS, count, p=[0.4, 0.1, 0.1, 0.4]),
+            'SBQQ__SourceLookupField__c': rng.choice(np.array([None, 'Discount__c', 'Price__c'], dtype=object), count),
+            'SBQQ__RuleTargetsCalculator__c': rng.random(count) < 0.7,
+            'SBQQ__RuleLookupObject__c': rng.choice(np.array(_LOOKUP_OBJECTS, dtype=object), count,
+                                                    p=[0.7, 0.1, 0.1, 0.1]),
+            'SBQQ__ParentRuleIsActive__c': rng.random(count) < 0.85,
+            'SBQQ__Order__c': (self._sibling_positions(parents) + 1).astype(float),
+            'SBQQ__Formula__c': np.where(has_formula, [self._formula(rng) for _ in range(count)], None),
+            'SBQQ__Field__c': rng.choice(_QUOTE_FIELDS, count)
+        })
+
+    def _sibling_positions(self, parents: np.ndarray) -> np.ndarray:
+        """Position of each child among its rule's children, for index and order fields"""
+        if len(parents) == 0:
+            return parents
+        starts = np.r_[0, np.flatnonzero(np.diff(parents)) + 1]
+        return np.arange(len(parents)) - np.repeat(starts, np.diff(np.r_[starts, len(parents)]))
+
+    def _formula(self, rng: np.random.Generator) -> str:
+        """Formula text of a few to a few dozen clauses, so lengths run from tens to thousands of characters"""
+        clauses = max(1, int(rng.lognormal(1.0, 0.9)))
+        parts = [
+            _FORMULA_CLAUSES[rng.integers(len(_FORMULA_CLAUSES))].format(
+                field=_QUOTE_FIELDS[rng.integers(len(_QUOTE_FIELDS))], n=int(rng.integers(1, 10000)),
+                x=round(float(rng.random()) * 50, 2))
+            for _ in range(clauses)
+        ]
+        return parts[0] if clauses == 1 else f"AND({', '.join(parts)})"
+
+    def _advanced_condition(self, rng: np.random.Generator, conditions: int) -> str:
+        terms = [str(i + 1) for i in range(max(conditions, 2))]
+        text = terms[0]
+        for term in terms[1:]:
+            text = f"({text} {'AND' if rng.random() < 0.6 else 'OR'} {term})"
+        return text
+
+    def _org_records(self, org_index: int, username: str, reference: Dict[str, pd.DataFrame],
+                     rule_weights: np.ndarray) -> Dict[str, pd.DataFrame]:
+        """One org's extraction: losses, drift and duplicates applied, then Ids and lookups assigned"""
+        rng = self._rng(org_index + 1)
+        kept_rules = rng.random(len(reference[PRICE_RULE])) >= self.missing_rate
+
+        frames = {}
+        for object_index, object_name in enumerate((PRICE_RULE, PRICE_CONDITION, PRICE_ACTION)):
+            df = reference[object_name]
+            if object_name == PRICE_RULE:
+                parents = np.arange(len(df))
+                keep = kept_rules
+            else:
+                # A missing rule takes its children with it
+                parents = df['SBQQ__Rule__c'].to_numpy()
+                keep = kept_rules[parents] & (rng.random(len(df)) >= self.missing_rate)
+            df = df[keep]
+            weights = rule_weights[parents[keep]]
+
+            if org_index > 0:
+                df = self._drift(self._rng(org_index + 1, 1, object_index), df, weights, object_name)
+            df = self._duplicate(self._rng(org_index + 1, 2, object_index), df)
+            frames[object_name] = df
+
+        # Ids are numbered per org, so the same record has a different Id in every org
+        rule_ids = pd.Series(self._salesforce_ids(PRICE_RULE, org_index, len(frames[PRICE_RULE])),
+                             index=frames[PRICE_RULE].index)
+        rule_ids = rule_ids[~rule_ids.index.duplicated()]
+        rule_keys = reference[PRICE_RULE][FOREIGN_KEYS[PRICE_RULE]]
+
+        extracted = {}
+        fetched_at = datetime(2025, 1, 1) + timedelta(minutes=org_index)
+        for object_name, df in frames.items():
+            df = df.reset_index(drop=True)
+            columns = {'Id': self._salesforce_ids(object_name, org_index, len(df))}
+            columns.update({col: df[col] for col in df.columns if col != 'SBQQ__Rule__c'})
+            if object_name != PRICE_RULE:
+                parents = df['SBQQ__Rule__c'].to_numpy()
+                parent_ids = rule_ids.reindex(parents).to_numpy()
+                columns['SBQQ__Rule__c'] = parent_ids
+                columns['SBQQ__Rule__r'] = [
+                    self._lookup(parent_id, rule_keys.iat[parent]) if isinstance(parent_id, str) else None
+                    for parent_id, parent in zip(parent_ids, parents)
+                ]
+
+            foreign_key = FOREIGN_KEYS[object_name]
+            columns['_primaryKey'] = df[foreign_key]
+            columns['_sourceOrg'] = username
+            columns['_objectName'] = object_name
+            columns['_fetchTimestamp'] = fetched_at.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+            columns['_recordIndex'] = np.arange(len(df))
+            extracted[object_name] = pd.DataFrame(columns)
+        return extracted
+
+    def _drift(self, rng: np.random.Generator, df: pd.DataFrame, weights: np.ndarray,
+               object_name: str) -> pd.DataFrame:
+        """Change values away from the reference, mostly on hot rules and fields"""
+        fields = [col for col in df.columns if col not in ('SBQQ__Rule__c', FOREIGN_KEYS[object_name])]
+        if not fields or df.empty:
+            return df
+
+        df = df.copy()
+        for field in fields:
+            # Seeded by object and field alone, so every org and scenario shares the same hot fields
+            field_weight = self._rng(0, 3, zlib.crc32(f"{object_name}.{field}".encode())).lognormal(0, 1.0)
+            field_weight /= np.exp(0.5)  # Mean of the lognormal, for a mean weight of 1
+            drifted = rng.random(len(df)) < np.minimum(1.0, self.drift_rate * weights * field_weight)
+            if not drifted.any():
+                continue
+            values = df[field].to_numpy(dtype=object).copy()
+            # A few variants per field, so orgs sometimes drift to the same value
+            variants = rng.integers(1, 4, drifted.sum())
+            values[drifted] = [self._drifted_value(value, variant) for value, variant in zip(values[drifted], variants)]
+            df[field] = pd.Series(values, index=df.index).infer_objects()
+        return df
+
+    @staticmethod
+    def _drifted_value(value, variant: int):
+        if isinstance(value, (bool, np.bool_)):
+            return not value
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return f"Added value {variant}"
+        if isinstance(value, (float, np.floating)):
+            return float(value) + variant
+        return f"{value} v{variant}"
+
+    def _duplicate(self, rng: np.random.Generator, df: pd.DataFrame) -> pd.DataFrame:
+        """Copy a share of the records under the same foreign key, each copy following its original"""
+        if self.duplicate_rate == 0 or df.empty:
+            return df
+        copies = df[rng.random(len(df)) < self.duplicate_rate]
+        if copies.empty:
+            return df
+        # Stable sort on the original positions keeps each copy right after its original
+        return pd.concat([df, copies]).sort_index(kind='stable')
+
+    def _salesforce_ids(self, object_name: str, org_index: int, count: int) -> List[str]:
+        """18-character Ids: key prefix, org instance, record number and the case-safe suffix"""
+        instance = _BASE62[org_index // 62 % 62] + _BASE62[org_index % 62]
+        prefix = KEY_PREFIXES[object_name] + instance
+        return [_with_checksum(prefix + _base62(number, 10)) for number in range(1, count + 1)]
+
+    def _lookup(self, parent_id: str, parent_key: str) -> Dict:
+        """Parent relationship as the REST API nests it when the query selects a parent field"""
+        return {
+            'attributes': {'type': PRICE_RULE, 'url': f"/services/data/v59.0/sobjects/{PRICE_RULE}/{parent_id}"},
+            FOREIGN_KEYS[PRICE_RULE]: parent_key
+        }
+
+    def _write_object(self, org_dir: str, object_name: str, df: pd.DataFrame):
+        if 'jsonl' in self.formats:
+            with open(os.path.join(org_dir, f"{object_name}.jsonl"), 'w') as f:
+                for record in df.to_dict('records'):
+                    f.write(json.dumps({key: _json_value(value) for key, value in record.items()}) + '\n')
+        if 'parquet' in self.formats:
+            df.to_parquet(os.path.join(org_dir, f"{object_name}.parquet"), index=False)
+
+
+def _base62(number: int, width: int) -> str:
+    digits = []
+    for _ in range(width):
+        number, digit = divmod(number, 62)
+        digits.append(_BASE62[digit])
+    return ''.join(reversed(digits))
+
+
+def _with_checksum(id15: str) -> str:
+    """Append the three characters that make a 15-character Id case-insensitively unique"""
+    suffix = ''
+    for start in (0, 5, 10):
+        bits = sum(1 << i for i, char in enumerate(id15[start:start + 5]) if char.isupper())
+        suffix += _ID_SUFFIX[bits]
+    return id15 + suffix
+
+
+def _json_value(value):
+    """Plain JSON value for a DataFrame cell: NaN becomes null and numpy scalars become Python ones"""
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a deterministic synthetic CPQ extraction')
+    parser.add_argument('output_dir', help='Directory to write the config and org folders to')
+    parser.add_argument('--orgs', type=int, default=3, help='Number of orgs')
+    parser.add_argument('--price-rules', type=int, default=1000, help='Price rules in the reference org')
+    parser.add_argument('--conditions-per-rule', type=float, default=3.0, help='Mean price conditions per rule')
+    parser.add_argument('--actions-per-rule', type=float, default=2.0, help='Mean price actions per rule')
+    parser.add_argument('--drift-rate', type=float, default=0.02, help='Mean chance a value differs from the reference org')
+    parser.add_argument('--duplicate-rate', type=float, default=0.0, help='Share of records copied under the same foreign key')
+    parser.add_argument('--missing-rate', type=float, default=0.01, help='Share of records each org lacks')
+    parser.add_argument('--extra-fields', type=int, default=0, help='Additional text fields per object')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS), help='File formats to write')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    args = parser.parse_args()
+    generator = SyntheticCPQDataGenerator(
+        orgs=args.orgs, price_rules=args.price_rules, conditions_per_rule=args.conditions_per_rule,
+        actions_per_rule=args.actions_per_rule, drift_rate=args.drift_rate, duplicate_rate=args.duplicate_rate,
+        missing_rate=args.missing_rate, extra_fields=args.extra_fields, formats=args.formats, seed=args.seed
+    )
+    summary = generator.generate(args.output_dir)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Null handling of the canonical column forms, and forms shared by the orgs of a field
+None and NaN have to stay null through every form on every supported pandas version, never
+turning into the text 'None' or 'nan', and one raw value must get one spelling in every org
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import canonical_forms
+
+NULLS = [None, np.nan]
+
+
+class CanonicalNullsTest(unittest.TestCase):
+
+    def assert_nulls_kept(self, values: list, expected: list):
+        for null in NULLS:
+            with self.subTest(null=null):
+                column = pd.Series(values + [null, null], dtype=object)
+                canonical = canonical_forms.canonical_column(column)
+                self.assertEqual(canonical.isna().tolist(), [False] * len(values) + [True, True])
+                self.assertEqual(canonical.iloc[:len(values)].tolist(), expected)
+
+                arrow_canonical = canonical_forms.arrow_canonical_column(
+                    pa.chunked_array([pa.array(column, from_pandas=True)]))
+                self.assertEqual(arrow_canonical.null_count, 2)
+                self.assertEqual(arrow_canonical.to_pylist()[:len(values)], expected)
+
+    def test_text(self):
+        self.assert_nulls_kept([' Discount ', 'Markup'], ['Discount', 'Markup'])
+
+    def test_blank_text(self):
+        column = pd.Series(['Markup', '  ', None, np.nan], dtype=object)
+        self.assertEqual(canonical_forms.canonical_column(column).isna().tolist(), [False, True, True, True])
+
+    def test_boolean_text(self):
+        self.assert_nulls_kept(['TRUE', 'false'], [True, False])
+
+    def test_ids(self):
+        self.assert_nulls_kept(['a0B5e00000AbCdE', 'a0B5e00000XyZwVEAV'], ['a0B5e00000AbCdEEAV', 'a0B5e00000XyZwVEAV'])
+
+    def test_whole_number_floats(self):
+        self.assert_nulls_kept([5.0, 12.0], [5, 12])
+
+    def test_fractional_floats(self):
+        self.assert_nulls_kept([0.5, 12.25], [0.5, 12.25])
+
+    def test_all_null(self):
+        for null in NULLS:
+            with self.subTest(null=null):
+                column = pd.Series([null, null], dtype=object)
+                self.assertTrue(canonical_forms.canonical_column(column).isna().all())
+                arrow_column = pa.chunked_array([pa.array(column, from_pandas=True)])
+                self.assertEqual(canonical_forms.arrow_canonical_column(arrow_column).null_count, 2)
+
+
+class CrossOrgFormsTest(unittest.TestCase):
+
+    def assert_shared(self, org_values: list, expected: list):
+        """Every org's column comes out as expected from both engines"""
+        columns = [pd.Series(values, dtype=object) for values in org_values]
+        canonical = canonical_forms.canonical_columns(columns)
+        self.assertEqual([[None if pd.isna(value) else value for value in column] for column in canonical], expected)
+
+        arrow_columns = [pa.chunked_array([pa.array(column, from_pandas=True)]) for column in columns]
+        arrow_canonical = canonical_forms.arrow_canonical_columns(arrow_columns)
+        self.assertEqual([column.to_pylist() for column in arrow_canonical], expected)
+
+    def test_boolean_text_next_to_other_text(self):
+        self.assert_shared([['true', 'false'], ['TRUE', 'maybe']], [['true', 'false'], ['true', 'maybe']])
+
+    def test_boolean_text_in_every_org(self):
+        self.assert_shared([['true', 'False'], ['FALSE', None]], [[True, False], [False, None]])
+
+    def test_booleans_next_to_text(self):
+        self.assert_shared([[True, None], ['True', 'maybe']], [['true', None], ['true', 'maybe']])
+
+    def test_short_id_next_to_other_text(self):
+        self.assert_shared([['a0B5e00000AbCdE', 'a0B5e00000XyZwVEAV'], ['a0B5e00000AbCdE', 'Not an Id']],
+                           [['a0B5e00000AbCdE', 'a0B5e00000XyZwVEAV'], ['a0B5e00000AbCdE', 'Not an Id']])
+
+    def test_short_ids_next_to_full_ids(self):
+        self.assert_shared([['a0B5e00000AbCdE'], ['a0B5e00000AbCdEEAV', 'a0B5e00000XyZwVEAV']],
+                           [['a0B5e00000AbCdEEAV'], ['a0B5e00000AbCdEEAV', 'a0B5e00000XyZwVEAV']])
+
+    def test_short_ids_only(self):
+        self.assert_shared([['a0B5e00000AbCdE'], ['a0B5e00000AbCdE']], [['a0B5e00000AbCdE'], ['a0B5e00000AbCdE']])
+
+    def test_whole_numbers_next_to_fractions(self):
+        self.assert_shared([[5.0, 6.0], [5.5, None]], [[5.0, 6.0], [5.5, None]])
+
+    def test_whole_numbers_in_every_org(self):
+        self.assert_shared([[5.0, 6.0], [5.0, None]], [[5, 6], [5, None]])
+
+    def test_org_without_values(self):
+        self.assert_shared([['true', 'false'], [None, '  ']], [[True, False], [None, None]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Per-object result cache: entries are found again only for the same inputs and settings, are
+invisible until committed, and the least recently used go first once the cache is too large
+"""
+
+import logging
+import os
+import tempfile
+import time
+import unittest
+
+from comparison_cache import ComparisonResultCache
+from test_incremental_comparison import change_amount, edit_extract
+from test_multi_org_comparison_optimized import ComparisonRun, many_objects, write_extracts
+
+
+def setUpModule():
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+class ComparisonResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ComparisonResultCache(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def store(self, object_name: str, rows: bytes) -> str:
+        key = self.cache.object_key(object_name, {'org_a': object_name}, {})
+        with self.cache.open_entry(object_name, key) as f:
+            f.write(rows)
+        self.cache.commit(object_name, key, rows.count(b'\n'))
+        return key
+
+    def test_miss_then_hit(self):
+        key = self.cache.object_key('Obj__c', {'org_a': 'csv:1', 'org_b': 'csv:2'}, {'mode': 'pairwise'})
+        self.assertFalse(self.cache.lookup('Obj__c', key))
+        with self.cache.open_entry('Obj__c', key) as f:
+            f.write(b'a,b\nc,d\n')
+        self.assertFalse(self.cache.lookup('Obj__c', key))  # Not committed yet
+        self.cache.commit('Obj__c', key, 2)
+
+        self.assertTrue(self.cache.lookup('Obj__c', key))
+        rows_path, row_count = self.cache.entry(key)
+        self.assertEqual(row_count, 2)
+        with open(rows_path, 'rb') as f:
+            self.assertEqual(f.read(), b'a,b\nc,d\n')
+        self.assertEqual(self.cache.summary()['hits'], 1)
+        self.assertEqual(self.cache.summary()['misses'], 2)
+
+    def test_key_follows_inputs_and_settings(self):
+        key = self.cache.object_key('Obj__c', {'org_a': 'csv:1', 'org_b': 'csv:2'}, {'mode': 'pairwise'})
+        self.assertEqual(key, self.cache.object_key('Obj__c', {'org_b': 'csv:2', 'org_a': 'csv:1'}, {'mode': 'pairwise'}))
+        self.assertNotEqual(key, self.cache.object_key('Obj__c', {'org_a': 'csv:1', 'org_b': 'csv:3'}, {'mode': 'pairwise'}))
+        self.assertNotEqual(key, self.cache.object_key('Obj__c', {'org_a': 'csv:1', 'org_b': 'csv:2'}, {'mode': 'consensus'}))
+        self.assertNotEqual(key, self.cache.object_key('Other__c', {'org_a': 'csv:1', 'org_b': 'csv:2'}, {'mode': 'pairwise'}))
+
+    def test_fingerprint_follows_content(self):
+        path = os.path.join(self.temp_dir.name, 'extract.csv')
+        with open(path, 'w') as f:
+            f.write('Id\n1\n')
+        fingerprint = ComparisonResultCache.fingerprint_file(path)
+        os.utime(path, (0, 0))
+        self.assertEqual(ComparisonResultCache.fingerprint_file(path), fingerprint)
+        with open(path, 'w') as f:
+            f.write('Id\n2\n')
+        self.assertNotEqual(ComparisonResultCache.fingerprint_file(path), fingerprint)
+
+    def test_evicts_least_recently_used(self):
+        keys = [self.store(f"Obj{i}__c", b'x' * 1000) for i in range(3)]
+        now = time.time()
+        for age, key in zip((300, 200, 100), keys):
+            meta_path = os.path.join(self.cache.cache_dir, f"{key}.json")
+            os.utime(meta_path, (now - age, now - age))
+        self.cache.lookup('Obj0__c', keys[0])  # The oldest entry is used again
+
+        self.cache.max_bytes = 2 * (1000 + os.path.getsize(os.path.join(self.cache.cache_dir, f"{keys[0]}.json")))
+        self.cache.evict()
+        self.assertTrue(self.cache.lookup('Obj0__c', keys[0]))
+        self.assertFalse(self.cache.lookup('Obj1__c', keys[1]))
+        self.assertTrue(self.cache.lookup('Obj2__c', keys[2]))
+        self.assertFalse(os.path.exists(os.path.join(self.cache.cache_dir, f"{keys[1]}.csv")))
+
+
+class ResultCacheRunTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_path = self.temp_dir.name
+        self.output_dir = os.path.join(self.base_path, '.out')
+        write_extracts(self.base_path, many_objects(3, 300))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def cached_run(self, **options) -> ComparisonRun:
+        return ComparisonRun(self.base_path, output_dir=self.output_dir, result_cache=True, **options)
+
+    def test_unchanged_inputs_hit(self):
+        first = self.cached_run()
+        self.assertEqual(first.result['result_cache']['hits'], 0)
+        second = self.cached_run()
+        self.assertEqual(second.result['result_cache']['hit_objects'], ['Obj00__c', 'Obj01__c', 'Obj02__c'])
+        self.assertEqual(second.differences(), first.differences())
+
+    def test_changed_input_misses(self):
+        self.cached_run()
+        edit_extract(self.base_path, 'org_c', 'Obj01__c', change_amount)
+        run = self.cached_run()
+        self.assertEqual(run.result['result_cache']['miss_objects'], ['Obj01__c'])
+        self.assertEqual(run.differences(), ComparisonRun(self.base_path).differences())
+
+    def test_changed_settings_miss(self):
+        self.cached_run()
+        run = self.cached_run(comparison_mode='consensus')
+        self.assertEqual(run.result['result_cache']['hits'], 0)
+        self.assertEqual(run.differences(), ComparisonRun(self.base_path, comparison_mode='consensus').differences())
+
+
+if __name__ == '__main__':
+    unittest.main()
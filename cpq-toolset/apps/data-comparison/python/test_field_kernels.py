@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Edge cases of the type-aware field comparison kernels
+Floats match within the legacy tolerance, date-times match as UTC instants and booleans and
+nulls compare exactly, with the pandas and Arrow kernels agreeing
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import field_kernels
+
+
+def column(values: list) -> pd.Series:
+    return pd.Series(values, dtype=object)
+
+
+class DifferenceMaskTest(unittest.TestCase):
+
+    def assert_differs(self, ref_values: list, comp_values: list, expected: list):
+        """Both engines flag exactly the expected rows"""
+        mask = field_kernels.difference_mask(column(ref_values), column(comp_values))
+        self.assertEqual(mask.tolist(), expected)
+
+        arrow_mask = field_kernels.arrow_difference_mask(pa.array(ref_values, from_pandas=True),
+                                                         pa.array(comp_values, from_pandas=True))
+        self.assertEqual(arrow_mask.to_pylist(), expected)
+
+    def test_float_tolerance(self):
+        self.assert_differs([1.0, 1.0, 0.1 + 0.2, 1e12], [1.0 + 1e-12, 1.0 + 1e-6, 0.3, 1e12 + 1],
+                            [False, True, False, False])
+
+    def test_nan_matches_only_nan(self):
+        self.assert_differs([np.nan, 1.0], [np.nan, np.nan], [False, True])
+
+    def test_integers_against_floats(self):
+        self.assert_differs([5, 5], [5.0, 5.000001], [False, True])
+
+    def test_integers_beyond_64_bits(self):
+        mask = field_kernels.difference_mask(column([2 ** 70, 2 ** 70]), column([2 ** 70, 2 ** 70 + 1]))
+        self.assertEqual(mask.tolist(), [False, True])
+
+    def test_datetimes_as_utc_instants(self):
+        self.assert_differs(['2024-01-31T09:30:00.000+0000', '2024-01-31T09:30:00Z', '2024-01-31T09:30:00.000+0000'],
+                            ['2024-01-31T10:30:00.000+0100', '2024-01-31T09:30:00.000+0000', '2024-01-31T09:31:00.000+0000'],
+                            [False, False, True])
+
+    def test_timezone_aware_timestamps(self):
+        utc = pd.Series(pd.to_datetime(['2024-01-31 09:30', '2024-01-31 09:30']).tz_localize('UTC'))
+        paris = pd.Series(pd.to_datetime(['2024-01-31 10:30', '2024-01-31 09:30']).tz_localize('Europe/Paris'))
+        self.assertEqual(field_kernels.difference_mask(utc, paris).tolist(), [False, True])
+        arrow_mask = field_kernels.arrow_difference_mask(pa.array(utc), pa.array(paris))
+        self.assertEqual(arrow_mask.to_pylist(), [False, True])
+
+    def test_booleans_and_nulls(self):
+        self.assert_differs([True, False, True, None, None], [True, True, None, None, False],
+                            [False, True, True, False, True])
+
+    def test_text(self):
+        self.assert_differs(['Discount', 'Markup', None], ['Discount', 'markup', ''], [False, True, True])
+
+
+class ValueKindTest(unittest.TestCase):
+
+    def test_kinds(self):
+        self.assertEqual(field_kernels.value_kind(column([1.5, None])), 'float')
+        self.assertEqual(field_kernels.value_kind(column([1, 2])), 'integer')
+        self.assertEqual(field_kernels.value_kind(column([True, None])), 'boolean')
+        self.assertEqual(field_kernels.value_kind(column(['2024-01-31T09:30:00Z', None])), 'datetime')
+        self.assertEqual(field_kernels.value_kind(column(['2024-01-31T09:30:00Z', 'soon'])), 'string')
+
+    def test_pair_kind(self):
+        self.assertEqual(field_kernels.pair_kind('integer', 'float'), 'float')
+        self.assertEqual(field_kernels.pair_kind('boolean', 'integer'), 'other')
+        self.assertEqual(field_kernels.pair_kind('string', 'string'), 'string')
+
+
+class ConsensusDifferencesTest(unittest.TestCase):
+
+    def test_orgs_compared_with_first_holder(self):
+        columns = [column([1.0, None, 3.0]), column([1.0 + 1e-12, 2.0, 3.5]), column([None, 2.0, 3.0])]
+        presence = np.array([[True, True, False], [False, True, True], [True, True, True]])
+        differs = field_kernels.consensus_differences(columns, presence)
+        self.assertEqual(differs.tolist(), [False, False, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
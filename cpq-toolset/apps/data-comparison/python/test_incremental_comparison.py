@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Incremental re-comparison against the record index of the previous run
+A run over edited extracts must write exactly what a full run writes while re-comparing only
+the keys whose records changed, and a change of settings must fall back to a full comparison
+"""
+
+import csv
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from multi_org_comparison_optimized import OptimizedSalesforceDataComparator
+from test_multi_org_comparison_optimized import ComparisonRun, many_objects, write_extracts
+
+COMPARE_OBJECT = OptimizedSalesforceDataComparator.compare_object
+
+
+def setUpModule():
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+def edit_extract(base_path: str, org: str, obj: str, edit):
+    """Rewrite one extract with edit applied to its list of data rows"""
+    path = os.path.join(base_path, org, f"{obj}.csv")
+    with open(path, newline='') as f:
+        header, *rows = list(csv.reader(f))
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(header)
+        writer.writerows(edit(rows))
+
+
+def change_amount(rows: list) -> list:
+    rows[5][2] = '-1'
+    return rows
+
+
+class IncrementalComparisonTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_path = self.temp_dir.name
+        self.output_dir = os.path.join(self.base_path, '.out')
+        write_extracts(self.base_path, many_objects(3, 600))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def incremental_run(self, **options) -> tuple:
+        """Output of an incremental run, with the records of every org compared per object"""
+        with mock.patch.object(OptimizedSalesforceDataComparator, 'compare_object',
+                               autospec=True, side_effect=COMPARE_OBJECT) as compare_object:
+            run = ComparisonRun(self.base_path, output_dir=self.output_dir, incremental=True, **options)
+        compared = {}
+        for call in compare_object.call_args_list:
+            _, object_name, org_frames, _ = call.args
+            compared[object_name] = sum(len(frame) for frame in org_frames.values())
+        return run.differences(), compared
+
+    def test_unchanged_inputs_reuse_every_key(self):
+        first, compared = self.incremental_run()
+        self.assertEqual(set(compared), {'Obj00__c', 'Obj01__c', 'Obj02__c'})
+        second, compared = self.incremental_run()
+        self.assertEqual(compared, {})
+        self.assertEqual(second, first)
+
+    def test_changed_keys_match_full_run(self):
+        self.incremental_run()
+        edit_extract(self.base_path, 'org_b', 'Obj01__c', change_amount)
+        edit_extract(self.base_path, 'org_a', 'Obj02__c', lambda rows: rows[:3] + rows[4:])
+
+        incremental, compared = self.incremental_run()
+        self.assertEqual(compared, {'Obj01__c': 3, 'Obj02__c': 2})  # K5 in all three orgs, K3 left in two
+        self.assertEqual(incremental, ComparisonRun(self.base_path).differences())
+
+    def test_settings_change_compares_in_full(self):
+        self.incremental_run()
+        consensus, compared = self.incremental_run(comparison_mode='consensus')
+        self.assertEqual(compared['Obj00__c'], 3 * 1800 - len(range(0, 1800, 11)))  # org_c drops every eleventh
+        self.assertEqual(consensus, ComparisonRun(self.base_path, comparison_mode='consensus').differences())
+
+
+class RecordIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.comparator = OptimizedSalesforceDataComparator()
+        self.comparator.discovered_orgs = ['org_a', 'org_b']
+
+    def digests(self, keys: list, records: list) -> pd.Series:
+        frame = pd.DataFrame({'primary_key': keys, 'composite_key': np.array(records, dtype=np.uint64)})
+        return self.comparator._key_digests(frame)
+
+    def test_key_digests_ignore_record_order(self):
+        first = self.digests(['K1', 'K2', 'K1'], [10, 20, 30])
+        second = self.digests(['K1', 'K1', 'K2'], [30, 10, 20])
+        self.assertEqual(first.sort_index().tolist(), second.sort_index().tolist())
+        self.assertNotEqual(first['K1'], self.digests(['K1'], [10])['K1'])
+
+    def test_changed_keys(self):
+        before = {'org_a': self.digests(['K1', 'K2', 'K3'], [1, 2, 3]), 'org_b': self.digests(['K1', 'K2'], [1, 2])}
+        after = {'org_a': self.digests(['K1', 'K2', 'K4'], [1, 5, 4]), 'org_b': self.digests(['K1', 'K2'], [1, 2])}
+        self.assertEqual(self.comparator._changed_keys(before, after), {'K2', 'K3', 'K4'})
+        self.assertEqual(self.comparator._changed_keys(before, {'org_a': after['org_a']}), {'K1', 'K2', 'K3', 'K4'})
+
+
+if __name__ == '__main__':
+    unittest.main()
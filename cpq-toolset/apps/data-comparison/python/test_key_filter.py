@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Key-set filtering with hash-set lookups and, past the threshold, Bloom filters
+A Bloom filter may let a few keys outside the set through as candidates but must never miss a
+member, and every filter must keep exactly the records the plain set lookups keep
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from key_filter import BloomFilter, KeyFilter
+
+LIST_SIZE = KeyFilter.BLOOM_THRESHOLD + 20000
+
+
+def keys(start: int, stop: int) -> list:
+    return [f"K{i}" for i in range(start, stop)]
+
+
+class BloomFilterTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.members = np.array(keys(0, LIST_SIZE), dtype=object)
+        cls.bloom = BloomFilter(cls.members)
+
+    def test_no_false_negatives(self):
+        self.assertTrue(self.bloom.might_contain(self.members).all())
+
+    def test_few_false_positives(self):
+        outsiders = np.array(keys(LIST_SIZE, LIST_SIZE + 100000), dtype=object)
+        self.assertLess(self.bloom.might_contain(outsiders).mean(), 0.03)
+
+
+class KeyFilterTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.listed = keys(0, LIST_SIZE * 2)[::2]  # Even keys
+        cls.records = pd.Series(keys(0, 50000) + [None, 'K-1'], dtype=object)
+        cls.is_listed = np.array([i % 2 == 0 for i in range(50000)] + [False, False])
+
+    def test_exclude_list_through_bloom_filter(self):
+        key_filter = KeyFilter(exclude=self.listed)
+        self.assertIsNotNone(key_filter.exclude.bloom)
+        keep = key_filter.keep_mask(self.records)
+        self.assertEqual(keep.tolist(), (~self.is_listed).tolist())
+
+    def test_include_list_through_bloom_filter(self):
+        key_filter = KeyFilter(include=self.listed)
+        self.assertIsNotNone(key_filter.include.bloom)
+        keep = key_filter.keep_mask(self.records)
+        self.assertEqual(keep.tolist(), self.is_listed.tolist())
+
+    def test_bloom_filter_matches_set_lookups(self):
+        exclude = self.listed[:1000]
+        include = keys(0, 30000)
+        bloom = KeyFilter(include=include, exclude=exclude, bloom_threshold=100)
+        exact = KeyFilter(include=include, exclude=exclude)
+        self.assertIsNotNone(bloom.exclude.bloom)
+        self.assertIsNone(exact.exclude.bloom)
+        self.assertEqual(bloom.keep_mask(self.records).tolist(), exact.keep_mask(self.records).tolist())
+
+    def test_null_keys(self):
+        records = pd.Series(['K1', None, np.nan], dtype=object)
+        self.assertEqual(KeyFilter(exclude=['K1']).keep_mask(records).tolist(), [False, True, True])
+        self.assertEqual(KeyFilter(include=['K1']).keep_mask(records).tolist(), [True, False, False])
+
+    def test_inactive_filter(self):
+        key_filter = KeyFilter(exclude=[])
+        self.assertFalse(key_filter.active)
+        self.assertTrue(key_filter.keep_mask(self.records).all())
+
+    def test_filter_table(self):
+        table = pa.table({'Key__c': ['K1', 'K2', None], 'Name': ['a', 'b', 'c']})
+        self.assertEqual(KeyFilter(exclude=['K2']).filter_table(table, 'Key__c')['Name'].to_pylist(), ['a', 'c'])
+        self.assertEqual(KeyFilter(include=['K2']).filter_table(table, 'Other__c').num_rows, 0)
+
+    def test_scan_filter(self):
+        table = pa.table({'Key__c': ['K1', 'K2', None]})
+        predicate = KeyFilter(exclude=['K2']).scan_filter('Key__c', pa.string())
+        self.assertEqual(table.filter(predicate)['Key__c'].to_pylist(), ['K1', None])
+        self.assertIsNone(KeyFilter(exclude=['K2']).scan_filter('Key__c', pa.int64()))
+        self.assertIsNone(KeyFilter(exclude=self.listed).scan_filter('Key__c', pa.string()))
+
+
+if __name__ == '__main__':
+    unittest.main()
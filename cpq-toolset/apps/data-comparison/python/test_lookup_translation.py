@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Translation of lookup Ids to their parent's foreign key while org frames are prepared
+Each org gives the same parent record its own Id, so lookups must compare by the parent's
+foreign key: from the parent index, else from the nested relationship, else the raw Id
+"""
+
+import csv
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from multi_org_comparison_arrow import ArrowSalesforceDataComparator
+from multi_org_comparison_optimized import OptimizedSalesforceDataComparator
+
+ORGS = ['org_a', 'org_b']
+LOOKUP = 'Rule__c.Rule_Key__c'
+
+
+def setUpModule():
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+def rule_id(org: str, index: int) -> str:
+    """18-character Id of a rule record, different in every org"""
+    return f"a0A{ORGS.index(org)}{index:011d}AAA"
+
+
+def write_extracts(base_path: str):
+    """Three rules in each org; org_b's third condition points at the second rule instead of the third"""
+    config = {'objects': {
+        'Rule__c': {'fields': ['Name', 'Rule_Key__c'], 'foreignKey': 'Rule_Key__c'},
+        'Condition__c': {'fields': ['Value__c', LOOKUP, 'Condition_Key__c'], 'foreignKey': 'Condition_Key__c'}
+    }}
+    with open(os.path.join(base_path, 'config_test.json'), 'w') as f:
+        json.dump(config, f)
+
+    for org in ORGS:
+        os.makedirs(os.path.join(base_path, org))
+        with open(os.path.join(base_path, org, 'Rule__c.csv'), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Id', 'Name', 'Rule_Key__c'])
+            for i in range(3):
+                writer.writerow([rule_id(org, i), f"Rule {i}", f"RK{i}"])
+        with open(os.path.join(base_path, org, 'Condition__c.csv'), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Id', 'Value__c', 'Rule__c', 'Condition_Key__c'])
+            for i in range(3):
+                rule = 1 if org == 'org_b' and i == 2 else i
+                writer.writerow([f"a0C{ORGS.index(org)}{i:011d}AAA", 'Price', rule_id(org, rule), f"CK{i}"])
+
+
+class LookupTranslationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_path = self.temp_dir.name
+        write_extracts(self.base_path)
+        self.comparator = OptimizedSalesforceDataComparator()
+        self.comparator.discover_orgs_and_objects(self.base_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def prepared(self, records: dict, org: str = 'org_a', indexed: bool = True) -> pd.DataFrame:
+        if indexed:
+            self.comparator.parent_indexes = self.comparator._build_parent_indexes(self.base_path, ['Condition__c'])
+        df = pd.DataFrame(records)
+        return self.comparator._prepare_org_frame(df, 'Condition__c', org, 'Condition_Key__c')
+
+    def test_lookup_fields_resolved_from_config(self):
+        self.assertEqual(self.comparator.lookup_fields['Condition__c'][LOOKUP], {
+            'field': 'Rule__c', 'relationship': 'Rule__r', 'parent': 'Rule__c', 'parent_key': 'Rule_Key__c'
+        })
+
+    def test_ids_joined_on_parent_index(self):
+        # Lookups match the index on the 15-character Id, whichever form the child holds
+        frame = self.prepared({'Rule__c': [rule_id('org_b', 2), rule_id('org_b', 0)[:15], None],
+                               'Condition_Key__c': ['CK0', 'CK1', 'CK2']}, org='org_b')
+        self.assertEqual(frame[LOOKUP].iloc[:2].tolist(), ['RK2', 'RK0'])
+        self.assertTrue(pd.isna(frame[LOOKUP].iloc[2]))
+        self.assertEqual(frame['primary_key'].tolist(), ['CK0', 'CK1', 'CK2'])
+
+    def test_relationship_column_for_unindexed_ids(self):
+        related = [json.dumps({'Rule_Key__c': 'RK9'}), "{'Rule_Key__c': 'RK8'}", None]
+        frame = self.prepared({'Rule__c': ['a0A900000000001AAA', None, rule_id('org_a', 1)], 'Rule__r': related,
+                               'Condition_Key__c': ['CK0', 'CK1', 'CK2']})
+        self.assertEqual(frame[LOOKUP].tolist(), ['RK9', 'RK8', 'RK1'])
+
+    def test_raw_id_without_parent_index(self):
+        frame = self.prepared({'Rule__c': [rule_id('org_a', 0)], 'Condition_Key__c': ['CK0']}, indexed=False)
+        self.assertEqual(frame[LOOKUP].tolist(), [rule_id('org_a', 0)])
+
+    def test_engines_compare_parent_keys(self):
+        for comparator_class in (OptimizedSalesforceDataComparator, ArrowSalesforceDataComparator):
+            with self.subTest(engine=comparator_class.ENGINE):
+                output_dir = tempfile.mkdtemp(dir=self.base_path, prefix='.out')
+                comparator_class().run_full_comparison(self.base_path, output_dir)
+                differences = pd.read_csv(os.path.join(output_dir, 'all_differences.csv'), dtype=str)
+                self.assertEqual(set(differences['ForeignKeyValue']), {'CK2'})
+                self.assertEqual(set(differences['ObjectFieldName']), {f"Condition__c.{LOOKUP}"})
+                self.assertEqual(differences[['Org_org_a', 'Org_org_b']].drop_duplicates().values.tolist(),
+                                 [['RK2', 'RK1']])
+
+
+if __name__ == '__main__':
+    unittest.main()
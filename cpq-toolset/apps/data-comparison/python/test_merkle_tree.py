@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Merkle trees over record digests: roots equal exactly for equal record sets in any order, and
+descending the trees finds only the key ranges holding differing records
+"""
+
+import logging
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import merkle_tree
+from merkle_tree import MerkleTree
+from multi_org_comparison_optimized import OptimizedSalesforceDataComparator
+
+
+def setUpModule():
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+def digests(*values) -> np.ndarray:
+    return np.array(values, dtype=np.uint64)
+
+
+def build_trees(org_keys: list, org_digests: list, leaf_keys: int) -> list:
+    """One tree per org over shared key ranges of the keys' sorted order"""
+    codes, unique_keys = pd.factorize(np.concatenate(org_keys))
+    org_codes = np.split(codes, np.cumsum([len(keys) for keys in org_keys])[:-1])
+    org_ranges, range_count = merkle_tree.key_ranges(org_codes, np.argsort(unique_keys.astype(str)), leaf_keys)
+    return [MerkleTree(ranges, merkle_tree.record_hashes(values), range_count)
+            for ranges, values in zip(org_ranges, org_digests)]
+
+
+class RootHashTest(unittest.TestCase):
+
+    def test_order_does_not_matter(self):
+        self.assertEqual(merkle_tree.root_hash(merkle_tree.record_hashes(digests(1, 2, 3))),
+                         merkle_tree.root_hash(merkle_tree.record_hashes(digests(3, 1, 2))))
+
+    def test_duplicates_do_not_cancel(self):
+        roots = {merkle_tree.root_hash(merkle_tree.record_hashes(values))
+                 for values in (digests(), digests(7), digests(7, 7), digests(7, 7, 8, 8))}
+        self.assertEqual(len(roots), 4)
+
+    def test_tree_root_matches_root_hash(self):
+        keys = np.array([f"K{i:03d}" for i in range(100)], dtype=object)
+        values = np.arange(100, dtype=np.uint64) * np.uint64(7919)
+        tree, = build_trees([keys], [values], leaf_keys=8)
+        self.assertEqual(tree.root, merkle_tree.root_hash(merkle_tree.record_hashes(values)))
+
+
+class DifferingLeavesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.keys = np.array([f"K{i:03d}" for i in range(100)], dtype=object)
+        self.values = np.arange(100, dtype=np.uint64) * np.uint64(7919)
+
+    def test_equal_sets_in_any_order(self):
+        order = np.random.default_rng(0).permutation(100)
+        trees = build_trees([self.keys, self.keys[order]], [self.values, self.values[order]], leaf_keys=8)
+        self.assertEqual(trees[0].root, trees[1].root)
+        self.assertEqual(merkle_tree.differing_leaves(trees).tolist(), [])
+
+    def test_changed_record_in_its_leaf_only(self):
+        changed = self.values.copy()
+        changed[[3, 42, 99]] += np.uint64(1)
+        trees = build_trees([self.keys, self.keys], [self.values, changed], leaf_keys=8)
+        self.assertNotEqual(trees[0].root, trees[1].root)
+        self.assertEqual(merkle_tree.differing_leaves(trees).tolist(), [0, 5, 12])  # 13 leaves, odd levels padded
+
+    def test_record_in_one_org_only(self):
+        trees = build_trees([self.keys, self.keys[:-1]], [self.values, self.values[:-1]], leaf_keys=10)
+        self.assertEqual(merkle_tree.differing_leaves(trees).tolist(), [9])
+
+    def test_three_orgs(self):
+        changed = self.values.copy()
+        changed[57] += np.uint64(1)
+        trees = build_trees([self.keys] * 3, [self.values, self.values, changed], leaf_keys=16)
+        self.assertEqual(merkle_tree.differing_leaves(trees).tolist(), [3])
+
+
+class DifferingKeyRangesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.comparator = OptimizedSalesforceDataComparator()
+        keys = [f"K{i:05d}" for i in range(5000)]
+        self.frames = {org: pd.DataFrame({'primary_key': keys, 'composite_key': np.arange(5000, dtype=np.uint64)})
+                       for org in ('org_a', 'org_b')}
+
+    def test_matching_roots_skip_key_ranges(self):
+        shuffled = dict(self.frames, org_b=self.frames['org_b'].sample(frac=1, random_state=0))
+        with mock.patch.object(self.comparator, '_record_key_codes', side_effect=AssertionError('keys built')):
+            self.assertEqual(self.comparator._differing_key_ranges('Obj__c', shuffled, ['org_a', 'org_b']), {})
+
+    def test_only_differing_ranges_kept(self):
+        changed = self.frames['org_b'].copy()
+        changed.loc[3000, 'composite_key'] = np.uint64(99999)
+        frames = dict(self.frames, org_b=changed)
+        differing = self.comparator._differing_key_ranges('Obj__c', frames, ['org_a', 'org_b'])
+        leaf = 3000 // merkle_tree.LEAF_KEYS
+        expected = [f"K{i:05d}" for i in range(leaf * merkle_tree.LEAF_KEYS, (leaf + 1) * merkle_tree.LEAF_KEYS)]
+        for org in ('org_a', 'org_b'):
+            self.assertEqual(differing[org]['primary_key'].tolist(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
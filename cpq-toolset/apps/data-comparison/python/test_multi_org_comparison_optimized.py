@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+End-to-end runs of the streaming comparator on small generated extracts
+Each test writes a config and one CSV extract per org and object to a temporary directory
+"""
+
+import csv
+import json
+import logging
+import os
+import pickle
+import tempfile
+import unittest
+from typing import Optional
+
+import pandas as pd
+
+from multi_org_comparison_arrow import ArrowSalesforceDataComparator
+from multi_org_comparison_optimized import OptimizedSalesforceDataComparator
+
+ORGS = ['org_a', 'org_b', 'org_c']
+COMPARATORS = {'pandas': OptimizedSalesforceDataComparator, 'arrow': ArrowSalesforceDataComparator}
+
+
+def setUpModule():
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+def write_extracts(base_path: str, object_rows: dict):
+    """
+    Extracts of every object for every org, object_rows giving each object's record count
+    org_b changes every seventh amount and renames every thirteenth record with text that needs
+    quoting in CSV, and org_c drops every eleventh record
+    """
+    config = {'objects': {obj: {'fields': ['Name', 'Amount__c', 'Key__c'], 'foreignKey': 'Key__c'}
+                          for obj in object_rows}}
+    with open(os.path.join(base_path, 'config_test.json'), 'w') as f:
+        json.dump(config, f)
+
+    for org in ORGS:
+        os.makedirs(os.path.join(base_path, org))
+        for obj, row_count in object_rows.items():
+            with open(os.path.join(base_path, org, f"{obj}.csv"), 'w', newline='') as f:
+                writer = csv.writer(f, lineterminator='\n')
+                writer.writerow(['Id', 'Name', 'Amount__c', 'Key__c'])
+                for i in range(row_count):
+                    if org == 'org_c' and i % 11 == 0:
+                        continue
+                    amount = i + 1 if org == 'org_b' and i % 7 == 0 else i
+                    name = f'Record {i}, "renamed"\nagain' if org == 'org_b' and i % 13 == 0 else f"Record {i}"
+                    writer.writerow([f"a0{i:013d}", name, amount, f"K{i}"])
+
+
+def many_objects(count: int = 8, rows: int = 3000) -> dict:
+    """Objects largest first in output order, so the pool still holds queued objects while the first is written"""
+    return {f"Obj{index:02d}__c": rows * (count - index) for index in range(count)}
+
+
+class ComparisonRun:
+    """One comparator run over the extracts in a temporary directory, in a new output directory unless given one"""
+
+    def __init__(self, base_path: str, engine: str = 'pandas', output_dir: Optional[str] = None, **options):
+        self.output_dir = output_dir or tempfile.mkdtemp(dir=base_path, prefix='.out')
+        self.comparator = COMPARATORS[engine](**options)
+        self.result = self.comparator.run_full_comparison(base_path, self.output_dir)
+
+    def differences(self) -> bytes:
+        with open(os.path.join(self.output_dir, 'all_differences.csv'), 'rb') as f:
+            return f.read()
+
+
+class ParallelWorkersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_path = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_comparator_pickles_with_open_output(self):
+        write_extracts(self.base_path, many_objects(2, 100))
+        comparator = OptimizedSalesforceDataComparator(result_cache=True, parquet_output=True)
+        comparator.discover_orgs_and_objects(self.base_path)
+        output_dir = os.path.join(self.base_path, '.out')
+        comparator._start_output(output_dir)
+        comparator._open_result_cache(self.base_path, comparator.common_objects, output_dir)
+        comparator._write_object_differences('Obj00__c', comparator._compare_object_from_disk(self.base_path, 'Obj00__c'))
+
+        copy = pickle.loads(pickle.dumps(comparator))
+        self.assertIsNone(copy._difference_writer)
+        self.assertIsNone(copy.result_cache)
+        self.assertEqual(copy.metrics.records(), [])
+        self.assertEqual(copy.discovered_orgs, ORGS)
+        comparator._generate_output_files(output_dir)
+
+    def test_more_objects_than_workers(self):
+        objects = many_objects()
+        write_extracts(self.base_path, objects)
+        run = ComparisonRun(self.base_path, workers=2)
+
+        self.assertTrue(run.result['success'])
+        self.assertEqual(run.result['total_objects'], len(objects))
+        records = list(csv.reader(run.differences().decode('utf-8').splitlines(keepends=True)))
+        self.assertEqual(len(records), run.result['total_differences'] + 1)
+
+    def test_workers_match_serial_output(self):
+        write_extracts(self.base_path, many_objects(6, 500))
+        for engine in ('pandas', 'arrow'):
+            for mode in OptimizedSalesforceDataComparator.COMPARISON_MODES:
+                serial = ComparisonRun(self.base_path, engine=engine, comparison_mode=mode).differences()
+                self.assertTrue(serial)
+                for workers in (2, 3):
+                    with self.subTest(engine=engine, mode=mode, workers=workers):
+                        parallel = ComparisonRun(self.base_path, engine=engine, comparison_mode=mode, workers=workers)
+                        self.assertEqual(parallel.differences(), serial)
+
+
+class EngineOutputTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_path = self.temp_dir.name
+        write_extracts(self.base_path, many_objects(3, 400))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_engines_write_identical_csv(self):
+        for mode in OptimizedSalesforceDataComparator.COMPARISON_MODES:
+            with self.subTest(mode=mode):
+                pandas_output = ComparisonRun(self.base_path, comparison_mode=mode).differences()
+                arrow_output = ComparisonRun(self.base_path, engine='arrow', comparison_mode=mode).differences()
+                self.assertIn(b'"Record 0, ""renamed""\nagain"', pandas_output)
+                self.assertEqual(arrow_output, pandas_output)
+
+
+class PartitionCountTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_path = self.temp_dir.name
+        write_extracts(self.base_path, {'Obj00__c': 2500})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def partition_count(self, **options) -> int:
+        comparator = OptimizedSalesforceDataComparator(**options)
+        comparator.discover_orgs_and_objects(self.base_path)
+        return comparator._partition_count(self.base_path, 'Obj00__c')
+
+    def test_small_budget_bounded_by_chunks(self):
+        self.assertEqual(self.partition_count(max_memory_mb=0.001, chunk_size=1), OptimizedSalesforceDataComparator.MAX_PARTITIONS)
+        self.assertEqual(self.partition_count(max_memory_mb=0.001, chunk_size=1000), 3)
+        self.assertEqual(self.partition_count(max_memory_mb=0.001, chunk_size=5000), 1)
+        self.assertEqual(self.partition_count(max_memory_mb=100, chunk_size=1000), 1)
+
+    def test_bounded_partitions_match_in_memory_output(self):
+        in_memory = ComparisonRun(self.base_path).differences()
+        partitioned = ComparisonRun(self.base_path, max_memory_mb=0.001, chunk_size=1000)
+        self.assertEqual(partitioned.comparator._partition_counts, {'Obj00__c': 3})
+        self.assertEqual(partitioned.differences(), in_memory)
+
+
+class MegaDataFrameTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_path = self.temp_dir.name
+        write_extracts(self.base_path, many_objects(3, 200))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_set_comparisons_without_a_run(self):
+        comparator = OptimizedSalesforceDataComparator()
+        comparator.discover_orgs_and_objects(self.base_path)
+        mega_df = comparator.create_mega_dataframe(comparator.discovered_orgs, self.base_path)
+        comparator.run_set_comparisons(mega_df, comparator.discovered_orgs, self.base_path)
+
+        differences = pd.DataFrame(comparator.final_differences_df)
+        rendered = comparator._render_differences(differences, 0, len(differences))
+        streamed = ComparisonRun(self.base_path).differences()
+        self.assertEqual(rendered, streamed.split(b'\n', 1)[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
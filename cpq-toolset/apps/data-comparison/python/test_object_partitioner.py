@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Key-range partitioning of objects for out-of-core comparison
+Buckets must hold ascending, non-overlapping key ranges shared by every org, keep each record
+once in its source order and read back as the loader would have read the whole file
+"""
+
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from key_filter import KeyFilter
+from object_partitioner import ObjectPartitioner
+
+ORGS = ['org_a', 'org_b']
+KEY = 'Key__c'
+
+
+def sort_keys(keys: pd.Series) -> np.ndarray:
+    return keys.to_numpy(dtype=object).astype(str)
+
+
+def org_records(org: str) -> pd.DataFrame:
+    """Keys out of order with repeats, one org holding keys the other does not"""
+    keys = [f"K{(i * 37) % 500}" for i in range(1500)]
+    if org == 'org_b':
+        keys = keys[100:] + [f"K{i}" for i in range(500, 560)]
+    return pd.DataFrame({'Id': [f"{org}-{i}" for i in range(len(keys))], KEY: keys,
+                         'Amount__c': [str(i) for i in range(len(keys))]})
+
+
+class ObjectPartitionerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.records = {org: org_records(org) for org in ORGS}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_sources(self, extension: str) -> dict:
+        sources = {}
+        for org, df in self.records.items():
+            path = os.path.join(self.temp_dir.name, f"{org}.{extension}")
+            if extension == 'csv':
+                df.to_csv(path, index=False)
+            elif extension == 'parquet':
+                df.to_parquet(path, index=False)
+            else:
+                with open(path, 'w') as f:
+                    for record in df.to_dict('records'):
+                        f.write(json.dumps(record) + '\n')
+            sources[org] = path
+        return sources
+
+    def partitioned(self, extension: str, partitions: int = 8, key_filter: KeyFilter = None) -> ObjectPartitioner:
+        spill_dir = tempfile.mkdtemp(dir=self.temp_dir.name)
+        partitioner = ObjectPartitioner(spill_dir, KEY, partitions, 200, lambda columns: columns, sort_keys,
+                                        logging.getLogger('test'), key_filter=key_filter)
+        partitioner.spill(self.write_sources(extension))
+        return partitioner
+
+    def buckets(self, partitioner: ObjectPartitioner, org: str) -> list:
+        frames = [partitioner.read_bucket(bucket, org) for bucket in range(partitioner.bucket_count)]
+        return [frame for frame in frames if frame is not None]
+
+    def test_ascending_key_ranges(self):
+        for extension in ('csv', 'jsonl', 'parquet'):
+            with self.subTest(extension=extension):
+                partitioner = self.partitioned(extension)
+                self.assertEqual(partitioner.bucket_count, 8)
+                last_key = ''
+                for bucket in range(partitioner.bucket_count):
+                    keys = set()
+                    for org in ORGS:
+                        frame = partitioner.read_bucket(bucket, org)
+                        if frame is not None:
+                            keys.update(frame[KEY])
+                    self.assertGreater(min(keys), last_key)
+                    last_key = max(keys)
+
+    def test_records_kept_once_in_source_order(self):
+        for extension in ('csv', 'jsonl', 'parquet'):
+            partitioner = self.partitioned(extension)
+            for org in ORGS:
+                with self.subTest(extension=extension, org=org):
+                    spilled = pd.concat(self.buckets(partitioner, org), ignore_index=True)
+                    expected = self.records[org]
+                    self.assertEqual(sorted(spilled['Id']), sorted(expected['Id']))
+                    positions = expected.reset_index().set_index('Id').loc[spilled['Id'], 'index'].to_numpy()
+                    bucket_of = np.searchsorted(partitioner.boundaries, spilled[KEY].to_numpy(dtype=str), side='right')
+                    for bucket in np.unique(bucket_of):
+                        in_bucket = positions[bucket_of == bucket]
+                        self.assertTrue((np.diff(in_bucket) > 0).all())
+
+    def test_same_boundaries_every_run(self):
+        first = self.partitioned('csv')
+        second = self.partitioned('parquet')
+        self.assertEqual(first.boundaries.tolist(), second.boundaries.tolist())
+        for bucket in range(first.bucket_count):
+            for org in ORGS:
+                self.assertEqual(first.read_bucket(bucket, org)['Id'].tolist(),
+                                 second.read_bucket(bucket, org)['Id'].tolist())
+
+    def test_one_partition(self):
+        partitioner = self.partitioned('csv', partitions=1)
+        self.assertEqual(partitioner.bucket_count, 1)
+        self.assertEqual(partitioner.read_bucket(0, 'org_a')['Id'].tolist(), self.records['org_a']['Id'].tolist())
+
+    def test_key_filter_drops_records(self):
+        excluded = {f"K{i}" for i in range(0, 500, 5)}
+        partitioner = self.partitioned('jsonl', key_filter=KeyFilter(exclude=excluded))
+        spilled = pd.concat(self.buckets(partitioner, 'org_a'), ignore_index=True)
+        expected = self.records['org_a'][~self.records['org_a'][KEY].isin(excluded)]
+        self.assertEqual(sorted(spilled['Id']), sorted(expected['Id']))
+
+
+if __name__ == '__main__':
+    unittest.main()
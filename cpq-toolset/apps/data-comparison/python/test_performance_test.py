@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Baseline checks of the benchmark suite, and one real benchmark run of the optimized engine
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+import performance_test
+from multi_org_comparison_optimized import OptimizedSalesforceDataComparator
+
+KEY = performance_test.scenario_key('optimized', 3, 1000, 0, 0.02)
+
+
+def setUpModule():
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+def result(wall_seconds: float = 10.0, peak_rss_bytes: int = 100 * 1024 * 1024, differences: int = 50) -> dict:
+    return {'success': True, 'wall_seconds': wall_seconds, 'peak_rss_bytes': peak_rss_bytes,
+            'differences': differences}
+
+
+class CheckRegressionsTest(unittest.TestCase):
+
+    def regressions(self, current: dict, base: dict = None) -> list:
+        baseline = {'results': {KEY: base or result()}}
+        return performance_test.check_regressions({KEY: current}, baseline, tolerance=0.25)
+
+    def test_scenario_key(self):
+        self.assertEqual(KEY, 'optimized/orgs=3/price_rules=1000/extra_fields=0/drift_rate=0.02')
+
+    def test_within_tolerance(self):
+        self.assertEqual(self.regressions(result(wall_seconds=12.4, peak_rss_bytes=120 * 1024 * 1024)), [])
+
+    def test_slower_and_bigger(self):
+        regressions = self.regressions(result(wall_seconds=12.6, peak_rss_bytes=130 * 1024 * 1024))
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('wall time 12.60s vs baseline 10.00s', regressions[0])
+        self.assertIn('peak memory 130.0 MB vs baseline 100.0 MB', regressions[1])
+
+    def test_any_change_in_differences(self):
+        self.assertEqual(len(self.regressions(result(differences=49))), 1)
+
+    def test_failed_or_missing_runs_skipped(self):
+        self.assertEqual(self.regressions({'success': False, 'error': 'boom'}), [])
+        self.assertEqual(self.regressions(result(wall_seconds=99), {'success': False}), [])
+        self.assertEqual(performance_test.check_regressions({KEY: result(wall_seconds=99)}, {}, 0.25), [])
+
+    def test_unknown_memory_not_compared(self):
+        self.assertEqual(self.regressions(result(peak_rss_bytes=None)), [])
+
+    def test_baseline_round_trip(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'baseline.json')
+            self.assertIsNone(performance_test.load_baseline(path))
+            performance_test.save_baseline(path, {KEY: result()}, 0.25, seed=3)
+            baseline = performance_test.load_baseline(path)
+        self.assertEqual(baseline['results'], {KEY: result()})
+        self.assertEqual((baseline['seed'], baseline['tolerance']), (3, 0.25))
+
+
+class RunBenchmarkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.test_data = performance_test.create_test_data(2, 40, 1, 0.1)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_data['test_dir'], ignore_errors=True)
+
+    def test_counts_the_differences_of_a_direct_run(self):
+        benchmark = performance_test.run_benchmark('optimized', self.test_data, repeat=2)
+        self.assertTrue(benchmark['success'], benchmark.get('error'))
+        self.assertEqual(len(benchmark['runs']), 2)
+        self.assertEqual(benchmark['wall_seconds'], min(benchmark['runs']))
+
+        output_dir = os.path.join(self.test_data['test_dir'], 'direct')
+        direct = OptimizedSalesforceDataComparator().run_full_comparison(self.test_data['test_dir'], output_dir)
+        self.assertGreater(direct['total_differences'], 0)
+        self.assertEqual(benchmark['differences'], direct['total_differences'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic CPQ extractions: the same seed and settings give byte-identical files, and
+the records look like the fetcher's, with valid Ids and lookups to parents of the same org
+"""
+
+import filecmp
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+import canonical_forms
+from synthetic_cpq_data import FOREIGN_KEYS, PRICE_CONDITION, PRICE_RULE, SyntheticCPQDataGenerator
+
+
+def written_files(base_path: str) -> list:
+    return sorted(os.path.relpath(os.path.join(root, name), base_path)
+                  for root, _, names in os.walk(base_path) for name in names)
+
+
+class SyntheticCPQDataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def generate(self, name: str, **settings) -> dict:
+        settings = {'orgs': 3, 'price_rules': 60, 'drift_rate': 0.1, 'duplicate_rate': 0.05, **settings}
+        return SyntheticCPQDataGenerator(**settings).generate(os.path.join(self.temp_dir.name, name))
+
+    def test_same_seed_same_bytes(self):
+        first = self.generate('first', seed=7)
+        second = self.generate('second', seed=7)
+        files = written_files(first['base_path'])
+        self.assertEqual(files, written_files(second['base_path']))
+        self.assertEqual(len(files), 1 + 3 * 3 * 2)  # Config, then three objects in two formats per org
+        _, mismatched, errors = filecmp.cmpfiles(first['base_path'], second['base_path'], files, shallow=False)
+        self.assertEqual((mismatched, errors), ([], []))
+
+    def test_other_seed_other_records(self):
+        first = self.generate('first', seed=7)
+        other = self.generate('other', seed=8)
+        org = SyntheticCPQDataGenerator.org_folder(first['orgs'][1])
+        path = os.path.join(org, f"{PRICE_RULE}.jsonl")
+        self.assertFalse(filecmp.cmp(os.path.join(first['base_path'], path), os.path.join(other['base_path'], path),
+                                     shallow=False))
+
+    def test_ids_and_lookups(self):
+        dataset = self.generate('dataset', formats=['parquet'])
+        for username in dataset['orgs']:
+            org_dir = os.path.join(dataset['base_path'], SyntheticCPQDataGenerator.org_folder(username))
+            rules = pd.read_parquet(os.path.join(org_dir, f"{PRICE_RULE}.parquet"))
+            conditions = pd.read_parquet(os.path.join(org_dir, f"{PRICE_CONDITION}.parquet"))
+            with self.subTest(org=username):
+                ids = pd.concat([rules['Id'], conditions['Id']], ignore_index=True)
+                self.assertTrue(ids.is_unique)
+                self.assertTrue((ids == canonical_forms._with_id_suffix(ids.str[:15])).all())
+
+                parent_keys = rules.drop_duplicates('Id').set_index('Id')[FOREIGN_KEYS[PRICE_RULE]]
+                self.assertTrue(conditions['SBQQ__Rule__c'].isin(parent_keys.index).all())
+                nested = conditions['SBQQ__Rule__r'].map(lambda parent: parent[FOREIGN_KEYS[PRICE_RULE]])
+                self.assertEqual(nested.tolist(), parent_keys.loc[conditions['SBQQ__Rule__c']].tolist())
+
+    def test_config_matches_discovery(self):
+        dataset = self.generate('dataset', orgs=2)
+        with open(dataset['config_path']) as f:
+            config = json.load(f)
+        self.assertEqual(config['orgs'], dataset['orgs'])
+        folders = sorted(name for name in os.listdir(dataset['base_path'])
+                         if os.path.isdir(os.path.join(dataset['base_path'], name)))
+        self.assertEqual(folders, ['org1_synthetic_test', 'org2_synthetic_test'])
+        self.assertEqual({obj: settings['foreignKey'] for obj, settings in config['objects'].items()}, FOREIGN_KEYS)
+
+    def test_invalid_settings(self):
+        for settings in ({'orgs': 0}, {'drift_rate': 1.5}, {'formats': ['csv']}, {'formats': []}):
+            with self.subTest(settings=settings):
+                with self.assertRaises(ValueError):
+                    SyntheticCPQDataGenerator(**settings)
+
+
+if __name__ == '__main__':
+    unittest.main()
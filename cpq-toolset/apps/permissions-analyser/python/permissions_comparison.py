@@ -14,6 +14,11 @@ import pandas as pd
 from typing import Dict, List, Set, Tuple, Any
 import logging
 
+# Modules shared between apps sit in shared/modules/python in the source tree and in the runtime alike
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'shared', 'modules', 'python'))
+
+from run_metrics import RunMetrics
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -22,11 +27,12 @@ logger = logging.getLogger(__name__)
 class PermissionsComparison:
     """Main class for comparing permissions across organizations"""
     
-    def __init__(self, data_path: str, output_path: str, comparison_id: str):
+    def __init__(self, data_path: str, output_path: str, comparison_id: str, profile: bool = False):
         self.data_path = Path(data_path)
         self.output_path = Path(output_path)
         self.comparison_id = comparison_id
         self.org_data = {}
+        self.metrics = RunMetrics('permissions_comparison', profile=profile, comparison_id=comparison_id)
         self.comparison_results = {
             'comparison_id': comparison_id,
             'timestamp': datetime.now().isoformat(),
@@ -39,15 +45,19 @@ class PermissionsComparison:
         logger.info(f"Loading data from {self.data_path}")
         
         # Find all org directories
-        org_dirs = [d for d in self.data_path.iterdir() if d.is_dir() and not d.name.startswith('.')]
+        with self.metrics.phase('discovery'):
+            org_dirs = [d for d in self.data_path.iterdir() if d.is_dir() and not d.name.startswith('.')]
         
         for org_dir in org_dirs:
             org_name = org_dir.name
             permissions_file = org_dir / 'processed_permissions.json'
             
             if permissions_file.exists():
-                with open(permissions_file, 'r') as f:
-                    self.org_data[org_name] = json.load(f)
+                with self.metrics.phase('load', org=org_name) as counts:
+                    with open(permissions_file, 'r') as f:
+                        self.org_data[org_name] = json.load(f)
+                    counts['rows'] = sum(len(self.org_data[org_name].get(kind, {})) for kind in ('profiles', 'permissionSets'))
+                    counts['bytes'] = permissions_file.stat().st_size
                 logger.info(f"Loaded permissions for {org_name}")
             else:
                 logger.warning(f"No permissions data found for {org_name}")
@@ -273,22 +283,27 @@ class PermissionsComparison:
             raise ValueError("At least 2 organizations are required for comparison")
         
         # Run comparisons
-        self.comparison_results['details']['profiles'] = self.compare_profiles()
-        self.comparison_results['details']['permission_sets'] = self.compare_permission_sets()
-        
-        # Generate summary
-        self.comparison_results['summary'] = self.generate_summary_report()
-        
-        # Save results
-        logger.info(f"Saving results to {self.output_path}")
-        with open(self.output_path, 'w') as f:
-            json.dump(self.comparison_results, f, indent=2, default=str)
+        with self.metrics.phase('compare', 'profiles'):
+            self.comparison_results['details']['profiles'] = self.compare_profiles()
+        with self.metrics.phase('compare', 'permission_sets'):
+            self.comparison_results['details']['permission_sets'] = self.compare_permission_sets()
+        
+        with self.metrics.phase('output'):
+            # Generate summary
+            self.comparison_results['summary'] = self.generate_summary_report()
+            
+            # Save results
+            logger.info(f"Saving results to {self.output_path}")
+            with open(self.output_path, 'w') as f:
+                json.dump(self.comparison_results, f, indent=2, default=str)
+            
+            # Export to Excel
+            try:
+                self.export_to_excel()
+            except Exception as e:
+                logger.warning(f"Failed to export to Excel: {e}")
         
-        # Export to Excel
-        try:
-            self.export_to_excel()
-        except Exception as e:
-            logger.warning(f"Failed to export to Excel: {e}")
+        self.metrics.write(self.output_path.parent, f"{self.comparison_id}_metrics.json")
         
         logger.info("Comparison completed successfully")
 
@@ -299,6 +314,8 @@ def main():
     parser.add_argument('--data-path', required=True, help='Path to extracted permissions data')
     parser.add_argument('--output-path', required=True, help='Path for output results')
     parser.add_argument('--comparison-id', required=True, help='Unique comparison ID')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile every phase with cProfile and tracemalloc next to the metrics file')
     
     args = parser.parse_args()
     
@@ -306,7 +323,8 @@ def main():
         comparison = PermissionsComparison(
             args.data_path,
             args.output_path,
-            args.comparison_id
+            args.comparison_id,
+            args.profile
         )
         comparison.run_comparison()
         
@@ -17,6 +17,11 @@ from typing import Dict, List, Set, Tuple, Any, Optional
 import logging
 from collections import defaultdict
 
+# Modules shared between apps sit in shared/modules/python in the source tree and in the runtime alike
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'shared', 'modules', 'python'))
+
+from run_metrics import RunMetrics
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -25,13 +30,16 @@ logger = logging.getLogger(__name__)
 class EnhancedPermissionsComparison:
     """Enhanced class for comparing all permission types across organizations"""
     
-    def __init__(self, data_path: str, output_path: str, comparison_id: str, config_path: Optional[str] = None):
+    def __init__(self, data_path: str, output_path: str, comparison_id: str, config_path: Optional[str] = None,
+                 profile: bool = False):
         self.data_path = Path(data_path)
         self.output_path = Path(output_path)
         self.comparison_id = comparison_id
         self.config_path = Path(config_path) if config_path else None
         self.org_data = {}
-        self.config = self._load_config()
+        self.metrics = RunMetrics('permissions_comparison_enhanced', profile=profile, comparison_id=comparison_id)
+        with self.metrics.phase('config_load'):
+            self.config = self._load_config()
         self.comparison_results = {
             'comparison_id': comparison_id,
             'timestamp': datetime.now().isoformat(),
@@ -92,37 +100,47 @@ class EnhancedPermissionsComparison:
         logger.info(f"Loading data from {self.data_path}")
         
         # Find all org directories
-        org_dirs = [d for d in self.data_path.iterdir() if d.is_dir() and not d.name.startswith('.')]
+        with self.metrics.phase('discovery'):
+            org_dirs = [d for d in self.data_path.iterdir() if d.is_dir() and not d.name.startswith('.')]
         
         for org_dir in org_dirs:
-            org_name = org_dir.name
-            logger.info(f"Loading metadata for {org_name}")
-            
-            # Look for processed_permissions.json file
-            processed_file = org_dir / 'processed_permissions.json'
-            if processed_file.exists():
-                with open(processed_file, 'r') as f:
-                    data = json.load(f)
-                    self.org_data[org_name] = {
-                        'profiles': data.get('profiles', {}),
-                        'permissionSets': data.get('permissionSets', {}),
-                        'permissionSetGroups': data.get('permissionSetGroups', {}),
-                        'mutingPermissionSets': data.get('mutingPermissionSets', {})
-                    }
-            else:
-                logger.warning(f"No processed_permissions.json found for {org_name}, trying to load from XML...")
-                # Fallback to XML parsing
+            with self.metrics.phase('load', org=org_dir.name) as counts:
+                self._load_org(org_dir)
+                counts['rows'] = sum(len(items) for items in self.org_data[org_dir.name].values())
+                processed_file = org_dir / 'processed_permissions.json'
+                if processed_file.exists():
+                    counts['bytes'] = processed_file.stat().st_size
+    
+    def _load_org(self, org_dir: Path) -> None:
+        """Load one organization's permissions from processed_permissions.json, falling back to XML"""
+        org_name = org_dir.name
+        logger.info(f"Loading metadata for {org_name}")
+        
+        # Look for processed_permissions.json file
+        processed_file = org_dir / 'processed_permissions.json'
+        if processed_file.exists():
+            with open(processed_file, 'r') as f:
+                data = json.load(f)
                 self.org_data[org_name] = {
-                    'profiles': self._load_profiles(org_dir),
-                    'permissionSets': self._load_permission_sets(org_dir),
-                    'permissionSetGroups': self._load_permission_set_groups(org_dir),
-                    'mutingPermissionSets': self._load_muting_permission_sets(org_dir)
+                    'profiles': data.get('profiles', {}),
+                    'permissionSets': data.get('permissionSets', {}),
+                    'permissionSetGroups': data.get('permissionSetGroups', {}),
+                    'mutingPermissionSets': data.get('mutingPermissionSets', {})
                 }
-            
-            logger.info(f"Loaded {len(self.org_data[org_name]['profiles'])} profiles, "
-                       f"{len(self.org_data[org_name]['permissionSets'])} permission sets, "
-                       f"{len(self.org_data[org_name]['permissionSetGroups'])} permission set groups, "
-                       f"{len(self.org_data[org_name]['mutingPermissionSets'])} muting permission sets for {org_name}")
+        else:
+            logger.warning(f"No processed_permissions.json found for {org_name}, trying to load from XML...")
+            # Fallback to XML parsing
+            self.org_data[org_name] = {
+                'profiles': self._load_profiles(org_dir),
+                'permissionSets': self._load_permission_sets(org_dir),
+                'permissionSetGroups': self._load_permission_set_groups(org_dir),
+                'mutingPermissionSets': self._load_muting_permission_sets(org_dir)
+            }
+        
+        logger.info(f"Loaded {len(self.org_data[org_name]['profiles'])} profiles, "
+                   f"{len(self.org_data[org_name]['permissionSets'])} permission sets, "
+                   f"{len(self.org_data[org_name]['permissionSetGroups'])} permission set groups, "
+                   f"{len(self.org_data[org_name]['mutingPermissionSets'])} muting permission sets for {org_name}")
     
     def _load_profiles(self, org_dir: Path) -> Dict[str, Any]:
         """Load profile metadata from XML files"""
@@ -390,22 +408,31 @@ class EnhancedPermissionsComparison:
         selected_options = self.config.get('selectedPermissionOptions', {})
         
         if 'Profile' in selected_options:
-            self.comparison_results['details']['profiles'] = self.compare_profiles()
+            with self.metrics.phase('compare', 'profiles'):
+                self.comparison_results['details']['profiles'] = self.compare_profiles()
         
         if 'PermissionSet' in selected_options:
-            self.comparison_results['details']['permissionSets'] = self.compare_permission_sets()
+            with self.metrics.phase('compare', 'permissionSets'):
+                self.comparison_results['details']['permissionSets'] = self.compare_permission_sets()
         
         if 'PermissionSetGroup' in selected_options:
-            self.comparison_results['details']['permissionSetGroups'] = self.compare_permission_set_groups()
+            with self.metrics.phase('compare', 'permissionSetGroups'):
+                self.comparison_results['details']['permissionSetGroups'] = self.compare_permission_set_groups()
         
         if 'MutingPermissionSet' in selected_options:
-            self.comparison_results['details']['mutingPermissionSets'] = self.compare_muting_permission_sets()
+            with self.metrics.phase('compare', 'mutingPermissionSets'):
+                self.comparison_results['details']['mutingPermissionSets'] = self.compare_muting_permission_sets()
         
-        # Generate summary
-        self._generate_summary()
+        with self.metrics.phase('output'):
+            # Generate summary
+            self._generate_summary()
+            
+            # Save results
+            self._save_results()
         
-        # Save results
-        self._save_results()
+        # Phase metrics, named like the other per-comparison files in the output directory
+        metrics_path = self.metrics.write(self.output_path.parent, f"{self.comparison_id}_metrics.json")
+        logger.info(f"Metrics saved to {metrics_path}")
     
     def compare_profiles(self) -> Dict[str, Any]:
         """Compare profiles across organizations"""
@@ -1081,6 +1108,8 @@ def main():
     parser.add_argument('--output-path', required=True, help='Path for output JSON file')
     parser.add_argument('--comparison-id', required=True, help='Unique comparison ID')
     parser.add_argument('--config-path', help='Path to configuration file')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile every phase with cProfile and tracemalloc next to the metrics file')
     
     args = parser.parse_args()
     
@@ -1089,7 +1118,8 @@ def main():
             args.data_path,
             args.output_path,
             args.comparison_id,
-            args.config_path
+            args.config_path,
+            args.profile
         )
         comparison.compare_all()
         
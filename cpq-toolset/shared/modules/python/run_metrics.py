@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Per-phase performance metrics shared by the Python tools
+Every run records wall time, CPU time and peak RSS per phase, with row and byte counts where
+a phase reads data, and writes them to metrics.json next to its other outputs. With profiling
+on, each phase also runs under cProfile and tracemalloc, adding a .pstats file per phase and a
+report of the top allocation sites
+"""
+
+import os
+import sys
+import json
+import time
+import cProfile
+import pstats
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_FILE = 'metrics.json'
+TOP_ALLOCATIONS = 25  # Allocation sites listed per phase in the profile report
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Highest resident set size of this process so far, or None when the platform cannot tell"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports KiB
+    if sys.platform == 'win32':
+        return _windows_peak_working_set()
+    return None
+
+
+def _windows_peak_working_set() -> Optional[int]:
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)
+        ]
+
+    try:
+        get_current_process = ctypes.windll.kernel32.GetCurrentProcess
+        get_current_process.restype = wintypes.HANDLE
+        get_memory_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_memory_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        if not get_memory_info(get_current_process(), ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize
+    except (AttributeError, OSError):
+        return None
+
+
+class RunMetrics:
+    """
+    Accumulates phase timings for one run of a tool
+
+    A phase is identified by its name plus optional object and org, and repeated phases add up
+    into one record (calls counts them), so per-pair work inside an object stays one line.
+    CPU time is process-wide: phases running at the same time on threads, such as prefetched
+    loads, each see the CPU of all of them. Records from worker processes can be merged in
+
+    Profiling accumulates one cProfile per phase name. Only one phase is profiled at a time:
+    a phase starting while another is profiled, on this thread or another, runs unprofiled and
+    its work shows up in the outer phase's profile where the interpreter traces all threads, so
+    tools run their phases on one thread when profiling. Allocations are the net bytes each
+    source line still holds when the phase ends
+    """
+
+    def __init__(self, tool: str, profile: bool = False, **details):
+        self.tool = tool
+        self.profile = profile
+        self.details = details  # Run settings stored alongside the phases
+        self._records = {}
+        self._lock = threading.Lock()
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._profiling = False  # A phase is being profiled
+        self._profilers = {}  # Phase name -> cProfile.Profile enabled for every run of the phase
+        self._profile_stats = {}  # Phase name -> raw pstats dicts, from this process and merged workers
+        self._allocations = {}  # Phase name -> {'sites': Counter, 'peak_bytes': int}
+        if profile and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        # Profilers hold interpreter state; their stats travel through export instead
+        state['_profilers'] = {}
+        state['_profiling'] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str, object_name: Optional[str] = None,
+              org: Optional[str] = None) -> Iterator[Dict[str, int]]:
+        """Time a block; set 'rows' and 'bytes' on the yielded counts for throughput"""
+        counts = {'rows': 0, 'bytes': 0}
+        profiler, snapshot = self._start_profile(name)
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield counts
+        finally:
+            end_wall = time.perf_counter()
+            end_cpu = time.process_time()
+            self._stop_profile(name, profiler, snapshot)
+            self.add({
+                'phase': name,
+                'object': object_name,
+                'org': org,
+                'calls': 1,
+                'wall_seconds': end_wall - start_wall,
+                'cpu_seconds': end_cpu - start_cpu,
+                'peak_rss_bytes': peak_rss_bytes(),
+                'rows': counts['rows'],
+                'bytes': counts['bytes'],
+                'pid': os.getpid()
+            })
+
+    def add(self, record: Dict):
+        """Fold one phase record into the run, summing it into an earlier record of the same phase"""
+        key = (record['phase'], record['object'], record['org'])
+        with self._lock:
+            total = self._records.get(key)
+            if total is None:
+                self._records[key] = dict(record)
+                return
+            for field in ('calls', 'wall_seconds', 'cpu_seconds', 'rows', 'bytes'):
+                total[field] += record[field]
+            total['peak_rss_bytes'] = max(filter(None, (total['peak_rss_bytes'], record['peak_rss_bytes'])), default=None)
+
+    def export(self) -> Dict:
+        """Picklable state of the run for another process's RunMetrics to merge"""
+        self._collect_profiles()
+        return {'records': self.records(), 'profile_stats': self._profile_stats, 'allocations': self._allocations}
+
+    def merge(self, exported: Dict):
+        """Fold in the export of another RunMetrics, typically one filled in a worker process"""
+        for record in exported['records']:
+            self.add(record)
+        with self._lock:
+            for name, stats in exported['profile_stats'].items():
+                self._profile_stats.setdefault(name, []).extend(stats)
+            for name, allocations in exported['allocations'].items():
+                self._add_allocations(name, allocations['sites'], allocations['peak_bytes'])
+
+    def records(self) -> List[Dict]:
+        with self._lock:
+            return [dict(record) for record in self._records.values()]
+
+    def _start_profile(self, name: str):
+        """Begin profiling a phase unless profiling is off or another phase holds the profiler"""
+        if not self.profile:
+            return None, None
+        with self._lock:
+            if self._profiling:
+                return None, None
+            self._profiling = True
+
+        profiler = self._profilers.get(name)
+        if profiler is None:
+            profiler = self._profilers[name] = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # Another profiling tool owns the interpreter's profiler slot
+            profiler = None
+        tracemalloc.reset_peak()
+        return profiler, tracemalloc.take_snapshot()
+
+    def _stop_profile(self, name: str, profiler: Optional[cProfile.Profile], snapshot):
+        if snapshot is None:
+            return
+        if profiler is not None:
+            profiler.disable()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        sites = Counter()
+        for difference in tracemalloc.take_snapshot().compare_to(snapshot, 'lineno'):
+            if difference.size_diff > 0:
+                frame = difference.traceback[0]
+                sites[f"{frame.filename}:{frame.lineno}"] += difference.size_diff
+
+        with self._lock:
+            self._add_allocations(name, sites, peak_bytes)
+            self._profiling = False
+
+    def _add_allocations(self, name: str, sites: Counter, peak_bytes: int):
+        allocations = self._allocations.setdefault(name, {'sites': Counter(), 'peak_bytes': 0})
+        allocations['sites'].update(sites)
+        allocations['peak_bytes'] = max(allocations['peak_bytes'], peak_bytes)
+
+    def _collect_profiles(self):
+        """Move the stats gathered by this process's profilers into the mergeable raw stats"""
+        for name, profiler in self._profilers.items():
+            profiler.create_stats()
+            self._profile_stats.setdefault(name, []).append(profiler.stats)
+        self._profilers = {}
+
+    def summary(self) -> Dict:
+        """The whole run: totals, every phase with its rates, and throughput per object"""
+        phases = self.records()
+        objects = {}
+        for record in phases:
+            _add_rates(record)
+            if record['object'] is None:
+                continue
+            totals = objects.setdefault(record['object'], {'rows': 0, 'bytes': 0, 'wall_seconds': 0.0})
+            totals['wall_seconds'] += record['wall_seconds']
+            if record['phase'] == 'load':
+                totals['rows'] += record['rows']
+                totals['bytes'] += record['bytes']
+        for totals in objects.values():
+            _add_rates(totals)
+
+        return {
+            'tool': self.tool,
+            **self.details,
+            'timestamp': datetime.now().isoformat(),
+            'wall_seconds': time.perf_counter() - self._start_wall,
+            'cpu_seconds': time.process_time() - self._start_cpu,
+            'peak_rss_bytes': peak_rss_bytes(),
+            'phases': phases,
+            'objects': objects
+        }
+
+    def write(self, output_dir, file_name: str = METRICS_FILE) -> str:
+        """
+        Write the metrics to a directory, as metrics.json unless named otherwise, and return the path
+        Profiles go next to it as <prefix>profile_<phase>.pstats and <prefix>allocations.txt, the
+        prefix being whatever precedes metrics.json in the file name
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        metrics_path = os.path.join(output_dir, file_name)
+        with open(metrics_path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+        if self.profile:
+            prefix = file_name[:-len(METRICS_FILE)] if file_name.endswith(METRICS_FILE) else ''
+            self._write_profiles(output_dir, prefix)
+        return metrics_path
+
+    def _write_profiles(self, output_dir: str, prefix: str):
+        self._collect_profiles()
+        for name, raw_stats in self._profile_stats.items():
+            stats = pstats.Stats(_RawStats(raw_stats[0]))
+            for other in raw_stats[1:]:
+                stats.add(_RawStats(other))
+            stats.dump_stats(os.path.join(output_dir, f"{prefix}profile_{name}.pstats"))
+
+        with open(os.path.join(output_dir, f"{prefix}allocations.txt"), 'w') as f:
+            f.write(f"Top {TOP_ALLOCATIONS} allocation sites per phase: bytes each line still held when the phase ended\n")
+            for name, allocations in self._allocations.items():
+                f.write(f"\n{name} (peak traced {_megabytes(allocations['peak_bytes'])})\n")
+                for site, size in allocations['sites'].most_common(TOP_ALLOCATIONS):
+                    f.write(f"  {_megabytes(size):>12}  {site}\n")
+
+
+class _RawStats:
+    """Raw cProfile stats in the shape pstats.Stats loads from a profiler"""
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def _megabytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.2f} MB"
+
+
+def _add_rates(record: Dict):
+    seconds = record['wall_seconds']
+    record['rows_per_second'] = record['rows'] / seconds if record['rows'] and seconds > 0 else None
+    record['bytes_per_second'] = record['bytes'] / seconds if record['bytes'] and seconds > 0 else None